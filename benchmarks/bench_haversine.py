@@ -0,0 +1,81 @@
+"""
+Great-circle distances for N pairs: scalar ``haversine`` loop vs
+``haversine_many``, plus a sqrt(N) x sqrt(N) ``haversine_matrix``.
+
+The scalar path validates, converts and allocates a ``Distance`` per pair;
+the batched paths validate each array once and write float64 results (into
+a reused ``out=`` buffer, as a caller in a loop would).
+
+    python -m benchmarks.bench_haversine
+    python -m benchmarks.bench_haversine --sizes 1000 1000000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from typing import Callable
+
+import numpy as np
+
+from marco_bot.utils.distance import haversine_km, haversine_many, haversine_matrix
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(25544)
+    print(
+        f"{'pairs':>9} {'scalar':>10} {'many':>9} {'speedup':>8} "
+        f"{'matrix':>9} {'speedup':>8} {'max diff':>9}"
+    )
+    for n in args.sizes:
+        lon1, lon2 = rng.uniform(-180.0, 180.0, (2, n))
+        lat1, lat2 = rng.uniform(-90.0, 90.0, (2, n))
+        rows = (lon1.tolist(), lat1.tolist(), lon2.tolist(), lat2.tolist())
+
+        def _scalar() -> list:
+            return list(map(haversine_km, *rows))
+
+        out = np.empty(n)
+        reference = np.array(_scalar())
+        diff = float(np.abs(haversine_many(lon1, lat1, lon2, lat2) - reference).max())
+
+        t_loop = _best(_scalar, args.repeat)
+        t_many = _best(
+            lambda: haversine_many(lon1, lat1, lon2, lat2, out=out), args.repeat
+        )
+
+        # Same number of distances as a square matrix
+        side = max(1, math.isqrt(n))
+        a = np.column_stack((lon1[:side], lat1[:side]))
+        b = np.column_stack((lon2[:side], lat2[:side]))
+        grid = np.empty((side, side))
+        t_matrix = _best(lambda: haversine_matrix(a, b, out=grid), args.repeat)
+        per_pair_loop = t_loop / n
+        t_matrix_loop = per_pair_loop * side * side
+
+        print(
+            f"{n:>9} {t_loop * 1000:>8.2f}ms {t_many * 1000:>7.2f}ms "
+            f"{t_loop / t_many:>7.1f}x {t_matrix * 1000:>7.2f}ms "
+            f"{t_matrix_loop / t_matrix:>7.1f}x {diff:>9.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Next-pass prediction for N observers: per-guild loop vs one batched call.
+
+The per-guild path is what the ISS scheduler did on every tick before
+batching (``Ephemeris.passes`` once per guild); the batched path is
+``Ephemeris.next_passes`` over all rows at once. Both share one ephemeris,
+so only the per-tick cost is measured.
+
+    python -m benchmarks.bench_iss_passes
+    python -m benchmarks.bench_iss_passes --sizes 1 100 5000 --tle iss.tle
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+from sgp4.api import Satrec
+
+from marco_bot.services.orbit_services import Ephemeris, Observer, Pass, parse_tle
+
+# Fixed elements so runs are comparable; --tle swaps in a current set
+SAMPLE_TLE = """\
+ISS (ZARYA)
+1 25544U 98067A   24290.51782528  .00020137  00000+0  36036-3 0  9991
+2 25544  51.6393 100.3340 0009143  76.4632  20.1128 15.49947497477216
+"""
+SAMPLE_NOW = 1729240000.0  # shortly after the sample epoch
+
+UCF = (28.6024, -81.2001, 30.0)
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def _observers(n: int, spread: bool, rng: np.random.Generator) -> np.ndarray:
+    if not spread:
+        return np.tile(np.array(UCF), (n, 1))
+    return np.column_stack(
+        (
+            rng.uniform(-55.0, 55.0, n),
+            rng.uniform(-180.0, 180.0, n),
+            rng.uniform(0.0, 500.0, n),
+        )
+    )
+
+
+def _per_guild(eph: Ephemeris, rows: np.ndarray, now: float) -> List[Optional[Pass]]:
+    out: List[Optional[Pass]] = []
+    for lat, lon, alt in rows.tolist():
+        found = eph.passes(Observer(lat, lon, alt), now)
+        out.append(found[0] if found else None)
+    return out
+
+
+def _max_diff(a: List[Optional[Pass]], b: List[Optional[Pass]]) -> float:
+    worst = 0.0
+    for p, q in zip(a, b):
+        if (p is None) != (q is None):
+            return float("inf")
+        if p is not None and q is not None:
+            worst = max(worst, abs(p.rise - q.rise), abs(p.set - q.set))
+    return worst
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 5000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--tle", help="TLE file (default: built-in sample)")
+    ap.add_argument("--step", type=float, default=20.0, help="grid step, seconds")
+    args = ap.parse_args()
+
+    if args.tle:
+        with open(args.tle, "r", encoding="utf-8") as f:
+            tle = parse_tle(f.read())
+        now = time.time()
+    else:
+        tle, now = parse_tle(SAMPLE_TLE), SAMPLE_NOW
+    sat = Satrec.twoline2rv(*tle)
+
+    t = time.perf_counter()
+    eph = Ephemeris(sat, now - 600, now - 600 + 26 * 3600, args.step)
+    print(f"ephemeris: {len(eph.times)} points in {time.perf_counter() - t:.4f}s\n")
+
+    rng = np.random.default_rng(25544)
+    print(
+        f"{'observers':>9} {'layout':>7} {'per-guild':>11} {'batched':>10} "
+        f"{'speedup':>8} {'max diff':>9}"
+    )
+    for spread in (False, True):
+        for n in args.sizes:
+            rows = _observers(n, spread, rng)
+            lat, lon, alt = rows[:, 0], rows[:, 1], rows[:, 2]
+            reference = _per_guild(eph, rows, now)
+            batched = eph.next_passes(lat, lon, alt, now)
+            diff = _max_diff(reference, batched)
+
+            t_loop = _best(lambda: _per_guild(eph, rows, now), args.repeat)
+            t_batch = _best(lambda: eph.next_passes(lat, lon, alt, now), args.repeat)
+            print(
+                f"{n:>9} {'spread' if spread else 'same':>7} "
+                f"{t_loop * 1000:>9.2f}ms {t_batch * 1000:>8.2f}ms "
+                f"{t_loop / t_batch:>7.1f}x {diff:>8.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
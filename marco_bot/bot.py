@@ -3,6 +3,7 @@ import discord
 from dotenv import load_dotenv
 from discord.ext import commands
 from .config import Config
+from .services.webhook_services import WebhookDispatcher
 from .utils.logging import setup_logging
 
 log = setup_logging()
@@ -17,12 +18,17 @@ class MarcoBot(commands.Bot):
             command_prefix=commands.when_mentioned_or("!"), intents=INTENTS
         )
         self.config = config
+        # One dispatcher (and connection pool) for every configured webhook
+        self.webhooks = WebhookDispatcher(config.webhooks)
 
     async def setup_hook(self) -> None:
+        await self.webhooks.start()
         await self.load_extension("marco_bot.cogs.admin")
         await self.load_extension("marco_bot.cogs.iss")
         await self.load_extension("marco_bot.cogs.club")
         await self.load_extension("marco_bot.cogs.callsign")
+        await self.load_extension("marco_bot.cogs.alerts")
+        await self.load_extension("marco_bot.cogs.forecast")
 
         # Sync commands
         if self.config.guild_id:
@@ -34,6 +40,12 @@ class MarcoBot(commands.Bot):
             await self.tree.sync()
             log.info("Synced global application commands (may take up to an hour)")
 
+    async def close(self) -> None:
+        # Give queued webhook posts a moment to go out before shutting down
+        await self.webhooks.drain(timeout=10)
+        await self.webhooks.close()
+        await super().close()
+
 
 def run():
     load_dotenv()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from ..models.alert_models import Alert, AlertEvent
+from ..services.nws_services import NWS_API, NWSAlertService
+from ..services.zone_services import load_zone_index
+from ..utils.geofence import ZoneIndex
+
+log = logging.getLogger(__name__)
+
+# --------- Feed (env can point it at a stub server) ---------
+NWS_BASE_URL = os.getenv("NWS_BASE_URL", NWS_API)
+NWS_ALERT_AREA = os.getenv("NWS_ALERT_AREA", "FL")
+# County/marine zone outlines, fetched once from the NWS zones API
+NWS_ZONES_CACHE = os.getenv("NWS_ZONES_CACHE", "data/nws_zones.json")
+
+# Discord allows at most 10 embeds and 6000 embed characters per message
+EMBEDS_PER_MESSAGE = 10
+EMBED_CHARS_PER_MESSAGE = 6000
+DESCRIPTION_CHARS = 1500
+
+SEVERITY_COLORS = {
+    "Extreme": 0x8B0000,
+    "Severe": 0xD32F2F,
+    "Moderate": 0xF57C00,
+    "Minor": 0xFBC02D,
+}
+DEFAULT_COLOR = 0x607D8B
+KIND_PREFIX = {"new": "", "update": "UPDATED: ", "cancel": "CANCELLED: "}
+
+
+def alert_embed(alert: Alert, kind: str = "new") -> discord.Embed:
+    title = f"{KIND_PREFIX.get(kind, '')}{alert.event}"[:256]
+    desc = alert.headline or alert.description
+    embed = discord.Embed(
+        title=title,
+        description=desc[:DESCRIPTION_CHARS],
+        color=SEVERITY_COLORS.get(alert.severity, DEFAULT_COLOR),
+        url=alert.url or None,
+    )
+    if alert.area_desc:
+        embed.add_field(name="Area", value=alert.area_desc[:1024], inline=False)
+    embed.add_field(name="Severity", value=alert.severity)
+    embed.add_field(name="Urgency", value=alert.urgency)
+    if alert.expires:
+        embed.add_field(name="Expires", value=f"<t:{int(alert.expires)}:f>")
+    if alert.instruction and kind != "cancel":
+        embed.add_field(
+            name="Instructions", value=alert.instruction[:1024], inline=False
+        )
+    if alert.sender_name:
+        embed.set_footer(text=alert.sender_name)
+    return embed
+
+
+class Alerts(commands.Cog):
+    """
+    NWS weather alerts:
+      - Polls /alerts/active every ALERT_CHECK_SECONDS (conditional GETs)
+      - Geofences each alert (polygon + WEAS_BUFFER_MILES, or its zone
+        codes) against the county, marine and campus zones
+      - Posts to every matching zone's webhook, and anything touching a zone
+        to WEBHOOK_URL
+      - /alerts lists what's currently active
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        cfg = bot.config
+        self.webhooks = bot.webhooks
+        self.buffer_miles = cfg.weas_buffer_miles
+        self.svc = NWSAlertService(
+            cfg.nws_contact_email,
+            base_url=NWS_BASE_URL,
+            area=NWS_ALERT_AREA,
+            interval_s=cfg.alert_check_seconds,
+        )
+        self._zones: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        if not self.webhooks.hooks:
+            log.warning("No webhooks set; NWS alerts will only be tracked")
+        # Outlines load in the background (zone_geometry opens the session
+        # on demand); the first poll only primes anyway
+        self._zones = asyncio.create_task(load_zone_index(self.svc, NWS_ZONES_CACHE))
+        await self.svc.start(self._post)
+
+    async def cog_unload(self):
+        if self._zones is not None:
+            self._zones.cancel()
+        try:
+            await self.svc.close()
+        except Exception:
+            pass
+
+    def _index(self) -> Optional[ZoneIndex]:
+        """The zone index once loaded; None while loading or if it failed."""
+        t = self._zones
+        if t is None or not t.done() or t.cancelled() or t.exception():
+            return None
+        return t.result()
+
+    def _targets(self, index: Optional[ZoneIndex], ev: AlertEvent) -> List[str]:
+        if index is None:
+            # No geofence: the general channel still gets everything
+            return ["WEBHOOK_URL"] if "WEBHOOK_URL" in self.webhooks else []
+        a = ev.alert
+        keys = index.match(a.polygons, a.ugc + a.same, self.buffer_miles)
+        if keys:
+            keys.add("WEBHOOK_URL")
+        return [k for k in sorted(keys) if k in self.webhooks]
+
+    async def _post(self, events: List[AlertEvent]) -> None:
+        if self._zones is not None:
+            await asyncio.wait([self._zones])
+            if self._index() is None:
+                log.warning("Alert zone index unavailable; posting to WEBHOOK_URL")
+        index = self._index()
+        for ev in events:
+            targets = self._targets(index, ev)
+            log.info(
+                "NWS %s: %s (%s) -> %s",
+                ev.kind,
+                ev.alert.event,
+                ev.alert.id,
+                ", ".join(targets) or "no webhooks",
+            )
+            embed = alert_embed(ev.alert, ev.kind).to_dict()
+            # The dispatcher coalesces per webhook when it's backlogged
+            for key in targets:
+                await self.webhooks.submit(key, embeds=[embed])
+
+    @app_commands.command(name="alerts", description="Show active NWS alerts")
+    @app_commands.checks.cooldown(1, 10)
+    async def alerts(self, interaction: discord.Interaction):
+        active = sorted(self.svc.active.values(), key=lambda a: a.sent or 0.0)
+        index = self._index()
+        if index is not None:
+            active = [
+                a
+                for a in active
+                if index.match(a.polygons, a.ugc + a.same, self.buffer_miles)
+            ]
+        if not active:
+            await interaction.response.send_message(
+                "No active NWS alerts.", ephemeral=True
+            )
+            return
+        # Newest first, as many as fit one message
+        embeds: List[discord.Embed] = []
+        chars = 0
+        for a in reversed(active):
+            embed = alert_embed(a)
+            if (
+                len(embeds) >= EMBEDS_PER_MESSAGE
+                or chars + len(embed) > EMBED_CHARS_PER_MESSAGE
+            ):
+                break
+            embeds.append(embed)
+            chars += len(embed)
+        left_out = len(active) - len(embeds)
+        content = (
+            f"…and {left_out} more active alert(s) not shown." if left_out else None
+        )
+        await interaction.response.send_message(content, embeds=embeds, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Alerts(bot))
@@ -1,14 +1,65 @@
 from __future__ import annotations
 
+import csv
+import datetime as dt
+import io
+import logging
+import os
+import re
+import time
+from typing import Optional
+
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from ..models.callsign_models import CallsignRecord
-from ..services.callsign_services import lookup_callsign
+from ..services.callsign_services import (
+    DMR_FIELDS,
+    LONG_FIELDS,
+    SHORT_FIELDS,
+    CallsignService,
+)
+from ..services.callsign_store import CallsignStore
+from ..services.uls_services import ULSDatabase
+from ..utils.http import PoolLimits
+
+log = logging.getLogger(__name__)
 
 EMBED_COLOR = 0x2B6CB0
 
+# --------- Shared HTTP pool for the lookup sources (env can override) ---------
+HTTP_LIMITS = PoolLimits(
+    total=int(os.getenv("CALLSIGN_POOL_LIMIT", "32")),
+    per_host=int(os.getenv("CALLSIGN_POOL_PER_HOST", "8")),
+    keepalive_s=float(os.getenv("CALLSIGN_POOL_KEEPALIVE_S", "30")),
+    dns_ttl_s=int(os.getenv("CALLSIGN_POOL_DNS_TTL_S", "300")),
+)
+
+# --------- Optional on-disk cache tier (unset = memory only) ---------
+CACHE_DB_PATH = os.getenv("CALLSIGN_CACHE_DB", "")
+
+# --------- Optional local FCC ULS database (built with uls_services) ---------
+ULS_DB_PATH = os.getenv("ULS_DB", "")
+# FCC posts each weekday's daily file overnight; apply it mid-morning UTC
+ULS_SYNC_TIME = dt.time(hour=12, tzinfo=dt.timezone.utc)
+
+# --------- /call bulk ---------
+BULK_MAX_CALLS = 250
+BULK_MAX_BYTES = 64_000
+BULK_CONCURRENCY = 8
+BULK_PAGE_SIZE = 15
+BULK_EXPIRY_WARN_DAYS = 90
+# Fields shown per roster line (see _bulk_line / _bulk_csv)
+BULK_FIELDS = frozenset(
+    {"name", "oper_class", "status", "expires", "city", "state", "grid"}
+)
+# Prefix (letters, or a letter/digit pair), a digit, a letter suffix, and an
+# optional /portable part; rejects ZIP codes, years and member ids
+CALLSIGN_RE = re.compile(
+    r"^(?:[A-Z]{1,2}|\d[A-Z]|[A-Z]\d)\d[A-Z]{1,4}(/[A-Z0-9]{1,4})?$"
+)
+
 
 class CallsignCog(commands.Cog):
     """Callsign lookup and quick info (US + DMR), using free public APIs."""
@@ -17,6 +68,32 @@ class CallsignCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.svc = CallsignService.get()
+
+    async def cog_load(self):
+        # One pooled session (and optional SQLite tier) for the lifetime of the cog
+        store = CallsignStore(CACHE_DB_PATH) if CACHE_DB_PATH else None
+        uls = ULSDatabase(ULS_DB_PATH) if ULS_DB_PATH else None
+        await self.svc.start(limits=HTTP_LIMITS, store=store, uls=uls)
+        if uls is not None:
+            self.uls_daily.start()
+
+    async def cog_unload(self):
+        self.uls_daily.cancel()
+        try:
+            await self.svc.close()
+        except Exception:
+            pass
+
+    @tasks.loop(time=ULS_SYNC_TIME)
+    async def uls_daily(self):
+        # Yesterday's transactions, e.g. l_am_mon.zip on Tuesday
+        day = (dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=1)).strftime("%a")
+        try:
+            counts = await self.svc.sync_uls(day)
+            log.info("Applied ULS daily file for %s: %s", day, counts)
+        except Exception:
+            log.exception("ULS daily sync for %s failed", day)
 
     @staticmethod
     def _format_title(rec: CallsignRecord) -> str:
@@ -120,17 +197,21 @@ class CallsignCog(commands.Cog):
         Long: + status/expiry, city, coords, trustee, optional DMR, links."""
         await interaction.response.defer(ephemeral=not public)
 
-        rec = await lookup_callsign(callsign)
+        detail = (
+            format.value if isinstance(format, app_commands.Choice) else "short"
+        ).lower()
+        # Only ask the sources this view needs; long fills in the rest later
+        fields = SHORT_FIELDS
+        if detail == "long":
+            fields = LONG_FIELDS | DMR_FIELDS if include_dmr else LONG_FIELDS
+
+        rec = await self.svc.lookup(callsign, fields)
         if not rec:
             return await interaction.followup.send(
                 f"Couldn’t find **{callsign.upper()}** in free sources.",
                 ephemeral=not public,
             )
 
-        detail = (
-            format.value if isinstance(format, app_commands.Choice) else "short"
-        ).lower()
-
         # Build embed
         emb = discord.Embed(
             title=self._format_title(rec),
@@ -148,6 +229,217 @@ class CallsignCog(commands.Cog):
 
         await interaction.followup.send(embed=emb, ephemeral=not public)
 
+    @group.command(
+        name="stats",
+        description="Show callsign lookup service counters.",
+    )
+    async def call_stats(self, interaction: discord.Interaction):
+        lines = [f"`{k}`: {v}" for k, v in self.svc.stats().items()]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    @group.command(
+        name="bulk",
+        description="Look up a roster of callsigns from an attached text/CSV file.",
+    )
+    @app_commands.describe(
+        file="Text or CSV file with callsigns (any column, comma/space/newline separated)",
+        output="Reply as paginated embed (default) or CSV attachment",
+        public="Post to channel (true) or only to you (false). Default: false",
+    )
+    @app_commands.choices(
+        output=[
+            app_commands.Choice(name="embed", value="embed"),
+            app_commands.Choice(name="csv", value="csv"),
+        ]
+    )
+    @app_commands.checks.cooldown(1, 30)
+    async def call_bulk(
+        self,
+        interaction: discord.Interaction,
+        file: discord.Attachment,
+        output: app_commands.Choice[str] | None = None,
+        public: bool = False,
+    ):
+        if file.size > BULK_MAX_BYTES:
+            return await interaction.response.send_message(
+                f"File too large (max {BULK_MAX_BYTES // 1000} KB).", ephemeral=True
+            )
+        await interaction.response.defer(ephemeral=not public)
+
+        calls = _parse_roster((await file.read()).decode("utf-8", errors="replace"))
+        if not calls:
+            if public:
+                # A followup can't be private once the deferred reply is public:
+                # remove that reply so the error goes only to the user
+                await interaction.delete_original_response()
+            return await interaction.followup.send(
+                "No callsigns found in that file.", ephemeral=True
+            )
+        dropped = max(0, len(calls) - BULK_MAX_CALLS)
+        calls = calls[:BULK_MAX_CALLS]
+
+        # Stream results in, updating a progress message every couple of seconds
+        progress = await interaction.followup.send(
+            f"Looking up {len(calls)} callsign(s)… 0/{len(calls)}",
+            ephemeral=not public,
+            wait=True,
+        )
+        results: dict[str, Optional[CallsignRecord]] = {}
+        last_edit = time.monotonic()
+        async for call, rec in self.svc.iter_lookups(
+            calls, BULK_CONCURRENCY, BULK_FIELDS
+        ):
+            results[call] = rec
+            if time.monotonic() - last_edit >= 2.0:
+                last_edit = time.monotonic()
+                await progress.edit(
+                    content=f"Looking up {len(calls)} callsign(s)… "
+                    f"{len(results)}/{len(calls)}"
+                )
+        ordered = [(c, results.get(c)) for c in calls]
+
+        found = sum(1 for _, r in ordered if r)
+        summary = f"{found}/{len(ordered)} found"
+        if dropped:
+            summary += f" · {dropped} over the {BULK_MAX_CALLS}-call limit skipped"
+
+        mode = output.value if isinstance(output, app_commands.Choice) else "embed"
+        if mode == "csv":
+            await progress.edit(
+                content=summary,
+                attachments=[
+                    discord.File(io.BytesIO(_bulk_csv(ordered)), "callsigns.csv")
+                ],
+            )
+            return
+
+        view = BulkPages(interaction.user.id, _bulk_pages(ordered, summary))
+        await progress.edit(content=None, embed=view.pages[0], view=view)
+
+
+# ---------- /call bulk helpers ----------
+def _parse_roster(text: str) -> list[str]:
+    """Callsign-looking cells from text/CSV, deduplicated in input order."""
+    out: dict[str, None] = {}
+    for row in csv.reader(io.StringIO(text)):
+        for cell in row:
+            for token in re.split(r"[\s;]+", cell.upper()):
+                if CALLSIGN_RE.match(token):
+                    out[token] = None
+    return list(out)
+
+
+def _parse_date(value: Optional[str]) -> Optional[dt.date]:
+    # ULS gives ISO dates; Callook and FCC LV give MM/DD/YYYY
+    for fmt in ("%Y-%m-%d", "%m/%d/%Y"):
+        try:
+            return dt.datetime.strptime(value or "", fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _bulk_line(call: str, rec: Optional[CallsignRecord]) -> str:
+    if rec is None:
+        return f"**{call}** — not found"
+    bits = [b.title() for b in (rec.oper_class, rec.status) if b]
+    expires = _parse_date(rec.expires)
+    if expires:
+        days = (expires - dt.date.today()).days
+        warn = " ⚠️" if days <= BULK_EXPIRY_WARN_DAYS else ""
+        bits.append(f"exp {expires.isoformat()}{warn}")
+    place = ", ".join(p for p in (rec.city, rec.state) if p)
+    if place:
+        bits.append(place)
+    name = f" {rec.name.title()}" if rec.name else ""
+    return f"**{call}**{name} — {' · '.join(bits) or '—'}"
+
+
+def _bulk_pages(
+    rows: list[tuple[str, Optional[CallsignRecord]]], summary: str
+) -> list[discord.Embed]:
+    chunks = [rows[i : i + BULK_PAGE_SIZE] for i in range(0, len(rows), BULK_PAGE_SIZE)]
+    pages = []
+    for n, chunk in enumerate(chunks, 1):
+        emb = discord.Embed(
+            title="Callsign roster",
+            description="\n".join(_bulk_line(c, r) for c, r in chunk),
+            color=EMBED_COLOR,
+        )
+        emb.set_footer(
+            text=f"{summary} · ⚠️ expires within {BULK_EXPIRY_WARN_DAYS} days "
+            f"· Page {n}/{len(chunks)}"
+        )
+        pages.append(emb)
+    return pages
+
+
+def _bulk_csv(rows: list[tuple[str, Optional[CallsignRecord]]]) -> bytes:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(
+        [
+            "callsign",
+            "found",
+            "name",
+            "class",
+            "status",
+            "expires",
+            "city",
+            "state",
+            "grid",
+        ]
+    )
+    for call, rec in rows:
+        if rec is None:
+            w.writerow([call, "no"] + [""] * 7)
+            continue
+        w.writerow(
+            [
+                call,
+                "yes",
+                rec.name or "",
+                rec.oper_class or "",
+                rec.status or "",
+                rec.expires or "",
+                rec.city or "",
+                rec.state or "",
+                rec.grid or "",
+            ]
+        )
+    return buf.getvalue().encode("utf-8")
+
+
+class BulkPages(discord.ui.View):
+    """Prev/next buttons over pre-built roster pages (requester only)."""
+
+    def __init__(self, owner_id: int, pages: list[discord.Embed]):
+        super().__init__(timeout=600)
+        self.owner_id = owner_id
+        self.pages = pages
+        self.index = 0
+        self._sync()
+
+    def _sync(self) -> None:
+        self.prev.disabled = self.index == 0
+        self.next.disabled = self.index >= len(self.pages) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.owner_id
+
+    async def _show(self, interaction: discord.Interaction, delta: int) -> None:
+        self.index = max(0, min(len(self.pages) - 1, self.index + delta))
+        self._sync()
+        await interaction.response.edit_message(embed=self.pages[self.index], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def prev(self, interaction: discord.Interaction, _button: discord.ui.Button):
+        await self._show(interaction, -1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, _button: discord.ui.Button):
+        await self._show(interaction, 1)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(CallsignCog(bot))
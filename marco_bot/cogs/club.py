@@ -2,8 +2,18 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-import json
+import functools
+import io
+import os
 import random
+from typing import Optional
+
+from ..models.question_models import LETTERS, Question
+from ..services.figure_services import FIGURE_DIR, FigureStore
+from ..services.practice_exam_services import ExamSession, PracticeExams
+from ..services.question_pool_services import QuestionPool, QuestionPoolRegistry
+from ..services.question_search_services import QuestionIndex
+from ..services.study_services import MAX_BOX, StudyService
 
 ARC_SITE = "http://k4ucf.ucf.edu/"
 ARC_WIKI = "https://newton.i2lab.ucf.edu/wiki/"
@@ -36,22 +46,39 @@ LINKS = {
     ],
 }
 
-EXAMS = {
-    "tech": {"element": 2, "total": 35, "pass": "26/35 (74%)"},
-    "general": {"element": 3, "total": 35, "pass": "26/35 (74%)"},
-    "extra": {"element": 4, "total": 50, "pass": "37/50 (74%)"},
-}
+SEARCH_RESULTS = 10
+
+# Pool diagrams (t-1.png, e6-3.png, ...) and rendered question embeds
+QUESTION_FIGURE_DIR = os.getenv("QUESTION_FIGURE_DIR", str(FIGURE_DIR))
+EMBED_CACHE_SIZE = 1024
+
+# Per-user spaced-repetition history (SQLite)
+STUDY_DB_PATH = os.getenv("STUDY_DB", "data/study.sqlite3")
 
-POOLS = {
-    "tech": json.loads(open("./marco_bot/cogs/question_pools/technician-2026-2030.json").read()),
-    "general": json.loads(open("./marco_bot/cogs/question_pools/general-2023-2027.json").read()),
-    "extra": json.loads(open("./marco_bot/cogs/question_pools/extra-2024-2028.json").read())
+EXAMS = {
+    "tech": {"element": 2, "total": 35, "pass": "26/35 (74%)", "min_correct": 26},
+    "general": {"element": 3, "total": 35, "pass": "26/35 (74%)", "min_correct": 26},
+    "extra": {"element": 4, "total": 50, "pass": "37/50 (74%)", "min_correct": 37},
 }
 
 
 class Education(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Pools load on first use and pick up edited/rotated files on their own
+        self.pools = QuestionPoolRegistry.get()
+        self.exams = PracticeExams()
+        self.study = StudyService.get()
+        self.index = QuestionIndex.get()
+        self.figures = FigureStore(QUESTION_FIGURE_DIR)
+
+    async def cog_load(self):
+        await self.study.start(STUDY_DB_PATH)
+        # Build the search index up front so the first autocomplete is fast
+        await self.index.refresh()
+
+    async def cog_unload(self):
+        await self.study.close()
 
     @app_commands.command(description="Show ARC & ham-radio useful links")
     async def links(self, interaction: discord.Interaction):
@@ -104,22 +131,367 @@ class Education(commands.Cog):
         await interaction.response.send_message(embed=embed, ephemeral=False)
 
     @app_commands.command(description="Ask a random test question")
-    @app_commands.describe(
-        level="tech | general | extra"
-    )
+    @app_commands.describe(level="tech | general | extra")
     async def quiz(self, interaction: discord.Interaction, level: str):
+        pool = self.pools.pool(level.lower())
+        if pool is None:
+            return await interaction.response.send_message(
+                "Levels: tech, general, extra", ephemeral=True
+            )
+        question = pool[random.randrange(len(pool))]
+        embed = _quiz_embed(question, pool.name)
+        await _respond(interaction, embed, question, self.figures, ephemeral=True)
+
+    @app_commands.command(
+        name="practice_exam", description="Take a full practice exam (one per group)"
+    )
+    @app_commands.describe(level="tech | general | extra")
+    async def practice_exam(self, interaction: discord.Interaction, level: str):
+        key = level.lower()
+        pool = self.pools.pool(key) if key in EXAMS else None
+        if pool is None:
+            return await interaction.response.send_message(
+                "Levels: tech, general, extra", ephemeral=True
+            )
+        session = self.exams.start(interaction.user.id, key, pool)
+        view = ExamView(self.exams, session, self.figures)
+        await _respond(
+            interaction,
+            view.question_embed(),
+            session.current(),
+            self.figures,
+            view=view,
+            ephemeral=True,
+        )
+
+    @app_commands.command(
+        description="Study with spaced repetition (due reviews first)"
+    )
+    @app_commands.describe(level="tech | general | extra")
+    async def study(self, interaction: discord.Interaction, level: str):
         key = level.lower()
-        if key not in POOLS:
+        pool = self.pools.pool(key)
+        if pool is None:
             return await interaction.response.send_message(
                 "Levels: tech, general, extra", ephemeral=True
             )
-        question = POOLS[key][random.randrange(0, len(POOLS[key]) - 1)]
-        embed = discord.Embed(title=f"({question["id"]}) {question["question"]}")
-        embed.add_field(name=f"Correct answer: ||{question["correct_letter"]}||", value="", inline=False)
-        for i in range(len(question["answers"])):
-            embed.add_field(name=f"{["A","B","C","D"][i]}: {question["answers"][i]}", value="", inline=False)
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        question = await self.study.next_question(interaction.user.id, pool)
+        if question is None:
+            return await interaction.response.send_message(
+                "That pool is empty.", ephemeral=True
+            )
+        view = StudyView(self.study, interaction.user.id, pool, question, self.figures)
+        await _respond(
+            interaction,
+            await view.question_embed(),
+            question,
+            self.figures,
+            view=view,
+            ephemeral=True,
+        )
+
+    pool_group = app_commands.Group(name="pool", description="Question pool tools")
+
+    @pool_group.command(
+        name="search", description="Search the question pools (words, rule or id)"
+    )
+    @app_commands.describe(
+        query="e.g. ohm's law, SWR, 97.119 or a question id like T1A01",
+        level="Only search one pool: tech | general | extra",
+    )
+    async def pool_search(
+        self,
+        interaction: discord.Interaction,
+        query: str,
+        level: Optional[str] = None,
+    ):
+        level = level.lower() if level else None
+        hit = self.index.by_id(query)
+        if hit is not None:
+            embed = _quiz_embed(hit.question, self.pools.pool(hit.level).name)
+            return await _respond(interaction, embed, hit.question, self.figures)
+
+        hits = self.index.search(query, level, limit=SEARCH_RESULTS, prefix=False)
+        if not hits:
+            return await interaction.response.send_message(
+                f"No questions match **{query}**.", ephemeral=True
+            )
+        lines = [f"`{h.question.id}` {_clip(h.question.question, 90)}" for h in hits]
+        embed = discord.Embed(title=f"Pool search: {_clip(query, 200)}")
+        embed.description = "\n".join(lines)
+        embed.set_footer(text="Search an id (e.g. T1A01) to see the full question")
+        await interaction.response.send_message(embed=embed)
+
+    @pool_search.autocomplete("query")
+    async def pool_search_complete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        if not current.strip():
+            return []
+        level = getattr(interaction.namespace, "level", None)
+        hits = self.index.search(current, level.lower() if level else None, limit=25)
+        return [
+            app_commands.Choice(
+                name=_clip(f"{h.question.id} · {h.question.question}", 100),
+                value=h.question.id,
+            )
+            for h in hits
+        ]
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+@functools.lru_cache(maxsize=EMBED_CACHE_SIZE)
+def _question_card(question: Question) -> discord.Embed:
+    """Title and choices, rendered once per question. Callers get copies."""
+    embed = discord.Embed(title=_clip(f"({question.id}) {question.question}", 256))
+    for letter, answer in zip(LETTERS, question.answers):
+        embed.add_field(name=f"{letter}: {answer}", value="", inline=False)
+    return embed
+
+
+@functools.lru_cache(maxsize=EMBED_CACHE_SIZE)
+def _quiz_card(question: Question, pool_name: str) -> discord.Embed:
+    embed = _question_card(question).copy()
+    embed.insert_field_at(
+        0,
+        name=f"Correct answer: ||{question.correct_letter}||",
+        value="",
+        inline=False,
+    )
+    embed.set_footer(text=f"Pool: {pool_name}")
+    return embed
+
+
+def _quiz_embed(question: Question, pool_name: str) -> discord.Embed:
+    """Question, choices and the correct letter behind a spoiler."""
+    return _quiz_card(question, pool_name).copy()
+
+
+def _attach_figure(
+    embed: discord.Embed, question: Question, figures: FigureStore
+) -> list[discord.File]:
+    """Point the embed at the question's figure; returns files to upload."""
+    if not question.figure:
+        return []
+    url = figures.url(question.figure)
+    if url is not None:
+        embed.set_image(url=url)
+        return []
+    data = figures.load(question.figure)
+    if data is None:
+        embed.add_field(name="Figure", value=question.figure, inline=False)
+        return []
+    embed.set_image(url=f"attachment://{question.figure}")
+    return [discord.File(io.BytesIO(data), filename=question.figure)]
+
+
+async def _respond(
+    interaction: discord.Interaction,
+    embed: discord.Embed,
+    question: Question,
+    figures: FigureStore,
+    *,
+    edit: bool = False,
+    **kwargs,
+) -> None:
+    """Send (or edit to) a question embed, uploading its figure only if needed."""
+    files = _attach_figure(embed, question, figures)
+    if edit:
+        # Replacing attachments also drops the previous question's figure
+        await interaction.response.edit_message(
+            embed=embed, attachments=files, **kwargs
+        )
+    else:
+        await interaction.response.send_message(embed=embed, files=files, **kwargs)
+    if files:
+        message = await interaction.original_response()
+        for attachment in message.attachments:
+            if attachment.filename == question.figure:
+                figures.remember(question.figure, attachment.url)
+
+
+class StudyView(discord.ui.View):
+    """Answer buttons for a study session; each answer schedules the next card."""
+
+    def __init__(
+        self,
+        study: StudyService,
+        user_id: int,
+        pool: QuestionPool,
+        question: Question,
+        figures: FigureStore,
+    ):
+        super().__init__(timeout=1800)
+        self.study = study
+        self.figures = figures
+        self.user_id = user_id
+        self.pool = pool
+        self.question = question
+        self.feedback = ""
+        self.reviewed = 0
+        self.right = 0
+        for i in range(len(question.answers)):
+            button = discord.ui.Button(
+                label=LETTERS[i], style=discord.ButtonStyle.primary, row=0
+            )
+            button.callback = self._grader(i)
+            self.add_item(button)
+        stop = discord.ui.Button(label="Stop", style=discord.ButtonStyle.danger, row=1)
+        stop.callback = self._finish
+        self.add_item(stop)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
+
+    async def question_embed(self) -> discord.Embed:
+        embed = _question_card(self.question).copy()
+        p = await self.study.progress(self.user_id, self.pool)
+        footer = f"Seen {p['seen']}/{p['total']} · due {p['due']} · {self.pool.name}"
+        if self.feedback:
+            footer = f"{self.feedback}\n{footer}"
+        embed.set_footer(text=footer)
+        return embed
+
+    def _grader(self, choice: int):
+        async def _grade(interaction: discord.Interaction) -> None:
+            q = self.question
+            correct = choice == q.correct
+            box = await self.study.record(self.user_id, self.pool, q.id, correct)
+            self.reviewed += 1
+            self.right += int(correct)
+            if correct:
+                self.feedback = f"{q.id}: correct (box {box}/{MAX_BOX})"
+            else:
+                self.feedback = f"{q.id}: incorrect, answer was {q.correct_letter}"
+            nxt = await self.study.next_question(self.user_id, self.pool)
+            if nxt is None:
+                return await self._finish(interaction)
+            self.question = nxt
+            await _respond(
+                interaction,
+                await self.question_embed(),
+                nxt,
+                self.figures,
+                edit=True,
+                view=self,
+            )
+
+        return _grade
+
+    async def _finish(self, interaction: discord.Interaction) -> None:
+        self.stop()
+        p = await self.study.progress(self.user_id, self.pool)
+        boxes = " · ".join(f"{i}: {n}" for i, n in enumerate(p["boxes"]))
+        embed = discord.Embed(
+            title="Study session done",
+            description=f"**{self.right}/{self.reviewed}** correct this session\n"
+            f"Seen {p['seen']}/{p['total']} · due now {p['due']}",
+        )
+        embed.add_field(name="Leitner boxes", value=boxes, inline=False)
+        embed.set_footer(text=self.pool.name)
+        await interaction.response.edit_message(embed=embed, attachments=[], view=None)
+
+
+class ExamView(discord.ui.View):
+    """A/B/C/D buttons that grade one question at a time (exam taker only)."""
+
+    def __init__(
+        self, exams: PracticeExams, session: ExamSession, figures: FigureStore
+    ):
+        super().__init__(timeout=1800)
+        self.exams = exams
+        self.session = session
+        self.figures = figures
+        self.feedback = ""
+        for i in range(len(session.current().answers)):
+            button = discord.ui.Button(
+                label=LETTERS[i], style=discord.ButtonStyle.primary, row=0
+            )
+            button.callback = self._grader(i)
+            self.add_item(button)
+        stop = discord.ui.Button(
+            label="End exam", style=discord.ButtonStyle.danger, row=1
+        )
+        stop.callback = self._finish
+        self.add_item(stop)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.session.user_id
+
+    def question_embed(self) -> discord.Embed:
+        s = self.session
+        embed = _question_card(s.current()).copy()
+        embed.set_author(name=f"Question {s.pos + 1}/{len(s)}")
+        footer = f"Pool: {s.pool.name}"
+        if self.feedback:
+            footer = f"{self.feedback} · {footer}"
+        embed.set_footer(text=footer)
+        return embed
+
+    def result_embed(self) -> discord.Embed:
+        s = self.session
+        info = EXAMS[s.level]
+        score = s.score()
+        verdict = "PASS ✅" if score >= info["min_correct"] else "not yet ❌"
+        embed = discord.Embed(
+            title=f"{s.level.title()} practice exam: {verdict}",
+            description=f"**{score}/{len(s)}** correct (pass: {info['pass']})",
+        )
+        if s.pos < len(s):
+            embed.description += f"\nEnded after {s.pos} question(s)."
+        missed = s.missed()
+        if missed:
+            lines = [f"`{q.id}` → {q.correct_letter}" for q in missed[:25]]
+            if len(missed) > 25:
+                lines.append(f"…and {len(missed) - 25} more")
+            embed.add_field(name="Missed", value="\n".join(lines), inline=False)
+        embed.set_footer(text=f"Pool: {s.pool.name}")
+        return embed
+
+    def _grader(self, choice: int):
+        async def _grade(interaction: discord.Interaction) -> None:
+            current = self.exams.get(self.session.user_id)
+            if current is not self.session:
+                # Dropped after the exam TTL, or a newer exam replaced it
+                if current is None:
+                    content = "This exam expired. Start a new one with /practice_exam."
+                else:
+                    content = "This exam was replaced by a newer one."
+                self.stop()
+                return await interaction.response.edit_message(
+                    content=content,
+                    embed=None,
+                    attachments=[],
+                    view=None,
+                )
+            q = self.session.answer(choice)
+            if choice == q.correct:
+                self.feedback = f"{q.id}: correct"
+            else:
+                self.feedback = f"{q.id}: incorrect, answer was {q.correct_letter}"
+            if self.session.done:
+                return await self._finish(interaction)
+            await _respond(
+                interaction,
+                self.question_embed(),
+                self.session.current(),
+                self.figures,
+                edit=True,
+                view=self,
+            )
+
+        return _grade
 
+    async def _finish(self, interaction: discord.Interaction) -> None:
+        if self.exams.get(self.session.user_id) is self.session:
+            self.exams.end(self.session.user_id)
+        self.stop()
+        await interaction.response.edit_message(
+            embed=self.result_embed(), attachments=[], view=None
+        )
 
 
 async def setup(bot):
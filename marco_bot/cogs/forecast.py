@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import os
+from zoneinfo import ZoneInfo
+
+import aiohttp
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from ..models.forecast_models import Forecast
+from ..services.forecast_services import ForecastService
+from ..services.nws_services import NWS_API
+
+log = logging.getLogger(__name__)
+
+EMBED_COLOR = 0x1E88E5
+LOCAL_TZ = ZoneInfo("America/New_York")
+
+# --------- Feed (env can point it at a stub server) ---------
+NWS_BASE_URL = os.getenv("NWS_BASE_URL", NWS_API)
+
+# --------- Scheduled post to FORECAST_URL (local time) ---------
+FORECAST_POST_TIMES = [
+    dt.time(hour=6, tzinfo=LOCAL_TZ),
+    dt.time(hour=17, tzinfo=LOCAL_TZ),
+]
+DAILY_PERIODS = 6  # three days of day/night periods
+HOURLY_PERIODS = 12
+
+
+def forecast_embed(fc: Forecast, title: str) -> discord.Embed:
+    embed = discord.Embed(title=title, color=EMBED_COLOR)
+    if fc.hourly:
+        lines = []
+        for p in fc.periods[:HOURLY_PERIODS]:
+            when = f"<t:{int(p.start)}:t>" if p.start else p.name
+            rain = f" · {p.precip_chance}% rain" if p.precip_chance else ""
+            lines.append(
+                f"{when} **{p.temperature}°{p.temperature_unit}** "
+                f"{p.short_forecast} · {p.wind_direction} {p.wind_speed}{rain}"
+            )
+        embed.description = "\n".join(lines)[:4096]
+    else:
+        for p in fc.periods[:DAILY_PERIODS]:
+            embed.add_field(
+                name=f"{p.name} — {p.temperature}°{p.temperature_unit}",
+                value=(p.detailed_forecast or p.short_forecast or "—")[:1024],
+                inline=False,
+            )
+    if fc.updated:
+        embed.set_footer(text="NWS forecast, updated")
+        embed.timestamp = dt.datetime.fromtimestamp(fc.updated, dt.timezone.utc)
+    return embed
+
+
+class ForecastCog(commands.Cog):
+    """
+    NWS gridpoint forecast for the configured WFO grid (WFO_ID, GRID_X/Y):
+      - /forecast (12-hour periods, or hourly) served from one shared cache
+      - Posted to FORECAST_URL every morning and evening
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        cfg = bot.config
+        self.title = f"Forecast — NWS {cfg.wfo_id} {cfg.grid_x},{cfg.grid_y}"
+        self.svc = ForecastService(
+            cfg.nws_contact_email,
+            cfg.wfo_id,
+            cfg.grid_x,
+            cfg.grid_y,
+            base_url=NWS_BASE_URL,
+        )
+
+    async def cog_load(self):
+        await self.svc.start()
+        if "FORECAST_URL" in self.bot.webhooks:
+            self.post_forecast.start()
+
+    async def cog_unload(self):
+        self.post_forecast.cancel()
+        try:
+            await self.svc.close()
+        except Exception:
+            pass
+
+    @tasks.loop(time=FORECAST_POST_TIMES)
+    async def post_forecast(self):
+        try:
+            fc = await self.svc.get()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            log.exception("Scheduled forecast fetch failed")
+            return
+        embed = forecast_embed(fc, self.title)
+        await self.bot.webhooks.submit("FORECAST_URL", embeds=[embed.to_dict()])
+
+    @app_commands.command(name="forecast", description="NWS forecast for campus")
+    @app_commands.describe(hourly="Show the next 12 hours instead of 3 days")
+    @app_commands.checks.cooldown(1, 10)
+    async def forecast(self, interaction: discord.Interaction, hourly: bool = False):
+        await interaction.response.defer()
+        try:
+            fc = await self.svc.get(hourly)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            log.exception("Forecast fetch failed")
+            # The deferred reply is public; drop it so the error stays private
+            await interaction.delete_original_response()
+            return await interaction.followup.send(
+                "The NWS forecast is unavailable right now.", ephemeral=True
+            )
+        title = self.title + (" (hourly)" if hourly else "")
+        await interaction.followup.send(embed=forecast_embed(fc, title))
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(ForecastCog(bot))
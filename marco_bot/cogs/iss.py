@@ -8,10 +8,14 @@ from discord import app_commands
 from discord.ext import commands
 
 from marco_bot.services.iss_services import ISSService
+from marco_bot.services.iss_store import ISSStore
 
 # --------- HARD-CODED CHANNEL ID (env can override) ---------
 ISS_CHANNEL_ID = int(os.getenv("ISS_CHANNEL_ID", "1331398977291161733"))  
 
+# Subscriptions + last announced passes survive restarts here
+ISS_DB_PATH = os.getenv("ISS_DB", "data/iss.sqlite3")
+
 # --------- DEFAULT LOCATION: Orlando / UCF ---------
 DEFAULT_LAT = 28.6024
 DEFAULT_LON = -81.2001
@@ -40,9 +44,11 @@ class ISS(commands.Cog):
     """
     ISS pass reminders:
       - Single scheduler (started in cog_load)
-      - Cache-only (no DB)
-      - Posts once to the hard-coded channel when within 6h of a pass
-      - Auto-subscribes all guilds to Orlando/UCF on startup (no /subscribe needed)
+      - Settings persisted to SQLite (ISS_DB) and restored on startup
+      - Posts once when within 6h of a pass, to the server's chosen channel
+        (or the hard-coded channel by default)
+      - Auto-subscribes guilds without saved settings to Orlando/UCF on startup (no /subscribe needed);
+        guilds that ran /unsubscribe stay unsubscribed across restarts
       - Commands restricted to admins OR whitelisted users (by ID)
     """
     def __init__(self, bot: commands.Bot):
@@ -50,6 +56,9 @@ class ISS(commands.Cog):
         self.svc = ISSService.get()
 
     async def cog_load(self):
+        # Restore saved subscriptions first so defaults below don't overwrite them
+        restored = await self.svc.load(ISSStore(ISS_DB_PATH))
+
         # Resolve the hard-coded channel once and attach the service
         ch = self.bot.get_channel(ISS_CHANNEL_ID)
         if ch is None:
@@ -67,8 +76,11 @@ class ISS(commands.Cog):
             print(f"[ISS] Channel {ISS_CHANNEL_ID} is not a messageable channel (resolved={type(ch).__name__ if ch else None}). ISS reminders disabled.")
             return
 
-        # --------- AUTO-SUBSCRIBE ALL CURRENT GUILDS TO ORLANDO/UCF ---------
+        # --------- AUTO-SUBSCRIBE NEW GUILDS TO ORLANDO/UCF ---------
+        added = 0
         for g in self.bot.guilds:
+            if await self.svc.get_guild(g.id) is not None or self.svc.is_unsubscribed(g.id):
+                continue
             await self.svc.upsert_guild(
                 g.id,
                 lat=DEFAULT_LAT,
@@ -76,7 +88,8 @@ class ISS(commands.Cog):
                 alt_m=DEFAULT_ALT_M,
                 lead_seconds=DEFAULT_LEAD_SECONDS,
             )
-        print(f"[ISS] Auto-subscribed {len(self.bot.guilds)} guild(s) to Orlando/UCF defaults.")
+            added += 1
+        print(f"[ISS] Restored {restored} saved guild(s); auto-subscribed {added} to Orlando/UCF defaults.")
 
     async def cog_unload(self):
         try:
@@ -87,6 +100,8 @@ class ISS(commands.Cog):
     # When the bot joins a new guild later, auto-subscribe it too.
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild):
+        if await self.svc.get_guild(guild.id) is not None or self.svc.is_unsubscribed(guild.id):
+            return  # rejoined: keep its saved settings (or its opt-out)
         await self.svc.upsert_guild(
             guild.id,
             lat=DEFAULT_LAT,
@@ -109,6 +124,7 @@ class ISS(commands.Cog):
         lon="Longitude (-180..180)",
         alt_m="Altitude in meters (optional, 0..10000)",
         lead_seconds="Lead time in seconds (default 21600 = 6 hours)",
+        channel="Channel for this server's reminders (default: the ISS channel)",
     )
     async def subscribe(
         self,
@@ -117,6 +133,7 @@ class ISS(commands.Cog):
         lon: float = DEFAULT_LON,
         alt_m: Optional[int] = DEFAULT_ALT_M,
         lead_seconds: Optional[int] = DEFAULT_LEAD_SECONDS,
+        channel: Optional[discord.TextChannel] = None,
     ):
         if not interaction.guild_id:
             await interaction.response.send_message("Use this in a server.", ephemeral=True)
@@ -127,6 +144,7 @@ class ISS(commands.Cog):
         lon = max(-180.0, min(180.0, float(lon)))
         alt_m = None if alt_m is None else max(0, min(10000, int(alt_m)))
         lead = max(60, int(lead_seconds or DEFAULT_LEAD_SECONDS))
+        channel_id = channel.id if channel else None
 
         await self.svc.upsert_guild(
             interaction.guild_id,
@@ -134,10 +152,11 @@ class ISS(commands.Cog):
             lon=lon,
             alt_m=alt_m,
             lead_seconds=lead,
+            channel_id=channel_id,
         )
 
         await interaction.response.send_message(
-            f"✅ Subscribed (or updated). I’ll post exactly once in <#{ISS_CHANNEL_ID}> ~6h before each pass.\n"
+            f"✅ Subscribed (or updated). I’ll post exactly once in <#{channel_id or ISS_CHANNEL_ID}> ~6h before each pass.\n"
             f"• Location: lat `{lat}`, lon `{lon}`, alt `{alt_m or 0}m`\n"
             f"• Lead window: `{lead}` seconds.",
             ephemeral=True,
@@ -154,6 +173,7 @@ class ISS(commands.Cog):
         lon="Longitude (-180..180)",
         alt_m="Altitude in meters (0..10000)",
         lead_seconds="Lead time in seconds (>=60; default 21600 = 6 hours)",
+        channel="Channel for this server's reminders",
     )
     async def update(
         self,
@@ -162,6 +182,7 @@ class ISS(commands.Cog):
         lon: Optional[float] = None,
         alt_m: Optional[int] = None,
         lead_seconds: Optional[int] = None,
+        channel: Optional[discord.TextChannel] = None,
     ):
         if not interaction.guild_id:
             await interaction.response.send_message("Use this in a server.", ephemeral=True)
@@ -175,12 +196,14 @@ class ISS(commands.Cog):
         base_lon = DEFAULT_LON if cfg is None else cfg.lon
         base_alt = DEFAULT_ALT_M if cfg is None else cfg.alt_m
         base_lead = DEFAULT_LEAD_SECONDS if cfg is None else cfg.lead_seconds
+        base_channel = None if cfg is None else cfg.channel_id
 
         # Merge with provided overrides
         new_lat = base_lat if lat is None else max(-90.0, min(90.0, float(lat)))
         new_lon = base_lon if lon is None else max(-180.0, min(180.0, float(lon)))
         new_alt = base_alt if alt_m is None else max(0, min(10000, int(alt_m)))
         new_lead = base_lead if lead_seconds is None else max(60, int(lead_seconds))
+        new_channel = base_channel if channel is None else channel.id
 
         await self.svc.upsert_guild(
             interaction.guild_id,
@@ -188,10 +211,11 @@ class ISS(commands.Cog):
             lon=new_lon,
             alt_m=new_alt,
             lead_seconds=new_lead,
+            channel_id=new_channel,
         )
 
         await interaction.response.send_message(
-            f"🔁 Updated for <#{ISS_CHANNEL_ID}> — lat `{new_lat}`, lon `{new_lon}`, alt `{new_alt or 0}m`, "
+            f"🔁 Updated for <#{new_channel or ISS_CHANNEL_ID}> — lat `{new_lat}`, lon `{new_lon}`, alt `{new_alt or 0}m`, "
             f"lead `{new_lead}` seconds.",
             ephemeral=True,
         )
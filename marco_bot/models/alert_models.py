@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils.geofence import geojson_rings
+
+__all__ = ["Alert", "AlertEvent", "Ring"]
+
+# One polygon ring as GeoJSON orders it: ((lon, lat), ...)
+Ring = Tuple[Tuple[float, float], ...]
+
+
+def _ts(value: Any) -> Optional[float]:
+    """NWS ISO-8601 timestamp -> epoch seconds (None if missing/bad)."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return dt.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def _codes(geocode: Dict[str, Any], key: str) -> Tuple[str, ...]:
+    vals = geocode.get(key) or ()
+    return tuple(str(v) for v in vals)
+
+
+@dataclass(frozen=True)
+class Alert:
+    """One NWS alert message (a GeoJSON feature from ``/alerts``).
+
+    Every issuance has its own ``id``; an update or cancellation is a new
+    message whose ``references`` list the ids it replaces. Timestamps are
+    epoch seconds. ``polygons`` is empty for zone/county-based alerts.
+    """
+
+    id: str
+    event: str
+    headline: str = ""
+    message_type: str = "Alert"  # Alert / Update / Cancel
+    status: str = "Actual"  # Actual / Exercise / System / Test / Draft
+    severity: str = "Unknown"
+    urgency: str = "Unknown"
+    certainty: str = "Unknown"
+    sender_name: str = ""
+    area_desc: str = ""
+    description: str = ""
+    instruction: str = ""
+    url: str = ""
+
+    sent: Optional[float] = None
+    effective: Optional[float] = None
+    onset: Optional[float] = None
+    expires: Optional[float] = None
+    ends: Optional[float] = None
+
+    ugc: Tuple[str, ...] = ()  # NWS zone/county codes, e.g. FLC095
+    same: Tuple[str, ...] = ()  # SAME/FIPS codes, e.g. 012095
+    references: Tuple[str, ...] = ()  # ids of earlier messages replaced
+    polygons: Tuple[Ring, ...] = ()
+
+    @property
+    def is_cancel(self) -> bool:
+        return self.message_type == "Cancel"
+
+    @classmethod
+    def from_feature(cls, feature: Dict[str, Any]) -> "Alert":
+        p = feature.get("properties") or {}
+        geocode = p.get("geocode") or {}
+        refs = tuple(
+            str(r["identifier"])
+            for r in (p.get("references") or ())
+            if isinstance(r, dict) and r.get("identifier")
+        )
+        return cls(
+            id=str(p.get("id") or feature.get("id") or ""),
+            event=p.get("event") or "",
+            headline=p.get("headline") or "",
+            message_type=p.get("messageType") or "Alert",
+            status=p.get("status") or "Actual",
+            severity=p.get("severity") or "Unknown",
+            urgency=p.get("urgency") or "Unknown",
+            certainty=p.get("certainty") or "Unknown",
+            sender_name=p.get("senderName") or "",
+            area_desc=p.get("areaDesc") or "",
+            description=p.get("description") or "",
+            instruction=p.get("instruction") or "",
+            url=str(feature.get("id") or ""),
+            sent=_ts(p.get("sent")),
+            effective=_ts(p.get("effective")),
+            onset=_ts(p.get("onset")),
+            expires=_ts(p.get("expires")),
+            ends=_ts(p.get("ends")),
+            ugc=_codes(geocode, "UGC"),
+            same=_codes(geocode, "SAME"),
+            references=refs,
+            polygons=geojson_rings(feature.get("geometry")),
+        )
+
+
+@dataclass(frozen=True)
+class AlertEvent:
+    """What the poller emits: an alert that is new to us, or one that
+    replaces (updates / cancels) alerts we'd already seen."""
+
+    kind: str  # "new" / "update" / "cancel"
+    alert: Alert
+    replaces: Tuple[str, ...] = ()
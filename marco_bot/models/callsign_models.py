@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Optional, Dict, List
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Optional, Dict, List
 
 
 __all__ = ["CallsignRecord"]
@@ -47,3 +47,12 @@ class CallsignRecord:
 
     # Provenance
     sources: Dict[str, bool] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CallsignRecord":
+        # Ignore keys from older/newer layouts so persisted rows stay loadable
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .alert_models import _ts
+
+__all__ = ["Forecast", "ForecastPeriod"]
+
+
+@dataclass(frozen=True)
+class ForecastPeriod:
+    """One period of an NWS gridpoint forecast ("Tonight", or one hour)."""
+
+    name: str
+    start: Optional[float]
+    end: Optional[float]
+    is_daytime: bool
+    temperature: Optional[int]
+    temperature_unit: str = "F"
+    wind_speed: str = ""
+    wind_direction: str = ""
+    precip_chance: Optional[int] = None  # percent
+    short_forecast: str = ""
+    detailed_forecast: str = ""
+
+    @classmethod
+    def from_dict(cls, p: Dict[str, Any]) -> "ForecastPeriod":
+        pop = (p.get("probabilityOfPrecipitation") or {}).get("value")
+        return cls(
+            name=p.get("name") or "",
+            start=_ts(p.get("startTime")),
+            end=_ts(p.get("endTime")),
+            is_daytime=bool(p.get("isDaytime")),
+            temperature=p.get("temperature"),
+            temperature_unit=p.get("temperatureUnit") or "F",
+            wind_speed=p.get("windSpeed") or "",
+            wind_direction=p.get("windDirection") or "",
+            precip_chance=None if pop is None else int(pop),
+            short_forecast=p.get("shortForecast") or "",
+            detailed_forecast=p.get("detailedForecast") or "",
+        )
+
+
+@dataclass(frozen=True)
+class Forecast:
+    """A gridpoint forecast (``hourly`` or the 12-hour periods)."""
+
+    hourly: bool
+    periods: Tuple[ForecastPeriod, ...]
+    updated: Optional[float] = None  # when NWS last updated the grid
+    generated: Optional[float] = None
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any], hourly: bool) -> "Forecast":
+        props = doc.get("properties") or {}
+        return cls(
+            hourly=hourly,
+            periods=tuple(
+                ForecastPeriod.from_dict(p) for p in props.get("periods") or ()
+            ),
+            updated=_ts(props.get("updateTime")),
+            generated=_ts(props.get("generatedAt")),
+        )
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+__all__ = ["Question", "LETTERS"]
+
+LETTERS = "ABCD"
+
+
+@dataclass(frozen=True, slots=True)
+class Question:
+    """One multiple-choice question from an NCVEC question pool.
+
+    ``id`` looks like ``T1A01``: element letter, subelement digit, group
+    letter, then the question number within the group.
+    """
+
+    id: str
+    question: str
+    answers: Tuple[str, ...]
+    correct: int  # index into answers
+    refs: str = ""  # e.g. "[97.1]"
+    figure: str = ""  # e.g. "t-1.png", empty if none
+
+    @property
+    def correct_letter(self) -> str:
+        return LETTERS[self.correct]
+
+    @property
+    def subelement(self) -> str:
+        return self.id[:2]  # "T1"
+
+    @property
+    def group(self) -> str:
+        return self.id[:3]  # "T1A"
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import discord
+
+from ..utils.ratelimit import TokenBucket
+
+__all__ = ["Announcement", "AnnounceQueue"]
+
+log = logging.getLogger(__name__)
+
+MAX_MESSAGE_CHARS = 2000
+
+ChannelResolver = Callable[[int], Awaitable[Optional[discord.abc.Messageable]]]
+
+
+class Announcement:
+    """One line for one channel, with delivery callbacks.
+
+    ``on_sent`` runs once the line is in a delivered message; ``on_failed``
+    runs if it can never be delivered there (channel gone / no access) or
+    ``expires_at`` passes first.
+    """
+
+    __slots__ = ("channel_id", "line", "expires_at", "on_sent", "on_failed")
+
+    def __init__(
+        self,
+        channel_id: int,
+        line: str,
+        expires_at: float,
+        on_sent: Optional[Callable[[], None]] = None,
+        on_failed: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.channel_id = channel_id
+        self.line = line[:MAX_MESSAGE_CHARS]
+        self.expires_at = expires_at
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+
+
+class _Outbox:
+    __slots__ = ("items", "next_send", "attempts", "busy")
+
+    def __init__(self) -> None:
+        self.items: List[Announcement] = []
+        self.next_send = 0.0
+        self.attempts = 0
+        self.busy = False
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    if isinstance(e, discord.RateLimited):
+        return float(e.retry_after)
+    if isinstance(e, discord.HTTPException) and e.status == 429:
+        headers = getattr(e.response, "headers", None) or {}
+        try:
+            return float(headers.get("Retry-After", 1.0))
+        except (TypeError, ValueError):
+            return 1.0
+    return None
+
+
+def _pack(items: List[Announcement]) -> List[List[Announcement]]:
+    """Group lines into as few messages as fit Discord's length limit."""
+    batches: List[List[Announcement]] = []
+    size = 0
+    for a in items:
+        n = len(a.line) + 1
+        if not batches or size + n > MAX_MESSAGE_CHARS:
+            batches.append([])
+            size = 0
+        batches[-1].append(a)
+        size += n
+    return batches
+
+
+class AnnounceQueue:
+    """
+    Retrying, rate-limit aware fan-out of announcement lines:
+      - Lines are queued per channel; everything queued for a channel when
+        it's next allowed to post goes out coalesced into one message
+        (split only at Discord's 2000-char limit)
+      - Each channel posts at most once per ``cooldown_s`` and has one
+        request in flight (Discord buckets message sends per channel);
+        ``max_concurrency`` channels send at once under a global token
+        bucket
+      - A 429 waits out its Retry-After; other errors back off and retry,
+        so a line is only given up when its channel is gone/forbidden or
+        it expires
+    """
+
+    def __init__(
+        self,
+        resolve: ChannelResolver,
+        *,
+        cooldown_s: float = 60.0,
+        max_concurrency: int = 8,
+        global_rate: float = 40.0,
+        max_backoff_s: float = 600.0,
+    ) -> None:
+        self.resolve = resolve
+        self.cooldown_s = float(cooldown_s)
+        self.max_backoff_s = float(max_backoff_s)
+        self._outboxes: Dict[int, _Outbox] = {}
+        self._sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._bucket = TokenBucket(global_rate, burst=max(1, int(max_concurrency)))
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._sends: set[asyncio.Task] = set()
+
+        self.sent_messages = 0
+        self.sent_lines = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    # ---------- Lifecycle ----------
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="announce-queue")
+
+    async def close(self) -> None:
+        tasks = [t for t in (self._task, *self._sends) if t is not None]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._sends.clear()
+
+    # ---------- Queue ----------
+    def submit(self, item: Announcement) -> None:
+        box = self._outboxes.get(item.channel_id)
+        if box is None:
+            box = self._outboxes[item.channel_id] = _Outbox()
+        box.items.append(item)
+        self._wake.set()
+
+    def pending(self) -> int:
+        return sum(len(b.items) for b in self._outboxes.values())
+
+    # ---------- Dispatcher ----------
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            wake_at: Optional[float] = None
+            for cid, box in list(self._outboxes.items()):
+                if box.busy:
+                    continue
+                if not box.items:
+                    if now >= box.next_send:
+                        del self._outboxes[cid]  # idle and out of cool-down
+                    continue
+                if now >= box.next_send:
+                    box.busy = True
+                    t = asyncio.create_task(self._flush(cid, box))
+                    self._sends.add(t)
+                    t.add_done_callback(self._sends.discard)
+                elif wake_at is None or box.next_send < wake_at:
+                    wake_at = box.next_send
+            timeout = None if wake_at is None else max(0.0, wake_at - now)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fail(self, box: _Outbox, items: List[Announcement], reason: str) -> None:
+        dead = set(map(id, items))
+        box.items = [a for a in box.items if id(a) not in dead]
+        self.failed += len(items)
+        for a in items:
+            if a.on_failed is not None:
+                a.on_failed(reason)
+
+    async def _flush(self, cid: int, box: _Outbox) -> None:
+        try:
+            await self._send_box(cid, box)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("Announcement flush to channel %s failed", cid)
+            self._backoff(box)
+        finally:
+            box.busy = False
+            self._wake.set()
+
+    def _backoff(self, box: _Outbox) -> None:
+        box.attempts += 1
+        self.retries += 1
+        delay = min(self.max_backoff_s, 2.0 ** min(box.attempts, 16))
+        box.next_send = time.monotonic() + delay * random.uniform(0.8, 1.2)
+
+    async def _send_box(self, cid: int, box: _Outbox) -> None:
+        now = time.time()
+        expired = [a for a in box.items if a.expires_at <= now]
+        if expired:
+            self._fail(box, expired, "expired")
+        if not box.items:
+            return
+
+        try:
+            channel = await self.resolve(cid)
+        except discord.HTTPException as e:
+            if isinstance(e, (discord.NotFound, discord.Forbidden)):
+                channel = None
+            else:
+                self._backoff(box)
+                return
+        if channel is None:
+            self._fail(box, list(box.items), "channel unavailable")
+            return
+
+        for batch in _pack(list(box.items)):
+            try:
+                async with self._sem:
+                    await self._bucket.acquire()
+                    await channel.send("\n".join(a.line for a in batch))
+            except (discord.NotFound, discord.Forbidden) as e:
+                self._fail(box, list(box.items), f"{type(e).__name__}")
+                return
+            except (discord.HTTPException, discord.RateLimited) as e:
+                wait = _retry_after(e)
+                if wait is None:
+                    self._backoff(box)
+                else:
+                    self.rate_limited += 1
+                    box.next_send = time.monotonic() + wait
+                return
+            except (OSError, asyncio.TimeoutError):
+                self._backoff(box)
+                return
+            # Delivered: only now do the lines count as announced
+            sent = set(map(id, batch))
+            box.items = [a for a in box.items if id(a) not in sent]
+            box.attempts = 0
+            self.sent_messages += 1
+            self.sent_lines += len(batch)
+            for a in batch:
+                if a.on_sent is not None:
+                    a.on_sent()
+        box.next_send = time.monotonic() + self.cooldown_s
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued_lines": self.pending(),
+            "channels": len(self._outboxes),
+            "sent_messages": self.sent_messages,
+            "sent_lines": self.sent_lines,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+        }
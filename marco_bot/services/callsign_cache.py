@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from ..models.callsign_models import CallsignRecord
+
+__all__ = [
+    "POSITIVE",
+    "NEGATIVE",
+    "PARTIAL",
+    "UNAVAILABLE",
+    "CacheEntry",
+    "CallsignCache",
+]
+
+# Lookup outcomes, each with its own TTL
+POSITIVE = "positive"  # every primary source answered
+PARTIAL = "partial"  # found, but only some sources answered
+NEGATIVE = "negative"  # no source knows this callsign
+UNAVAILABLE = "unavailable"  # nothing found, but sources failed or were skipped
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    record: Optional[CallsignRecord]  # None for negative entries
+    outcome: str
+    stored_at: float  # epoch seconds
+    expires_at: float  # fresh until here
+    stale_until: float  # may still be served (while refreshing) until here
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+
+class CallsignCache:
+    """
+    Size-bounded LRU cache with per-outcome TTLs:
+      - Positive, partial and negative results expire independently
+      - Expired entries stay servable for ``stale_s`` so callers can get an
+        immediate answer while the service refreshes in the background
+      - "Unavailable" entries briefly shield failing upstreams and are never
+        served stale
+      - Least recently used entries are evicted once ``max_entries`` is hit
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        *,
+        positive_ttl_s: float = 3600,
+        partial_ttl_s: float = 900,
+        negative_ttl_s: float = 600,
+        unavailable_ttl_s: float = 60,
+        stale_s: float = 6 * 3600,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttls = {
+            POSITIVE: float(positive_ttl_s),
+            PARTIAL: float(partial_ttl_s),
+            NEGATIVE: float(negative_ttl_s),
+            UNAVAILABLE: float(unavailable_ttl_s),
+        }
+        self.stale_s = float(stale_s)
+        self._stale = {outcome: self.stale_s for outcome in self.ttls}
+        self._stale[UNAVAILABLE] = 0.0
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _key(call: str) -> str:
+        return call.upper().strip()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, call: str) -> bool:
+        return self._key(call) in self._data
+
+    def get(self, call: str, now: Optional[float] = None) -> Optional[CacheEntry]:
+        """Return the entry if still usable (fresh or stale), else None."""
+        now = time.time() if now is None else now
+        key = self._key(call)
+        ent = self._data.get(key)
+        if ent is None:
+            self.misses += 1
+            return None
+        if not ent.is_usable(now):
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        if ent.is_fresh(now):
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return ent
+
+    def put(
+        self,
+        call: str,
+        record: Optional[CallsignRecord],
+        outcome: str,
+        now: Optional[float] = None,
+    ) -> CacheEntry:
+        now = time.time() if now is None else now
+        ttl = self.ttls[outcome]
+        ent = CacheEntry(
+            record=record,
+            outcome=outcome,
+            stored_at=now,
+            expires_at=now + ttl,
+            stale_until=now + ttl + self._stale[outcome],
+        )
+        self.insert(call, ent)
+        return ent
+
+    def insert(self, call: str, ent: CacheEntry) -> None:
+        """Store a prebuilt entry (used when restoring from another tier)."""
+        key = self._key(call)
+        self._data[key] = ent
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, call: str) -> bool:
+        return self._data.pop(self._key(call), None) is not None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache_size": len(self._data),
+            "cache_max": self.max_entries,
+            "cache_hits": self.hits,
+            "cache_stale_hits": self.stale_hits,
+            "cache_misses": self.misses,
+            "cache_evictions": self.evictions,
+            "cache_expirations": self.expirations,
+        }
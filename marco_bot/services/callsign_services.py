@@ -1,13 +1,42 @@
 from __future__ import annotations
 
 import asyncio
-import datetime as dt
-from typing import Optional, Dict, Any, List, Tuple
+import logging
+import os
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 import aiohttp
 
 from ..models.callsign_models import CallsignRecord
-
+from .callsign_cache import (
+    NEGATIVE,
+    PARTIAL,
+    POSITIVE,
+    UNAVAILABLE,
+    CacheEntry,
+    CallsignCache,
+)
+from .callsign_store import CallsignStore
+from .uls_services import ULSDatabase
+from ..utils.breaker import CircuitBreaker
+from ..utils.http import PoolLimits, PoolStats, pooled_session
+from ..utils.ratelimit import TokenBucket
+from ..utils.singleflight import SingleFlight
+
+log = logging.getLogger(__name__)
 
 # ---------- Endpoints (free) ----------
 CALLOOK_URL = "https://callook.info/{call}/json"
@@ -15,26 +44,16 @@ FCC_LV_URL = "https://data.fcc.gov/api/license-view/basicSearch/getLicenses"
 RADIOID_URL = "https://radioid.net/api/dmr/user/?query={call}"
 HAMDB_URL = "http://api.hamdb.org/{call}/json/hamdb"  # optional, free
 
-
-# ---------- Simple TTL cache (1 hour) ----------
-_CACHE: Dict[str, Tuple[dt.datetime, CallsignRecord]] = {}
-_TTL = dt.timedelta(hours=1)
+USER_AGENT = "mARCoBot/1.0"
 
 
-def _cache_get(call: str) -> Optional[CallsignRecord]:
-    key = call.upper().strip()
-    ent = _CACHE.get(key)
-    if not ent:
-        return None
-    ts, rec = ent
-    if dt.datetime.utcnow() - ts > _TTL:
-        _CACHE.pop(key, None)
-        return None
-    return rec
-
-
-def _cache_put(rec: CallsignRecord) -> None:
-    _CACHE[rec.callsign.upper()] = (dt.datetime.utcnow(), rec)
+# ---------- Bounded LRU + TTL cache ----------
+_CACHE = CallsignCache(
+    max_entries=int(os.getenv("CALLSIGN_CACHE_SIZE", "2048")),
+    positive_ttl_s=3600,  # full answer: 1 hour
+    partial_ttl_s=900,  # some sources missing: retry sooner
+    negative_ttl_s=600,  # typos / unknown calls: 10 minutes
+)
 
 
 def clear_callsign_cache() -> None:
@@ -43,6 +62,8 @@ def clear_callsign_cache() -> None:
 
 
 # ---------- HTTP helpers ----------
+# Fetchers swallow errors by default; strict=True re-raises them so the
+# service can feed its circuit breakers.
 async def _fetch_json(
     session: aiohttp.ClientSession, url: str, params: Dict[str, Any] | None = None
 ) -> Any:
@@ -55,19 +76,20 @@ async def _fetch_json(
 
 # ---------- Source fetchers ----------
 async def fetch_callook(
-    session: aiohttp.ClientSession, call: str
+    session: aiohttp.ClientSession, call: str, *, strict: bool = False
 ) -> Optional[Dict[str, Any]]:
     try:
         data = await _fetch_json(session, CALLOOK_URL.format(call=call.upper()))
         if data.get("status") == "VALID":
             return data
     except Exception:
-        pass
+        if strict:
+            raise
     return None
 
 
 async def fetch_fcc_lv(
-    session: aiohttp.ClientSession, call: str
+    session: aiohttp.ClientSession, call: str, *, strict: bool = False
 ) -> Optional[Dict[str, Any]]:
     # FCC License View basicSearch
     params = {"searchValue": call.upper(), "format": "json"}
@@ -80,10 +102,14 @@ async def fetch_fcc_lv(
                 return lic
         return lic_list[0] if lic_list else None
     except Exception:
+        if strict:
+            raise
         return None
 
 
-async def fetch_radioid(session: aiohttp.ClientSession, call: str) -> List[str]:
+async def fetch_radioid(
+    session: aiohttp.ClientSession, call: str, *, strict: bool = False
+) -> List[str]:
     # DMR user database lookup
     try:
         data = await _fetch_json(session, RADIOID_URL.format(call=call.upper()))
@@ -97,20 +123,46 @@ async def fetch_radioid(session: aiohttp.ClientSession, call: str) -> List[str]:
                     out.append(rid)
         return sorted(set(out))
     except Exception:
+        if strict:
+            raise
         return []
 
 
 async def fetch_hamdb(
-    session: aiohttp.ClientSession, call: str
+    session: aiohttp.ClientSession, call: str, *, strict: bool = False
 ) -> Optional[Dict[str, Any]]:
     # Free, no key needed; nice supplemental city/state/zip; US-focused
     try:
         data = await _fetch_json(session, HAMDB_URL.format(call=call.upper()))
         return (data or {}).get("hamdb", {}).get("callsign")
     except Exception:
+        if strict:
+            raise
         return None
 
 
+FETCHERS = {
+    "callook": fetch_callook,
+    "fcc_lv": fetch_fcc_lv,
+    "hamdb": fetch_hamdb,
+    "radioid": fetch_radioid,
+}
+
+# Polite per-source request rates (requests/s, burst), shared by all lookups
+SOURCE_RATES: Dict[str, Tuple[float, int]] = {
+    "callook": (5.0, 10),
+    "fcc_lv": (5.0, 10),
+    "hamdb": (5.0, 10),
+    "radioid": (5.0, 10),
+}
+
+# Primary sources are awaited up to the lookup deadline; secondary ones only
+# get a short grace period once the primaries are in.
+PRIMARY_SOURCES = ("callook", "fcc_lv")
+LOOKUP_BUDGET_S = 4.0
+SECONDARY_GRACE_S = 0.75
+
+
 # ---------- Merge helpers ----------
 def _to_float(x: Any) -> Optional[float]:
     try:
@@ -187,33 +239,531 @@ def _merge_record(
     return rec
 
 
-# ---------- Public API ----------
-async def lookup_callsign(call: str) -> Optional[CallsignRecord]:
-    """Lookup a US callsign from free sources and merge into a single record.
-
-    Returns None if nothing is found. Results are cached for 1 hour.
+# Record fields each source can supply (see _merge_record), in query order
+SOURCE_FIELDS: Dict[str, FrozenSet[str]] = {
+    "callook": frozenset(
+        {
+            "name",
+            "type",
+            "oper_class",
+            "trustee_callsign",
+            "trustee_name",
+            "city",
+            "state",
+            "latitude",
+            "longitude",
+            "grid",
+            "expires",
+            "frn",
+            "uls_url",
+        }
+    ),
+    "fcc_lv": frozenset(
+        {"status", "expires", "radio_service", "uls_url", "frn", "name"}
+    ),
+    "hamdb": frozenset({"name", "city", "state"}),
+    "radioid": frozenset({"dmr_ids"}),
+}
+
+# Sources that can establish that a callsign exists at all
+_IDENTITY_SOURCES = frozenset({"callook", "fcc_lv", "hamdb"})
+
+# FCC License View wins over Callook for these (same as _merge_record)
+_FCC_AUTHORITATIVE = frozenset({"status", "expires", "radio_service", "uls_url", "frn"})
+
+# Field requirement sets for the /call lookup views
+SHORT_FIELDS: FrozenSet[str] = frozenset({"name", "grid", "state", "oper_class"})
+LONG_FIELDS: FrozenSet[str] = SHORT_FIELDS | {
+    "status",
+    "expires",
+    "city",
+    "latitude",
+    "longitude",
+    "radio_service",
+    "trustee_callsign",
+    "trustee_name",
+    "uls_url",
+}
+DMR_FIELDS: FrozenSet[str] = frozenset({"dmr_ids"})
+ALL_FIELDS: FrozenSet[str] = frozenset().union(*SOURCE_FIELDS.values())
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == "" or value == []
+
+
+def _missing_fields(
+    rec: CallsignRecord, fields: Iterable[str] = ALL_FIELDS
+) -> set[str]:
+    return {f for f in fields if _is_blank(getattr(rec, f))}
+
+
+def _fill_missing(
+    rec: CallsignRecord,
+    other: CallsignRecord,
+    overwrite: FrozenSet[str] = frozenset(),
+) -> None:
+    """Copy fields from ``other`` where ``rec`` has nothing (or in ``overwrite``)."""
+    for f in _missing_fields(rec) | overwrite:
+        value = getattr(other, f)
+        if not _is_blank(value):
+            setattr(rec, f, value)
+    rec.sources.update({k: v for k, v in other.sources.items() if v})
+
+
+def _plan_sources(
+    rec: Optional[CallsignRecord],
+    fields: FrozenSet[str],
+    tried: Iterable[str],
+    minimal: bool,
+) -> List[str]:
+    """Untried sources that can supply requested fields ``rec`` still lacks.
+
+    ``minimal`` picks sources greedily in SOURCE_FIELDS order, skipping any
+    whose fields an earlier pick already covers.
     """
-    call = (call or "").upper().strip()
-    if not call:
-        return None
+    need = set(fields) if rec is None else _missing_fields(rec, fields)
+    plan = []
+    for src, provides in SOURCE_FIELDS.items():
+        if src in tried or not (provides & need):
+            continue
+        plan.append(src)
+        if minimal:
+            need -= provides
+    return plan
+
+
+def _normalize(call: str) -> str:
+    return (call or "").upper().strip()
 
-    cached = _cache_get(call)
-    if cached:
-        return cached
 
-    async with aiohttp.ClientSession(headers={"User-Agent": "mARCoBot/1.0"}) as session:
-        callook_task = asyncio.create_task(fetch_callook(session, call))
-        fcc_task = asyncio.create_task(fetch_fcc_lv(session, call))
-        hamdb_task = asyncio.create_task(fetch_hamdb(session, call))
-        radioid_task = asyncio.create_task(fetch_radioid(session, call))
+class _SourceFailed(Exception):
+    """A source errored or its circuit breaker is open."""
 
-        callook, fcc, hamdb, dmr_ids = await asyncio.gather(
-            callook_task, fcc_task, hamdb_task, radioid_task
+
+# ---------- Service ----------
+class CallsignService:
+    """
+    Long-lived callsign lookup service:
+      - One pooled aiohttp session shared by every lookup (keep-alive, DNS cache)
+      - Started/closed by CallsignCog (cog_load / cog_unload)
+      - Lazily opens its session if used before the cog starts it
+      - Concurrent lookups of the same callsign share one upstream fetch
+      - Stale cache entries are served at once and refreshed in the background
+      - With a local ULS database, remote sources only fill the gaps
+      - Per-source circuit breakers skip dead upstreams; a lookup deadline
+        cuts off slow secondary sources and returns a partial record
+    """
+
+    _instance: Optional["CallsignService"] = None
+
+    def __init__(
+        self,
+        limits: Optional[PoolLimits] = None,
+        cache: Optional[CallsignCache] = None,
+    ) -> None:
+        self.limits = limits or PoolLimits()
+        self.cache = cache if cache is not None else _CACHE
+        self.store: Optional[CallsignStore] = None
+        self.uls: Optional[ULSDatabase] = None
+        self.pool_stats = PoolStats()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._flights: SingleFlight[str, CacheEntry] = SingleFlight()
+        # callsign -> (in-flight load, fields it was launched for)
+        self._covers: Dict[str, Tuple[asyncio.Task, FrozenSet[str]]] = {}
+        self._limiters = {
+            src: TokenBucket(rate, burst) for src, (rate, burst) in SOURCE_RATES.items()
+        }
+        self.breakers = {src: CircuitBreaker(src) for src in FETCHERS}
+        self.budget_s = LOOKUP_BUDGET_S
+        self.secondary_grace_s = SECONDARY_GRACE_S
+
+    # ---------- Singleton ----------
+    @classmethod
+    def get(cls) -> "CallsignService":
+        if cls._instance is None:
+            cls._instance = CallsignService()
+        return cls._instance
+
+    # ---------- Lifecycle ----------
+    async def start(
+        self,
+        limits: Optional[PoolLimits] = None,
+        store: Optional[CallsignStore] = None,
+        uls: Optional[ULSDatabase] = None,
+        warm_limit: int = 512,
+    ) -> None:
+        """Open the shared session and, if given, the on-disk store and ULS db.
+
+        New limits apply to the next session opened. The store is warmed into
+        memory with its most frequently looked-up callsigns.
+        """
+        if limits is not None and limits != self.limits:
+            await self.close()
+            self.limits = limits
+        self._ensure_session()
+
+        if store is not None and store is not self.store:
+            if self.store is not None:
+                await self.store.close()
+            await store.open()
+            self.store = store
+            warmed = await store.warm(self.cache, limit=warm_limit)
+            log.info(
+                "Callsign cache warmed with %d entries from %s", warmed, store.path
+            )
+
+        if uls is not None and uls is not self.uls:
+            if self.uls is not None:
+                await self.uls.close()
+            await uls.open()
+            self.uls = uls
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.store is not None:
+            await self.store.close()
+            self.store = None
+        if self.uls is not None:
+            await self.uls.close()
+            self.uls = None
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = pooled_session(
+                self.limits, self.pool_stats, headers={"User-Agent": USER_AGENT}
+            )
+        return self._session
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.pool_stats.as_dict(),
+            "fetches": self._flights.launched,
+            "coalesced": self._flights.coalesced,
+            "in_flight": len(self._flights),
+            **self.cache.stats(),
+            **(self.store.stats() if self.store is not None else {}),
+            **(self.uls.stats() if self.uls is not None else {}),
+            "throttled_s": round(sum(b.waited_s for b in self._limiters.values()), 1),
+            **{
+                f"breaker_{src}": " ".join(f"{k}={v}" for k, v in b.stats().items())
+                for src, b in self.breakers.items()
+            },
+        }
+
+    async def sync_uls(self, day: str) -> Dict[str, int]:
+        """Apply one FCC daily ULS file (``day`` = mon..sun) to the local db."""
+        if self.uls is None:
+            return {}
+        return await self.uls.sync_daily(self._ensure_session(), day)
+
+    # ---------- Lookup ----------
+    async def lookup(
+        self, call: str, fields: Iterable[str] = ALL_FIELDS
+    ) -> Optional[CallsignRecord]:
+        """Lookup one callsign, querying only sources needed for ``fields``.
+
+        A cached record that lacks requested fields is extended with just the
+        sources it has not asked yet.
+        """
+        call = _normalize(call)
+        if not call:
+            return None
+        fields = frozenset(fields)
+        ent = self._peek(call, fields)
+        if ent is None or self._needs(ent, fields):
+            return await self._resolve(call, fields, ent)
+        return ent.record
+
+    async def iter_lookups(
+        self,
+        calls: Iterable[str],
+        concurrency: int = 8,
+        fields: Iterable[str] = ALL_FIELDS,
+    ) -> AsyncIterator[Tuple[str, Optional[CallsignRecord]]]:
+        """Yield ``(call, record)`` pairs as they become available.
+
+        Input is normalized and deduplicated. Cached answers come out first;
+        misses are fetched at most ``concurrency`` at a time, and every
+        upstream request still passes through the per-source rate limits.
+        """
+        fields = frozenset(fields)
+        misses: List[Tuple[str, Optional[CacheEntry]]] = []
+        for call in dict.fromkeys(filter(None, map(_normalize, calls))):
+            ent = self._peek(call, fields)
+            if ent is not None and not self._needs(ent, fields):
+                yield call, ent.record
+            else:
+                misses.append((call, ent))
+
+        sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+        async def _one(
+            call: str, ent: Optional[CacheEntry]
+        ) -> Tuple[str, Optional[CallsignRecord]]:
+            async with sem:
+                return call, await self._resolve(call, fields, ent)
+
+        tasks = [asyncio.ensure_future(_one(c, e)) for c, e in misses]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    async def lookup_many(
+        self,
+        calls: Iterable[str],
+        concurrency: int = 8,
+        fields: Iterable[str] = ALL_FIELDS,
+    ) -> Dict[str, Optional[CallsignRecord]]:
+        calls = list(calls)
+        found = {c: r async for c, r in self.iter_lookups(calls, concurrency, fields)}
+        order = dict.fromkeys(filter(None, map(_normalize, calls)))
+        return {c: found.get(c) for c in order}
+
+    @staticmethod
+    def _needs(ent: CacheEntry, fields: FrozenSet[str]) -> bool:
+        """Does a cached record still have untried sources for ``fields``?"""
+        rec = ent.record
+        return rec is not None and bool(
+            _plan_sources(rec, fields, rec.sources, minimal=True)
         )
 
-    if not any([callook, fcc, hamdb]):
-        return None
+    def _peek(self, call: str, fields: FrozenSet[str]) -> Optional[CacheEntry]:
+        """Memory-cache probe; a stale hit also kicks off a refresh."""
+        if self.store is not None:
+            self.store.touch(call)
+        ent = self.cache.get(call)
+        if ent is not None:
+            self._revalidate(call, ent, fields)
+        return ent
+
+    async def _resolve(
+        self, call: str, fields: FrozenSet[str], ent: Optional[CacheEntry]
+    ) -> Optional[CallsignRecord]:
+        # Callers racing on the same callsign await one shared load. If the
+        # load in flight was for fewer fields, wait for it and then ask only
+        # the sources its result still lacks.
+        while True:
+            task, covers = self._launch(
+                call, fields, lambda: self._load(call, fields, ent)
+            )
+            ent = await asyncio.shield(task)
+            if fields <= covers or not self._needs(ent, fields):
+                break
+        self._revalidate(call, ent, fields)
+        return ent.record
+
+    def _launch(
+        self,
+        call: str,
+        fields: FrozenSet[str],
+        fn: Callable[[], Awaitable[CacheEntry]],
+    ) -> Tuple[asyncio.Task, FrozenSet[str]]:
+        """The in-flight load for ``call`` and the fields it covers, starting
+        ``fn()`` for ``fields`` if there is none."""
+        task = self._flights.start(call, fn)
+        cur = self._covers.get(call)
+        if cur is not None and cur[0] is task:
+            return task, cur[1]
+        self._covers[call] = (task, fields)
+
+        def _done(t: asyncio.Task) -> None:
+            if self._covers.get(call, (None,))[0] is t:
+                del self._covers[call]
+
+        task.add_done_callback(_done)
+        return task, fields
+
+    def _revalidate(self, call: str, ent: CacheEntry, fields: FrozenSet[str]) -> None:
+        if not ent.is_fresh(time.time()):
+            # Stale-while-revalidate: answer now, refresh once in the background
+            self._launch(call, fields, lambda: self._fetch(call, fields))
+
+    async def _source(self, src: str, call: str) -> Any:
+        """Run one source fetcher behind its rate limiter and circuit breaker.
+
+        Raises _SourceFailed when the breaker is open or the upstream errors.
+        """
+        breaker = self.breakers[src]
+        if not breaker.allow():
+            raise _SourceFailed(src)
+
+        try:
+            await self._limiters[src].acquire()
+        except asyncio.CancelledError:
+            # Cut off while queued on our own rate limit: nothing went
+            # upstream, so no sample; just free a half-open probe slot
+            breaker.release()
+            raise
+        started = time.monotonic()
+        try:
+            data = await FETCHERS[src](self._ensure_session(), call, strict=True)
+        except asyncio.CancelledError:
+            # Cut off by the lookup deadline mid-request; counts against it
+            breaker.record(False, time.monotonic() - started)
+            raise
+        except aiohttp.ClientResponseError as e:
+            # 4xx (other than 429) means "no such record", not an outage
+            ok = e.status < 500 and e.status != 429
+            breaker.record(ok, time.monotonic() - started)
+            if not ok:
+                raise _SourceFailed(src) from e
+            return None
+        except Exception as e:
+            breaker.record(False, time.monotonic() - started)
+            raise _SourceFailed(src) from e
+        breaker.record(True, time.monotonic() - started)
+        return data
+
+    async def _gather_sources(
+        self, call: str, sources: Iterable[str]
+    ) -> Tuple[Dict[str, Any], Set[str]]:
+        """Query ``sources`` within the lookup budget.
+
+        Returns ``(payloads, failed)``; payloads hold None for sources that
+        failed, were skipped or were cut off, and those are listed in
+        ``failed``.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.budget_s
+        tasks = {src: asyncio.create_task(self._source(src, call)) for src in sources}
+        primary = [t for src, t in tasks.items() if src in PRIMARY_SOURCES]
+        secondary = [t for src, t in tasks.items() if src not in PRIMARY_SOURCES]
+
+        if primary:
+            await asyncio.wait(primary, timeout=max(0.0, deadline - loop.time()))
+        if secondary:
+            grace = self.secondary_grace_s if primary else self.budget_s
+            await asyncio.wait(
+                secondary, timeout=max(0.0, min(grace, deadline - loop.time()))
+            )
+
+        payloads: Dict[str, Any] = {}
+        failed: Set[str] = set()
+        for src, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                failed.add(src)
+                payloads[src] = None
+            elif task.exception() is not None:
+                failed.add(src)
+                payloads[src] = None
+            else:
+                payloads[src] = task.result()
+        return payloads, failed
+
+    async def _load(
+        self, call: str, fields: FrozenSet[str], ent: Optional[CacheEntry]
+    ) -> CacheEntry:
+        """Memory miss: try the on-disk tier, then go upstream for what's missing."""
+        if ent is None and self.store is not None:
+            ent = await self.store.get(call)
+            if ent is not None:
+                self.cache.insert(call, ent)
+        if ent is None:
+            return await self._fetch(call, fields)
+        if self._needs(ent, fields):
+            # Work on a copy so readers of the cached record never see a merge
+            rec = CallsignRecord.from_dict(ent.record.to_dict())
+            return await self._complete(call, rec, fields, ent.outcome == PARTIAL)
+        return ent
+
+    async def _fetch(self, call: str, fields: FrozenSet[str]) -> CacheEntry:
+        # With a local ULS db, remote sources only fill what it lacks
+        local = await self.uls.lookup(call) if self.uls is not None else None
+        return await self._complete(call, local, fields, partial=False)
+
+    async def _complete(
+        self,
+        call: str,
+        rec: Optional[CallsignRecord],
+        fields: FrozenSet[str],
+        partial: bool,
+    ) -> CacheEntry:
+        """Query the sources ``fields`` need and merge them into ``rec``.
+
+        Round one asks the smallest set of sources covering the request;
+        round two asks every remaining source that could fill what's still
+        missing (e.g. HamDB when Callook doesn't know the call). Sources that
+        answered are remembered in ``rec.sources`` (False = nothing there),
+        so later requests only ask the ones not tried yet.
+        """
+        tried: Set[str] = set(rec.sources) if rec is not None else set()
+        failed: Set[str] = set()
+        for minimal in (True, False):
+            plan = _plan_sources(rec, fields, tried | failed, minimal)
+            if not plan:
+                break
+            got, bad = await self._gather_sources(call, plan)
+            failed |= bad
+            tried |= set(plan) - bad
+            rec = self._merge_into(call, rec, got)
+            if rec is not None:
+                for src in set(plan) - bad:
+                    rec.sources.setdefault(src, bool(got.get(src)))
+
+        if rec is None:
+            # Only a clean "nobody knows it" is worth a negative entry
+            clean = not failed and _IDENTITY_SOURCES <= tried
+            return self._remember(call, None, NEGATIVE if clean else UNAVAILABLE)
+        return self._remember(call, rec, PARTIAL if partial or failed else POSITIVE)
+
+    @staticmethod
+    def _merge_into(
+        call: str, rec: Optional[CallsignRecord], got: Dict[str, Any]
+    ) -> Optional[CallsignRecord]:
+        remote = _merge_record(
+            call,
+            got.get("callook"),
+            got.get("fcc_lv"),
+            got.get("hamdb"),
+            got.get("radioid") or [],
+        )
+        if rec is None:
+            # Need at least one identity source; DMR IDs alone aren't a record
+            if any(got.get(src) for src in _IDENTITY_SOURCES):
+                return remote
+            return None
+        overwrite = frozenset()
+        if got.get("fcc_lv") and "uls" not in rec.sources:
+            overwrite = _FCC_AUTHORITATIVE
+        _fill_missing(rec, remote, overwrite)
+        return rec
+
+    def _remember(
+        self, call: str, rec: Optional[CallsignRecord], outcome: str
+    ) -> CacheEntry:
+        ent = self.cache.put(call, rec, outcome)
+        if self.store is not None and outcome != UNAVAILABLE:
+            self.store.put(call, ent)
+        return ent
 
-    rec = _merge_record(call, callook, fcc, hamdb, dmr_ids)
-    _cache_put(rec)
-    return rec
+
+# ---------- Public API ----------
+async def lookup_callsign(
+    call: str, fields: Iterable[str] = ALL_FIELDS
+) -> Optional[CallsignRecord]:
+    """Lookup a US callsign from free sources and merge into a single record.
+
+    ``fields`` limits which sources are queried (e.g. SHORT_FIELDS skips
+    FCC LV and RadioID when Callook has the answer).
+
+    Returns None if nothing is found. Full results are cached for 1 hour,
+    partial results for 15 minutes and misses for 10 minutes.
+    """
+    return await CallsignService.get().lookup(call, fields)
+
+
+async def lookup_callsigns(
+    calls: List[str], concurrency: int = 8, fields: Iterable[str] = ALL_FIELDS
+) -> Dict[str, Optional[CallsignRecord]]:
+    """Lookup many callsigns at once (deduplicated, cache hits first).
+
+    Returns ``{CALLSIGN: record or None}`` in first-seen input order.
+    """
+    return await CallsignService.get().lookup_many(calls, concurrency, fields)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.callsign_models import CallsignRecord
+from ..utils.sqlite import SQLiteWorker
+from .callsign_cache import CacheEntry, CallsignCache
+
+__all__ = ["CallsignStore"]
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS callsigns (
+    callsign    TEXT PRIMARY KEY,
+    outcome     TEXT NOT NULL,
+    record      TEXT,
+    stored_at   REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS callsigns_stale_until ON callsigns (stale_until);
+CREATE INDEX IF NOT EXISTS callsigns_hits ON callsigns (hits);
+"""
+
+_UPSERT = """
+INSERT INTO callsigns (callsign, outcome, record, stored_at, expires_at, stale_until)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(callsign) DO UPDATE SET
+    outcome = excluded.outcome,
+    record = excluded.record,
+    stored_at = excluded.stored_at,
+    expires_at = excluded.expires_at,
+    stale_until = excluded.stale_until
+"""
+
+_COLUMNS = "outcome, record, stored_at, expires_at, stale_until"
+
+_Row = Tuple[str, Optional[str], float, float, float]
+
+
+def _encode(call: str, ent: CacheEntry) -> tuple:
+    rec = json.dumps(ent.record.to_dict()) if ent.record is not None else None
+    return (call, ent.outcome, rec, ent.stored_at, ent.expires_at, ent.stale_until)
+
+
+def _decode(row: _Row) -> CacheEntry:
+    outcome, rec, stored_at, expires_at, stale_until = row
+    return CacheEntry(
+        record=CallsignRecord.from_dict(json.loads(rec)) if rec else None,
+        outcome=outcome,
+        stored_at=stored_at,
+        expires_at=expires_at,
+        stale_until=stale_until,
+    )
+
+
+class CallsignStore:
+    """
+    Optional on-disk tier behind the in-memory callsign cache:
+      - SQLite in WAL mode, every statement on one worker thread
+      - put()/touch() only queue; a background task flushes in batches
+      - Reads ignore rows past their stale window
+      - Periodic compaction drops dead rows and checkpoints the WAL
+      - warm() preloads the most looked-up callsigns into memory
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        flush_interval_s: float = 2.0,
+        batch_size: int = 256,
+        compact_interval_s: float = 6 * 3600,
+    ) -> None:
+        self.path = path
+        self.flush_interval_s = float(flush_interval_s)
+        self.batch_size = max(1, int(batch_size))
+        self.compact_interval_s = float(compact_interval_s)
+
+        self._db = SQLiteWorker(path, name="callsign-store")
+        self._pending: Dict[str, CacheEntry] = {}
+        self._pending_hits: Dict[str, int] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_compact = time.time()
+
+        self.reads = 0
+        self.read_hits = 0
+        self.writes = 0
+        self.flushes = 0
+
+    # ---------- Lifecycle ----------
+    async def open(self) -> None:
+        await self._db.open(_SCHEMA)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._writer())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._db.is_open:
+            await self.flush()
+        await self._db.close()
+
+    # ---------- Writes (queued) ----------
+    def put(self, call: str, ent: CacheEntry) -> None:
+        self._pending[call.upper()] = ent
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def touch(self, call: str) -> None:
+        """Count a lookup; hit counts drive warm-start ordering."""
+        key = call.upper()
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+
+    async def flush(self) -> None:
+        if not self._pending and not self._pending_hits:
+            return
+        # Swap the batch out so puts during the write queue up separately
+        batch, self._pending = self._pending, {}
+        batch_hits, self._pending_hits = self._pending_hits, {}
+        rows = [_encode(k, e) for k, e in batch.items()]
+        hits = [(n, k) for k, n in batch_hits.items()]
+
+        def _write(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(_UPSERT, rows)
+                conn.executemany(
+                    "UPDATE callsigns SET hits = hits + ? WHERE callsign = ?", hits
+                )
+
+        try:
+            await self._db.call(_write)
+        except Exception:
+            # Nothing was committed: put the batch back for the next flush,
+            # without clobbering entries queued since
+            for k, e in batch.items():
+                self._pending.setdefault(k, e)
+            for k, n in batch_hits.items():
+                self._pending_hits[k] = self._pending_hits.get(k, 0) + n
+            raise
+        self.writes += len(rows)
+        self.flushes += 1
+
+    async def compact(self, now: Optional[float] = None) -> int:
+        """Delete rows past their stale window and truncate the WAL."""
+        now = time.time() if now is None else now
+
+        def _compact(conn: sqlite3.Connection) -> int:
+            with conn:
+                cur = conn.execute(
+                    "DELETE FROM callsigns WHERE stale_until < ?", (now,)
+                )
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA optimize")
+            return cur.rowcount
+
+        removed = await self._db.call(_compact)
+        self._last_compact = now
+        return removed
+
+    async def _writer(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+                if time.time() - self._last_compact >= self.compact_interval_s:
+                    removed = await self.compact()
+                    log.info("Callsign store compacted (%d expired rows)", removed)
+            except sqlite3.Error:
+                log.exception("Callsign store flush failed")
+
+    # ---------- Reads ----------
+    async def get(self, call: str, now: Optional[float] = None) -> Optional[CacheEntry]:
+        """Return the stored entry if still usable (fresh or stale), else None."""
+        now = time.time() if now is None else now
+        key = call.upper()
+        self.reads += 1
+
+        ent = self._pending.get(key)
+        if ent is None:
+
+            def _read(conn: sqlite3.Connection) -> Optional[_Row]:
+                return conn.execute(
+                    f"SELECT {_COLUMNS} FROM callsigns "
+                    "WHERE callsign = ? AND stale_until > ?",
+                    (key, now),
+                ).fetchone()
+
+            row = await self._db.call(_read)
+            ent = _decode(row) if row else None
+
+        if ent is None or not ent.is_usable(now):
+            return None
+        self.read_hits += 1
+        return ent
+
+    async def warm(self, cache: CallsignCache, limit: int = 512) -> int:
+        """Preload the most frequently looked-up, still usable entries."""
+        now = time.time()
+
+        def _top(conn: sqlite3.Connection) -> List[Tuple[str, Any, Any, Any, Any, Any]]:
+            return conn.execute(
+                f"SELECT callsign, {_COLUMNS} FROM callsigns "
+                "WHERE stale_until > ? ORDER BY hits DESC LIMIT ?",
+                (now, min(int(limit), cache.max_entries)),
+            ).fetchall()
+
+        rows = await self._db.call(_top)
+        # Least popular first so the hottest end up most-recently-used
+        for row in reversed(rows):
+            cache.insert(row[0], _decode(row[1:]))
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "store_reads": self.reads,
+            "store_read_hits": self.read_hits,
+            "store_writes": self.writes,
+            "store_flushes": self.flushes,
+            "store_pending": len(self._pending),
+        }
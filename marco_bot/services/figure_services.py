@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+from .question_pool_services import POOL_DIR
+
+__all__ = ["FIGURE_DIR", "FigureStore"]
+
+log = logging.getLogger(__name__)
+
+FIGURE_DIR = POOL_DIR / "figures"
+
+# Discord CDN links without an ``ex=`` expiry are trusted this long
+DEFAULT_URL_TTL_S = 24 * 3600
+
+
+def _url_expiry(url: str, now: float) -> float:
+    """When a Discord CDN URL stops working (its hex ``ex=`` param)."""
+    ex = parse_qs(urlparse(url).query).get("ex")
+    if ex:
+        try:
+            return float(int(ex[0], 16))
+        except ValueError:
+            pass
+    return now + DEFAULT_URL_TTL_S
+
+
+class FigureStore:
+    """
+    Question-pool figures ("t-1.png", "e6-3.png") for quiz embeds:
+      - Each PNG is read from disk once, then served from an LRU bounded by
+        total bytes
+      - After Discord hosts an upload, its CDN URL is reused (until shortly
+        before the signed link expires) so repeats don't upload again
+    """
+
+    def __init__(
+        self,
+        figure_dir: Union[str, Path] = FIGURE_DIR,
+        max_bytes: int = 8 * 1024 * 1024,
+        url_margin_s: float = 3600,
+    ) -> None:
+        self.figure_dir = Path(figure_dir)
+        self.max_bytes = max(0, int(max_bytes))
+        self.url_margin_s = float(url_margin_s)
+        self._bytes: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._urls: Dict[str, Tuple[str, float]] = {}  # name -> (url, usable until)
+
+        self.reads = 0
+        self.hits = 0
+        self.uploads = 0
+        self.url_hits = 0
+
+    def _path(self, name: str) -> Optional[Path]:
+        # Names come from pool JSON; never let one walk out of the folder
+        base = Path(name).name
+        if not base or base != name:
+            return None
+        return self.figure_dir / base
+
+    # ---------- Bytes ----------
+    def load(self, name: str) -> Optional[bytes]:
+        data = self._bytes.get(name)
+        if data is not None:
+            self._bytes.move_to_end(name)
+            self.hits += 1
+            return data
+        path = self._path(name)
+        if path is None:
+            return None
+        try:
+            data = path.read_bytes()
+        except OSError:
+            log.warning("Question figure %s not found in %s", name, self.figure_dir)
+            return None
+        self.reads += 1
+        if len(data) <= self.max_bytes:
+            self._bytes[name] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, old = self._bytes.popitem(last=False)
+                self._size -= len(old)
+        return data
+
+    # ---------- Hosted URLs ----------
+    def url(self, name: str, now: Optional[float] = None) -> Optional[str]:
+        now = time.time() if now is None else now
+        ent = self._urls.get(name)
+        if ent is None:
+            return None
+        if now >= ent[1]:
+            del self._urls[name]
+            return None
+        self.url_hits += 1
+        return ent[0]
+
+    def remember(self, name: str, url: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        until = _url_expiry(url, now) - self.url_margin_s
+        if until > now:
+            self._urls[name] = (url, until)
+        self.uploads += 1
+
+    def forget(self, name: str) -> None:
+        self._urls.pop(name, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "figures_cached": len(self._bytes),
+            "figure_bytes": self._size,
+            "figure_reads": self.reads,
+            "figure_hits": self.hits,
+            "figure_uploads": self.uploads,
+            "figure_url_hits": self.url_hits,
+        }
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+from ..models.forecast_models import Forecast
+from ..utils.http import PoolLimits, PoolStats, pooled_session
+from ..utils.singleflight import SingleFlight
+from .nws_services import NWS_API
+
+__all__ = ["ForecastService", "freshness"]
+
+log = logging.getLogger(__name__)
+
+# Used when NWS sends no usable Cache-Control / Expires
+DEFAULT_TTL_S = 300.0
+# After a failed refresh, keep serving what we have for this long
+STALE_RETRY_S = 60.0
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness(headers: Mapping[str, str], default: float = DEFAULT_TTL_S) -> float:
+    """Seconds a response may be served from cache, per RFC 9111.
+
+    ``max-age`` (less ``Age``) wins over ``Expires``; ``Expires`` is taken
+    relative to the server's ``Date`` so local clock skew doesn't matter.
+    ``no-cache``/``no-store`` mean every use must revalidate.
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in (headers.get("Cache-Control") or "").split(","):
+        key, _, val = part.strip().partition("=")
+        if key:
+            directives[key.lower()] = val.strip('"') or None
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    for key in ("s-maxage", "max-age"):
+        if directives.get(key):
+            try:
+                age = float(headers.get("Age") or 0)
+                return max(0.0, float(directives[key]) - age)
+            except ValueError:
+                break
+    expires = _http_date(headers.get("Expires"))
+    if expires is not None:
+        date = _http_date(headers.get("Date")) or time.time()
+        return max(0.0, expires - date)
+    return default
+
+
+class _Entry:
+    __slots__ = ("forecast", "etag", "last_modified", "fresh_until")
+
+    def __init__(self) -> None:
+        self.forecast: Optional[Forecast] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.fresh_until = 0.0  # monotonic
+
+
+class ForecastService:
+    """
+    NWS gridpoint forecast for one WFO grid cell:
+      - ``/forecast`` (12-hour periods) and ``/forecast/hourly`` are cached
+        separately, each for as long as Cache-Control / Expires allow
+      - Once stale, the entry is revalidated with If-None-Match /
+        If-Modified-Since; a 304 just extends the cached object
+      - Concurrent callers share one in-flight request (SingleFlight), so
+        any number of /forecast users cost at most one upstream call per
+        expiry window
+      - If NWS is down, the last good forecast keeps being served
+    """
+
+    def __init__(
+        self,
+        contact_email: str,
+        wfo: str,
+        grid_x: int,
+        grid_y: int,
+        *,
+        base_url: str = NWS_API,
+        limits: Optional[PoolLimits] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.path = f"/gridpoints/{wfo}/{int(grid_x)},{int(grid_y)}/forecast"
+        self.limits = limits or PoolLimits(total=4, per_host=2, timeout_s=20.0)
+        self.headers = {
+            "User-Agent": f"(mARCoBot/1.0, {contact_email})",
+            "Accept": "application/geo+json",
+        }
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.pool_stats = PoolStats()
+        self._entries: Dict[bool, _Entry] = {False: _Entry(), True: _Entry()}
+        self._flight: SingleFlight[bool, Forecast] = SingleFlight()
+
+        self.hits = 0
+        self.fetches = 0
+        self.not_modified = 0
+        self.stale_served = 0
+
+    # ---------- Lifecycle ----------
+    async def start(self) -> None:
+        if self.session is None or self.session.closed:
+            self.session = pooled_session(self.limits, self.pool_stats, self.headers)
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    # ---------- Reads ----------
+    async def get(self, hourly: bool = False) -> Forecast:
+        """The current forecast, from cache while it's fresh."""
+        entry = self._entries[hourly]
+        if entry.forecast is not None and time.monotonic() < entry.fresh_until:
+            self.hits += 1
+            return entry.forecast
+        task = self._flight.start(hourly, lambda: self._refresh(hourly))
+        return await asyncio.shield(task)
+
+    async def _refresh(self, hourly: bool) -> Forecast:
+        entry = self._entries[hourly]
+        try:
+            return await self._fetch(hourly, entry)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if entry.forecast is None:
+                raise
+            log.warning("NWS forecast refresh failed (%s); serving cached copy", e)
+            self.stale_served += 1
+            entry.fresh_until = time.monotonic() + STALE_RETRY_S
+            return entry.forecast
+
+    async def _fetch(self, hourly: bool, entry: _Entry) -> Forecast:
+        await self.start()
+        headers: Dict[str, str] = {}
+        if entry.forecast is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        url = self.base_url + self.path + ("/hourly" if hourly else "")
+
+        self.fetches += 1
+        async with self.session.get(url, headers=headers) as resp:
+            ttl = freshness(resp.headers)
+            if resp.status == 304 and entry.forecast is not None:
+                self.not_modified += 1
+                entry.fresh_until = time.monotonic() + ttl
+                return entry.forecast
+            resp.raise_for_status()
+            doc: Any = await resp.json(content_type=None)
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+
+        forecast = Forecast.from_doc(doc, hourly)
+        if not forecast.periods:
+            raise ValueError("NWS forecast had no periods")
+        entry.forecast = forecast
+        entry.etag = etag
+        entry.last_modified = last_modified
+        entry.fresh_until = time.monotonic() + ttl
+        return forecast
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "not_modified": self.not_modified,
+            "coalesced": self._flight.coalesced,
+            "stale_served": self.stale_served,
+            **self.pool_stats.as_dict(),
+        }
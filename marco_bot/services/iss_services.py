@@ -1,22 +1,49 @@
 from __future__ import annotations
 
 import asyncio
-import random
+import heapq
+import json
+import logging
+import time
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from functools import partial
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import aiohttp
-from aiohttp import ClientTimeout
 import discord
-from discord.ext import tasks
 
-# Open Notify API for ISS pass predictions
-OPEN_NOTIFY = "http://api.open-notify.org/iss-pass.json"
+from .announce_services import Announcement, AnnounceQueue
+from .iss_store import ISSStore
+from .orbit_services import OrbitService
+
+log = logging.getLogger(__name__)
+
+
+# Observers are bucketed on this grid; every guild in a cell shares one prediction
+# (0.1 deg is ~11 km, which moves a pass by about a second)
+CELL_DEG = 0.1
+ALT_BAND_M = 1000
+
+CellKey = Tuple[int, int, int]
+
+# Recompute a cell's pass at least this often (the TLE may have moved it)
+PASS_TTL_S = 3600
+# Re-predictions of one pass move it by seconds; treat starts this close as the same pass
+SAME_PASS_S = 300
+
+# Scheduler event kinds (heap entries: (when, kind, key, token))
+_REFRESH = 0
+_ANNOUNCE = 1
+
+
+def cell_key(lat: float, lon: float, alt_m: Optional[int]) -> CellKey:
+    """Quantized (lat, lon, altitude band) an observer falls in."""
+    return round(lat / CELL_DEG), round(lon / CELL_DEG), int(max(0, alt_m or 0) // ALT_BAND_M)
 
 
 @dataclass
 class GuildISSState:
-    """In-memory cache + settings for one guild."""
+    """In-memory settings for one guild."""
     lat: float
     lon: float
     alt_m: Optional[int]
@@ -24,33 +51,77 @@ class GuildISSState:
     lead_seconds: int = 21600  # 6 hours
     # Prevent duplicate announcements for the same pass start time
     last_announced_start: Optional[int] = None
-    # Avoid hammering the API
+    # Shared observer cell holding the cached next pass
+    cell: Optional[CellKey] = None
+    # Where this guild's announcements go (None = the default ISS channel)
+    channel_id: Optional[int] = None
+
+
+@dataclass
+class ObserverCell:
+    """One quantized observer location, shared (ref-counted) by its guilds."""
+    lat: float
+    lon: float
+    alt_m: int
+    refs: int = 0
     cached_next: Optional[Tuple[int, int]] = None  # (risetime_epoch, duration_s)
     cached_at_epoch: int = 0
+    # When the scheduler recomputes this cell (0 = not predicted yet)
+    refresh_at: float = 0.0
+
+    @classmethod
+    def for_key(cls, key: CellKey) -> "ObserverCell":
+        # Predict from the cell centre so the result doesn't depend on who subscribed first
+        return cls(
+            lat=round(key[0] * CELL_DEG, 6),
+            lon=round(key[1] * CELL_DEG, 6),
+            alt_m=key[2] * ALT_BAND_M + ALT_BAND_M // 2,
+        )
 
 
 class ISSService:
     """
     Cache-only ISS pass service with a single scheduler:
-      - No database
-      - One hard-coded channel (attached by the Cog)
-      - Exactly one background loop (never started by commands)
+      - Passes predicted locally from a cached TLE (no per-guild HTTP)
+      - Guilds bucketed into shared observer cells (0.1 deg + altitude band), so
+        N guilds at the same place cost one prediction
+      - Event-driven: a heap holds each guild's announce time (rise - lead)
+        and each cell's refresh time; the loop sleeps until the earliest one
+        and is woken early only when a subscription changes
+      - Due cell refreshes are recomputed in one vectorized batch
+      - Settings and last announced passes persisted via ISSStore (debounced
+        batched writes, one bulk read at startup), so restarts don't re-announce
+      - Per-guild announcement channel, falling back to the default channel
+        (attached by the Cog) when unset or unusable
+      - Lines go through a retrying AnnounceQueue (coalesced per channel,
+        bounded concurrent fan-out, 429-aware); a pass counts as announced
+        only once its message is delivered
+      - Exactly one background task (never started by commands)
       - Announces once when a pass is within the 6h window
     """
     _instance: Optional["ISSService"] = None
 
     def __init__(self) -> None:
         self._guilds: Dict[int, GuildISSState] = {}
+        self._cells: Dict[CellKey, ObserverCell] = {}
         self._session: Optional[aiohttp.ClientSession] = None
+        # Local SGP4 predictor; one ephemeris serves every guild
+        self.orbit = OrbitService.get()
         self._bot: Optional[discord.Client] = None
         self._channel: Optional[discord.abc.Messageable] = None
 
-        # Per-channel simple cooldown to avoid bursts
-        self._channel_cooldown_s: int = 60
-        self._channel_last_sent: int = 0
+        self._queue: Optional[AnnounceQueue] = None
+        self._store: Optional[ISSStore] = None
+        self._saved_tle: Optional[str] = None
 
         self._lock = asyncio.Lock()
         self._loop_started = False
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._events: List[Tuple[float, int, Union[int, CellKey], float]] = []
+        self._pending: Dict[int, Tuple[float, int]] = {}  # guild -> (announce_at, start)
+        self._inflight: Dict[int, int] = {}  # guild -> pass start queued for sending
+        self._unsubscribed: Set[int] = set()  # opted out; never auto-subscribe
 
     # ---------- Singleton ----------
     @classmethod
@@ -60,24 +131,77 @@ class ISSService:
         return cls._instance
 
     # ---------- Lifecycle ----------
+    async def load(self, store: ISSStore) -> int:
+        """
+        Open the store and restore every saved guild in one bulk read (before attach).
+        Returns the number of guilds restored.
+        """
+        self._store = store
+        await store.open()
+        rows, meta, unsubscribed = await store.load()
+        async with self._lock:
+            self._unsubscribed = unsubscribed - rows.keys()
+            for guild_id, (lat, lon, alt_m, lead, last, channel_id) in rows.items():
+                key = cell_key(lat, lon, alt_m)
+                existing = self._guilds.get(guild_id)
+                if existing is None or existing.cell != key:
+                    self._acquire_cell(key)
+                    if existing is not None:
+                        self._release_cell(existing.cell)
+                self._guilds[guild_id] = GuildISSState(
+                    lat=lat,
+                    lon=lon,
+                    alt_m=alt_m,
+                    lead_seconds=lead,
+                    last_announced_start=last,
+                    cell=key,
+                    channel_id=channel_id,
+                )
+        # Saved elements let the first predictions run without a network fetch
+        self._saved_tle = meta.get("tle")
+        if self._saved_tle:
+            try:
+                line1, line2, checked_at = json.loads(self._saved_tle)
+                self.orbit.seed_tle(line1, line2, checked_at)
+            except (ValueError, TypeError):
+                log.warning("Ignoring unreadable saved ISS TLE")
+        self._wake.set()
+        return len(rows)
+
     async def attach(self, bot: discord.Client, channel: discord.abc.Messageable, cooldown_s: int = 60) -> None:
         """
-        Attach the bot & target channel once. Starts the single scheduler loop.
+        Attach the bot & default channel once. Starts the single scheduler loop.
+        ``cooldown_s`` is the minimum gap between two messages to one channel;
+        lines due meanwhile are coalesced into the next message.
         """
         self._bot = bot
         self._channel = channel
-        self._channel_cooldown_s = max(10, int(cooldown_s))
+        if self._queue is None:
+            self._queue = AnnounceQueue(self._resolve_channel, cooldown_s=max(10, int(cooldown_s)))
+        self._queue.cooldown_s = max(10, int(cooldown_s))
+        self._queue.start()
         if self._session is None:
             self._session = aiohttp.ClientSession()
+        self.orbit.attach(self._session)
         if not self._loop_started:
-            self.scheduler.start()
+            self._task = asyncio.create_task(self._run(), name="iss-scheduler")
             self._loop_started = True
 
     async def close(self) -> None:
-        try:
-            self.scheduler.cancel()
-        except Exception:
-            pass
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._queue is not None:
+            await self._queue.close()
+            self._queue = None
+        self._inflight.clear()
+        if self._store is not None:
+            await self._store.close()
+            self._store = None
         if self._session:
             await self._session.close()
             self._session = None
@@ -92,19 +216,29 @@ class ISSService:
         lon: float,
         alt_m: Optional[int],
         lead_seconds: int = 21600,
+        channel_id: Optional[int] = None,
     ) -> None:
         """Create or replace the guild ISS settings without duplicating watchers."""
+        key = cell_key(lat, lon, alt_m)
         async with self._lock:
             existing = self._guilds.get(guild_id)
-            self._guilds[guild_id] = GuildISSState(
+            if existing is None or existing.cell != key:
+                self._acquire_cell(key)
+                if existing is not None:
+                    self._release_cell(existing.cell)
+            g = self._guilds[guild_id] = GuildISSState(
                 lat=lat,
                 lon=lon,
                 alt_m=alt_m,
                 lead_seconds=max(60, int(lead_seconds)),
                 last_announced_start=(existing.last_announced_start if existing else None),
-                cached_next=(existing.cached_next if existing else None),
-                cached_at_epoch=(existing.cached_at_epoch if existing else 0),
+                cell=key,
+                channel_id=channel_id,
             )
+            self._schedule_guild(guild_id, g)
+            self._persist(guild_id, g)
+            self._unsubscribed.discard(guild_id)
+        self._wake.set()
 
     async def get_guild(self, guild_id: int) -> Optional[GuildISSState]:
         async with self._lock:
@@ -112,98 +246,247 @@ class ISSService:
 
     async def remove_guild(self, guild_id: int) -> bool:
         async with self._lock:
-            return self._guilds.pop(guild_id, None) is not None
+            g = self._guilds.pop(guild_id, None)
+            if g is None:
+                return False
+            self._release_cell(g.cell)
+            self._pending.pop(guild_id, None)
+            self._unsubscribed.add(guild_id)
+            if self._store is not None:
+                self._store.delete(guild_id)
+            return True
 
-    # ---------- HTTP + small cache for next pass ----------
-    async def _fetch_next_pass(self, lat: float, lon: float, alt_m: Optional[int]) -> Optional[Tuple[int, int]]:
-        """
-        Return (risetime_epoch, duration_s) for the next ISS pass.
-        """
-        if self._session is None:
-            return None
-        params = {"lat": lat, "lon": lon, "n": 1}
-        if alt_m is not None:
-            params["alt"] = max(0, int(alt_m))
+    def is_unsubscribed(self, guild_id: int) -> bool:
+        """True if the guild opted out with /unsubscribe (kept across restarts)."""
+        return guild_id in self._unsubscribed
 
-        try:
-            # Use a proper ClientTimeout object for type-safe timeout
-            async with self._session.get(OPEN_NOTIFY, params=params, timeout=ClientTimeout(total=10)) as resp:
-                if resp.status != 200:
-                    return None
-                data = await resp.json()
-        except (aiohttp.ClientError, asyncio.TimeoutError):
-            return None
+    def stats(self) -> Dict[str, int]:
+        return {
+            "guilds": len(self._guilds),
+            "observer_cells": len(self._cells),
+            "scheduled": len(self._pending),
+            "heap": len(self._events),
+            "in_flight": len(self._inflight),
+            **(self._queue.stats() if self._queue else {}),
+            **(self._store.stats() if self._store else {}),
+        }
 
-        try:
-            arr = data.get("response") or []
-            if not arr:
-                return None
-            e = arr[0]
-            return int(e["risetime"]), int(e["duration"])
-        except Exception:
-            return None
+    # ---------- Observer cells (call with the lock held) ----------
+    def _acquire_cell(self, key: CellKey) -> None:
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = ObserverCell.for_key(key)
+            heapq.heappush(self._events, (0.0, _REFRESH, key, 0.0))  # predict ASAP
+        cell.refs += 1
+
+    def _release_cell(self, key: Optional[CellKey]) -> None:
+        cell = self._cells.get(key) if key is not None else None
+        if cell is None:
+            return
+        cell.refs -= 1
+        if cell.refs <= 0:
+            del self._cells[key]
+
+    # ---------- Scheduling (call with the lock held) ----------
+    def _schedule_cell(self, key: CellKey, cell: ObserverCell) -> None:
+        at = float(cell.cached_at_epoch + PASS_TTL_S)
+        if cell.cached_next:
+            at = min(at, float(sum(cell.cached_next)))  # next pass once this one ends
+        cell.refresh_at = at
+        heapq.heappush(self._events, (at, _REFRESH, key, at))
+
+    def _schedule_guild(self, guild_id: int, g: GuildISSState) -> None:
+        cell = self._cells.get(g.cell) if g.cell is not None else None
+        nxt = cell.cached_next if cell else None
+        last = g.last_announced_start
+        if self._inflight.get(guild_id) is not None:
+            last = self._inflight[guild_id]  # already queued; don't queue twice
+        if not nxt or (last is not None and abs(nxt[0] - last) < SAME_PASS_S):
+            self._pending.pop(guild_id, None)
+            return
+        start = nxt[0]
+        due = (float(start - g.lead_seconds), start)
+        if self._pending.get(guild_id) != due:
+            self._pending[guild_id] = due
+            heapq.heappush(self._events, (due[0], _ANNOUNCE, guild_id, float(start)))
+
+    def _pop_due(self, now: float) -> Tuple[List[CellKey], List[int]]:
+        """Pop every event due by ``now``, skipping superseded ones."""
+        cells: List[CellKey] = []
+        guilds: List[int] = []
+        while self._events and self._events[0][0] <= now:
+            _, kind, key, token = heapq.heappop(self._events)
+            if kind == _REFRESH:
+                cell = self._cells.get(key)
+                if cell is not None and cell.refresh_at == token:
+                    cell.refresh_at = -1.0  # claimed; rescheduled after the batch
+                    cells.append(key)
+            else:
+                due = self._pending.get(key)
+                if due is not None and due[1] == token:
+                    guilds.append(key)
+        return cells, guilds
 
-    async def _next_pass_cached(self, g: GuildISSState, now_epoch: int, ttl_s: int = 120) -> Optional[Tuple[int, int]]:
-        if g.cached_next and (now_epoch - g.cached_at_epoch) <= ttl_s:
-            return g.cached_next
-        nxt = await self._fetch_next_pass(g.lat, g.lon, g.alt_m)
-        if nxt:
-            g.cached_next = nxt
-            g.cached_at_epoch = now_epoch
-        return nxt
-
-    # ---------- Single scheduler loop ----------
-    @tasks.loop(seconds=30)
-    async def scheduler(self) -> None:
+    def _next_wakeup(self) -> Optional[float]:
+        # Drop superseded entries so the sleep targets a live deadline
+        while self._events:
+            when, kind, key, token = self._events[0]
+            if kind == _REFRESH:
+                cell = self._cells.get(key)
+                live = cell is not None and cell.refresh_at == token
+            else:
+                due = self._pending.get(key)
+                live = due is not None and due[1] == token
+            if live:
+                return when
+            heapq.heappop(self._events)
+        return None
+
+    # ---------- Pass prediction ----------
+    async def _refresh_cells(self, keys: List[CellKey], now_epoch: int) -> None:
         """
-        Runs every 30s, checks all guilds, and posts at most one bundled message per cooldown window.
-        Announces ONLY when a pass is within the 6h (lead_seconds) window AND hasn't been announced yet.
+        Recompute the given cells' next pass in one batched (vectorized) call,
+        then reschedule them and their guilds.
         """
-        if not self._bot or not self._channel:
+        async with self._lock:
+            cells = [(k, self._cells[k]) for k in keys if k in self._cells]
+        if not cells:
             return
+        try:
+            found = await self.orbit.next_passes([(c.lat, c.lon, c.alt_m) for _, c in cells], now_epoch)
+        except Exception:
+            log.exception("ISS pass prediction failed; retrying in 10 min")
+            found = None
+        async with self._lock:
+            for i, (key, c) in enumerate(cells):
+                if self._cells.get(key) is not c:
+                    continue  # last guild left meanwhile
+                if found is None:
+                    c.refresh_at = float(now_epoch + 600)
+                    heapq.heappush(self._events, (c.refresh_at, _REFRESH, key, c.refresh_at))
+                    continue
+                p = found[i]
+                c.cached_next = None if p is None else (int(p.rise), int(p.duration))
+                c.cached_at_epoch = now_epoch
+                self._schedule_cell(key, c)
+            self._persist_tle()
+            changed = {key for key, _ in cells}
+            for gid, g in self._guilds.items():
+                if g.cell in changed:
+                    self._schedule_guild(gid, g)
 
-        now_epoch = int(discord.utils.utcnow().timestamp())
+    # ---------- Single scheduler task ----------
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("ISS scheduler tick failed")
+            async with self._lock:
+                wake_at = self._next_wakeup()
+            # Sleep until the earliest deadline, or until a subscription changes
+            timeout = None if wake_at is None else max(0.0, wake_at - time.time())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
-        # Channel cooldown to prevent bursts
-        if (now_epoch - self._channel_last_sent) < self._channel_cooldown_s:
+    async def _tick(self) -> None:
+        """
+        Handles every event that is due: refreshes cells, then queues one line per due
+        guild (the queue coalesces and paces them per channel). Announces ONLY when a
+        pass is within the 6h (lead_seconds) window AND hasn't been announced yet.
+        """
+        now_epoch = int(time.time())
+        async with self._lock:
+            cells, guilds = self._pop_due(now_epoch)
+        while cells:
+            await self._refresh_cells(cells, now_epoch)
+            # Fresh predictions may already be inside a guild's lead window
+            async with self._lock:
+                cells, more = self._pop_due(now_epoch)
+            guilds.extend(more)
+
+        if not guilds or self._queue is None or self._channel is None:
             return
 
-        # Snapshot guilds to iterate without holding lock during network I/O
         async with self._lock:
-            items = list(self._guilds.items())
-
-        lines: list[str] = []
-        updated_any = False
-
-        for guild_id, g in items:
-            nxt = await self._next_pass_cached(g, now_epoch)
-            if not nxt:
-                continue
-
-            start_epoch, duration_s = nxt
-            # Post exactly once when within lead_seconds and not yet announced for this risetime
-            if (start_epoch - now_epoch) <= g.lead_seconds and (g.last_announced_start != start_epoch):
-                g.last_announced_start = start_epoch
-                updated_any = True
-                hours = max(0, (start_epoch - now_epoch) // 3600)
-                when_txt = "now" if hours == 0 else f"in ~{hours}h"
-                lines.append(
-                    f"**ISS pass for guild {guild_id}** {when_txt} "
-                    f"(starts `<t:{start_epoch}:f>`, duration ~{duration_s // 60} min)."
-                )
+            for guild_id in sorted(set(guilds)):
+                g = self._guilds.get(guild_id)
+                due = self._pending.get(guild_id)
+                if g is None or due is None or due[0] > now_epoch:
+                    continue  # rescheduled meanwhile
+                del self._pending[guild_id]
+                start_epoch = due[1]
+                cell = self._cells.get(g.cell) if g.cell is not None else None
+                duration_s = cell.cached_next[1] if cell and cell.cached_next else 0
+                self._inflight[guild_id] = start_epoch
+                self._submit(guild_id, g.channel_id or self._default_channel_id(), start_epoch, duration_s)
+
+    # ---------- Persistence ----------
+    def _persist(self, guild_id: int, g: GuildISSState) -> None:
+        if self._store is not None:
+            self._store.put(guild_id, (g.lat, g.lon, g.alt_m, g.lead_seconds, g.last_announced_start, g.channel_id))
 
-        if not lines:
+    def _persist_tle(self) -> None:
+        tle = self.orbit.tle
+        if self._store is None or tle is None:
             return
+        saved = json.dumps(list(tle))
+        if saved != self._saved_tle:
+            self._saved_tle = saved
+            self._store.put_meta("tle", saved)
 
-        # Tiny jitter so multiple instances don't sync-blast
-        await asyncio.sleep(random.uniform(0.0, 1.25))
+    # ---------- Delivery ----------
+    def _default_channel_id(self) -> int:
+        return getattr(self._channel, "id", 0)
 
-        try:
-            await self._channel.send("\n".join(lines))
-            self._channel_last_sent = now_epoch
-        finally:
-            # Persist in-memory 'last_announced_start' updates
-            if updated_any:
-                async with self._lock:
-                    for gid, g in items:
-                        self._guilds[gid] = g
+    async def _resolve_channel(self, channel_id: int) -> Optional[discord.abc.Messageable]:
+        if self._channel is not None and channel_id == self._default_channel_id():
+            return self._channel
+        if self._bot is None:
+            return None
+        ch = self._bot.get_channel(channel_id)
+        if ch is None:
+            ch = await self._bot.fetch_channel(channel_id)
+        return ch if isinstance(ch, discord.abc.Messageable) else None
+
+    def _submit(self, guild_id: int, channel_id: int, start_epoch: int, duration_s: int) -> None:
+        hours = max(0, (start_epoch - int(time.time())) // 3600)
+        when_txt = "now" if hours == 0 else f"in ~{hours}h"
+        line = (
+            f"**ISS pass for guild {guild_id}** {when_txt} "
+            f"(starts `<t:{start_epoch}:f>`, duration ~{duration_s // 60} min)."
+        )
+        self._queue.submit(
+            Announcement(
+                channel_id,
+                line,
+                # Worth delivering until the pass is over
+                expires_at=start_epoch + max(duration_s, 60),
+                on_sent=partial(self._announced, guild_id, start_epoch),
+                on_failed=partial(self._announce_failed, guild_id, channel_id, start_epoch, duration_s),
+            )
+        )
+
+    def _announced(self, guild_id: int, start_epoch: int) -> None:
+        # Runs on the event loop between awaits, so no lock is needed
+        if self._inflight.get(guild_id) == start_epoch:
+            del self._inflight[guild_id]
+        g = self._guilds.get(guild_id)
+        if g is not None:
+            g.last_announced_start = start_epoch
+            self._persist(guild_id, g)
+
+    def _announce_failed(self, guild_id: int, channel_id: int, start_epoch: int, duration_s: int, reason: str) -> None:
+        default = self._default_channel_id()
+        if reason != "expired" and channel_id != default and self._queue is not None:
+            log.warning("ISS channel %s for guild %s unusable (%s); using the default channel", channel_id, guild_id, reason)
+            self._submit(guild_id, default, start_epoch, duration_s)
+            return
+        log.warning("ISS announcement for guild %s dropped (%s)", guild_id, reason)
+        if self._inflight.get(guild_id) == start_epoch:
+            del self._inflight[guild_id]
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+from typing import Dict, Optional, Set, Tuple
+
+from ..utils.sqlite import SQLiteWorker
+
+__all__ = ["ISSStore"]
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS iss_guilds (
+    guild_id             INTEGER PRIMARY KEY,
+    lat                  REAL NOT NULL,
+    lon                  REAL NOT NULL,
+    alt_m                INTEGER,
+    lead_seconds         INTEGER NOT NULL,
+    last_announced_start INTEGER,
+    channel_id           INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS iss_unsubscribed (
+    guild_id INTEGER PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS iss_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO iss_guilds
+    (guild_id, lat, lon, alt_m, lead_seconds, last_announced_start, channel_id)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(guild_id) DO UPDATE SET
+    lat = excluded.lat,
+    lon = excluded.lon,
+    alt_m = excluded.alt_m,
+    lead_seconds = excluded.lead_seconds,
+    last_announced_start = excluded.last_announced_start,
+    channel_id = excluded.channel_id
+"""
+
+_UPSERT_META = """
+INSERT INTO iss_meta (key, value) VALUES (?, ?)
+ON CONFLICT(key) DO UPDATE SET value = excluded.value
+"""
+
+# Back-off before retrying a failed flush (doubles up to the max)
+RETRY_MIN_S = 5.0
+RETRY_MAX_S = 300.0
+
+# (lat, lon, alt_m, lead_seconds, last_announced_start, channel_id)
+GuildRow = Tuple[float, float, Optional[int], int, Optional[int], Optional[int]]
+
+
+class ISSStore:
+    """
+    Durable ISS subscriptions and announcement state:
+      - One SQLite row per guild, every statement on one worker thread
+      - put()/delete() only queue; changes are debounced for ``debounce_s``
+        and written in one transaction, so a burst of updates (startup,
+        a pass announced to many guilds) is a single commit
+      - delete() leaves a tombstone in iss_unsubscribed, so a guild that
+        opted out isn't auto-subscribed again on the next start
+      - load() reads everything back in one query at startup
+    """
+
+    def __init__(self, path: str, *, debounce_s: float = 2.0) -> None:
+        self.path = path
+        self.debounce_s = float(debounce_s)
+        self._db = SQLiteWorker(path, name="iss-store")
+        self._pending: Dict[int, Optional[GuildRow]] = {}  # None = unsubscribe
+        self._pending_meta: Dict[str, str] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.writes = 0
+        self.flushes = 0
+
+    # ---------- Lifecycle ----------
+    async def open(self) -> None:
+        await self._db.open(_SCHEMA)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._writer())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._db.is_open:
+            await self.flush()
+        await self._db.close()
+
+    # ---------- Reads ----------
+    async def load(self) -> Tuple[Dict[int, GuildRow], Dict[str, str], Set[int]]:
+        """Every stored guild, meta value and unsubscribed guild id, in one
+        round trip."""
+
+        def _read(conn: sqlite3.Connection):
+            guilds = conn.execute(
+                "SELECT guild_id, lat, lon, alt_m, lead_seconds, "
+                "last_announced_start, channel_id FROM iss_guilds"
+            ).fetchall()
+            meta = conn.execute("SELECT key, value FROM iss_meta").fetchall()
+            gone = conn.execute("SELECT guild_id FROM iss_unsubscribed").fetchall()
+            return guilds, meta, gone
+
+        guilds, meta, gone = await self._db.call(_read)
+        return (
+            {row[0]: tuple(row[1:]) for row in guilds},
+            dict(meta),
+            {row[0] for row in gone},
+        )
+
+    # ---------- Writes (debounced) ----------
+    def put(self, guild_id: int, row: GuildRow) -> None:
+        self._pending[guild_id] = row
+        self._wake.set()
+
+    def delete(self, guild_id: int) -> None:
+        self._pending[guild_id] = None
+        self._wake.set()
+
+    def put_meta(self, key: str, value: str) -> None:
+        self._pending_meta[key] = value
+        self._wake.set()
+
+    async def flush(self) -> None:
+        if not self._pending and not self._pending_meta:
+            return
+        # Swap the batch out so changes during the write queue up separately
+        batch, self._pending = self._pending, {}
+        batch_meta, self._pending_meta = self._pending_meta, {}
+        upserts = [(gid, *row) for gid, row in batch.items() if row]
+        deletes = [(gid,) for gid, row in batch.items() if row is None]
+        meta = list(batch_meta.items())
+
+        def _write(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.executemany(_UPSERT, upserts)
+                conn.executemany(
+                    "DELETE FROM iss_unsubscribed WHERE guild_id = ?",
+                    [(gid,) for gid, *_ in upserts],
+                )
+                conn.executemany("DELETE FROM iss_guilds WHERE guild_id = ?", deletes)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO iss_unsubscribed (guild_id) VALUES (?)",
+                    deletes,
+                )
+                conn.executemany(_UPSERT_META, meta)
+
+        try:
+            await self._db.call(_write)
+        except Exception:
+            # Nothing was committed: requeue, letting newer changes win
+            for gid, row in batch.items():
+                self._pending.setdefault(gid, row)
+            for key, value in batch_meta.items():
+                self._pending_meta.setdefault(key, value)
+            raise
+        self.writes += len(upserts) + len(deletes) + len(meta)
+        self.flushes += 1
+
+    async def _writer(self) -> None:
+        backoff = RETRY_MIN_S
+        while True:
+            await self._wake.wait()
+            # Let a burst of changes settle into one transaction
+            await asyncio.sleep(self.debounce_s)
+            self._wake.clear()
+            try:
+                await self.flush()
+                backoff = RETRY_MIN_S
+            except sqlite3.Error:
+                log.exception("ISS store flush failed; retrying in %.0fs", backoff)
+                # flush() requeued the batch; wake ourselves to retry it
+                await asyncio.sleep(backoff)
+                backoff = min(RETRY_MAX_S, backoff * 2)
+                self._wake.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "store_pending": len(self._pending) + len(self._pending_meta),
+            "store_writes": self.writes,
+            "store_flushes": self.flushes,
+        }
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from ..models.alert_models import Alert, AlertEvent
+from ..utils.http import PoolLimits, PoolStats, pooled_session
+
+__all__ = ["NWS_API", "NWSAlertService", "AlertHandler"]
+
+log = logging.getLogger(__name__)
+
+NWS_API = "https://api.weather.gov"
+ALERTS_PATH = "/alerts/active"
+
+# Bodies larger than this are decoded off the event loop
+THREADED_DECODE_BYTES = 256 * 1024
+# Yield to the loop every N features while walking a large feed
+YIELD_EVERY = 200
+
+AlertHandler = Callable[[List[AlertEvent]], Awaitable[None]]
+
+
+class NWSAlertService:
+    """
+    Ingest for the NWS ``/alerts/active`` feed:
+      - Conditional GETs (If-None-Match / If-Modified-Since), so an unchanged
+        feed is a bodyless 304
+      - Features are walked one at a time and only messages we haven't seen
+        (new id, or a known id with a new ``sent``) are built into ``Alert``s
+      - Deduped by id and by the ``references`` chain: a message replaced by
+        a later update/cancel is never emitted on its own
+      - ``base_url`` is injectable so the poller can run against a local
+        stub server replaying recorded feeds
+    """
+
+    def __init__(
+        self,
+        contact_email: str,
+        *,
+        base_url: str = NWS_API,
+        area: str = "FL",
+        interval_s: float = 90.0,
+        max_backoff_s: float = 900.0,
+        retention_s: float = 48 * 3600,
+        limits: Optional[PoolLimits] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.params = {"status": "actual", "area": area}
+        self.interval_s = max(10.0, float(interval_s))
+        self.max_backoff_s = float(max_backoff_s)
+        self.retention_s = float(retention_s)
+        self.limits = limits or PoolLimits(total=4, per_host=2, timeout_s=20.0)
+        # NWS asks every client to identify itself with a way to reach them
+        self.headers = {
+            "User-Agent": f"(mARCoBot/1.0, {contact_email})",
+            "Accept": "application/geo+json",
+        }
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.pool_stats = PoolStats()
+        self._task: Optional[asyncio.Task] = None
+
+        # Conditional request validators from the last 200
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+
+        self._seen: Dict[str, Tuple[str, float]] = {}  # id -> (sent, last in feed)
+        self._superseded: Dict[str, float] = {}  # id -> when it was replaced
+        self.active: Dict[str, Alert] = {}  # current, non-superseded alerts
+
+        self.polls = 0
+        self.not_modified = 0
+        self.parsed = 0
+        self.skipped = 0
+        self.emitted = 0
+        self.errors = 0
+
+    # ---------- Lifecycle ----------
+    async def start(
+        self, handler: Optional[AlertHandler] = None, *, replay: bool = False
+    ) -> None:
+        """Open the session and, with a handler, start polling.
+
+        The first poll only learns what is already active unless ``replay``
+        is set, so a restart doesn't re-post every alert in the feed.
+        """
+        if self.session is None or self.session.closed:
+            self.session = pooled_session(self.limits, self.pool_stats, self.headers)
+        if handler is not None and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(
+                self._run(handler, replay), name="nws-alerts"
+            )
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    # ---------- Fetch ----------
+    async def _fetch(self) -> Optional[Dict[str, Any]]:
+        """The feed document, or None when it's unchanged (304)."""
+        if self.session is None or self.session.closed:
+            await self.start()
+        headers: Dict[str, str] = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        async with self.session.get(
+            self.base_url + ALERTS_PATH, params=self.params, headers=headers
+        ) as resp:
+            if resp.status == 304:
+                self.not_modified += 1
+                return None
+            resp.raise_for_status()
+            body = await resp.read()
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+
+        if len(body) > THREADED_DECODE_BYTES:
+            doc = await asyncio.to_thread(json.loads, body)
+        else:
+            doc = json.loads(body)
+        # Only trust the validators once the body decoded
+        self._etag = etag
+        self._last_modified = last_modified
+        return doc
+
+    async def zone_geometry(self, zone_id: str) -> Optional[Dict[str, Any]]:
+        """GeoJSON outline of an NWS county (FLC095) or forecast/marine
+        (FLZ045, AMZ550) zone."""
+        if self.session is None or self.session.closed:
+            await self.start()
+        kind = "county" if zone_id[2:3] == "C" else "forecast"
+        url = f"{self.base_url}/zones/{kind}/{zone_id}"
+        async with self.session.get(url) as resp:
+            resp.raise_for_status()
+            doc = await resp.json(content_type=None)
+        return doc.get("geometry")
+
+    # ---------- Poll ----------
+    async def poll(self) -> List[AlertEvent]:
+        """One conditional fetch; the alerts that are new or updated since
+        the previous poll."""
+        self.polls += 1
+        doc = await self._fetch()
+        now = time.monotonic()
+        if doc is None:
+            self._prune(now)
+            return []
+
+        features = doc.get("features") or []
+        in_feed: set[str] = set()
+        fresh: List[Tuple[Alert, bool]] = []  # (alert, known id re-sent)
+        for i, feature in enumerate(features):
+            if i and i % YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            props = feature.get("properties") or {}
+            aid = props.get("id") or feature.get("id")
+            if not aid:
+                continue
+            in_feed.add(aid)
+            sent = props.get("sent") or ""
+            prev = self._seen.get(aid)
+            self._seen[aid] = (sent, now)
+            if prev is not None and prev[0] == sent:
+                self.skipped += 1
+                continue
+            try:
+                alert = Alert.from_feature(feature)
+            except (TypeError, ValueError, KeyError):
+                log.warning("Skipping malformed NWS alert %s", aid, exc_info=True)
+                continue
+            self.parsed += 1
+            fresh.append((alert, prev is not None))
+
+        # Anything a message in this (or an earlier) batch replaces is stale
+        for alert, _ in fresh:
+            for ref in alert.references:
+                self._superseded.setdefault(ref, now)
+
+        events: List[AlertEvent] = []
+        for alert, resent in sorted(fresh, key=lambda x: x[0].sent or 0.0):
+            if alert.id in self._superseded:
+                continue
+            if alert.is_cancel:
+                kind = "cancel"
+            elif resent or alert.references or alert.message_type == "Update":
+                kind = "update"
+            else:
+                kind = "new"
+            events.append(AlertEvent(kind, alert, alert.references))
+            if not alert.is_cancel:
+                self.active[alert.id] = alert
+
+        for aid in list(self.active):
+            if aid not in in_feed or aid in self._superseded:
+                del self.active[aid]
+        self._prune(now)
+        self.emitted += len(events)
+        return events
+
+    def _prune(self, now: float) -> None:
+        # Ids that left the feed long ago can't come back; forget them
+        cutoff = now - self.retention_s
+        for aid in [a for a, (_, seen) in self._seen.items() if seen < cutoff]:
+            del self._seen[aid]
+        for aid in [a for a, when in self._superseded.items() if when < cutoff]:
+            del self._superseded[aid]
+
+    # ---------- Loop ----------
+    def _retry_after(self, e: Exception) -> Optional[float]:
+        if isinstance(e, aiohttp.ClientResponseError) and e.status in (429, 503):
+            try:
+                return float((e.headers or {}).get("Retry-After", ""))
+            except ValueError:
+                return None
+        return None
+
+    async def _run(self, handler: AlertHandler, replay: bool) -> None:
+        primed = replay
+        failures = 0
+        while True:
+            started = time.monotonic()
+            delay = self.interval_s
+            try:
+                events = await self.poll()
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                self.errors += 1
+                failures += 1
+                wait = self._retry_after(e)
+                if wait is None:
+                    wait = self.interval_s * 2 ** min(failures, 8)
+                delay = min(self.max_backoff_s, wait) * random.uniform(0.9, 1.1)
+                log.warning("NWS alert poll failed (%s); retrying in %.0fs", e, delay)
+                events = None
+
+            if events is not None:
+                if not primed:
+                    primed = True
+                    log.info("NWS alerts primed with %d active", len(self.active))
+                elif events:
+                    try:
+                        await handler(events)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        log.exception("NWS alert handler failed")
+                delay -= time.monotonic() - started
+            await asyncio.sleep(max(1.0, delay))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "polls": self.polls,
+            "not_modified": self.not_modified,
+            "parsed": self.parsed,
+            "skipped": self.skipped,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "active": len(self.active),
+            "tracked_ids": len(self._seen),
+            **self.pool_stats.as_dict(),
+        }
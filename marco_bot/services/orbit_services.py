@@ -0,0 +1,548 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import numpy as np
+from sgp4.api import Satrec
+from sgp4.propagation import gstime
+
+__all__ = [
+    "CELESTRAK_ISS_TLE",
+    "Ephemeris",
+    "Observer",
+    "OrbitService",
+    "Pass",
+    "observer_vectors",
+    "parse_tle",
+]
+
+log = logging.getLogger(__name__)
+
+# NORAD 25544 = ISS (ZARYA)
+CELESTRAK_ISS_TLE = "https://celestrak.org/NORAD/elements/gp.php?CATNR=25544&FORMAT=TLE"
+
+# WGS84
+_A_KM = 6378.137
+_F = 1 / 298.257223563
+_E2 = _F * (2 - _F)
+
+_UNIX_EPOCH_JD = 2440587.5
+
+Vec = Tuple[float, float, float]
+
+
+def _jd(t: float) -> Tuple[float, float]:
+    """Unix seconds -> (whole Julian day, fraction) for sgp4."""
+    days = t / 86400.0
+    whole = math.floor(days)
+    return _UNIX_EPOCH_JD + whole, days - whole
+
+
+def _gmst(jd_ut1: np.ndarray) -> np.ndarray:
+    """Greenwich mean sidereal time (radians); ``gstime`` for arrays."""
+    t = (jd_ut1 - 2451545.0) / 36525.0
+    sec = (
+        -6.2e-6 * t * t * t
+        + 0.093104 * t * t
+        + (876600.0 * 3600 + 8640184.812866) * t
+        + 67310.54841
+    )
+    return np.mod(np.radians(sec / 240.0), 2 * math.pi)
+
+
+def parse_tle(text: str) -> Tuple[str, str]:
+    """Return the (line 1, line 2) pair from a 2- or 3-line TLE text."""
+    lines = [ln.strip() for ln in text.strip().splitlines() if ln.strip()]
+    for i in range(len(lines) - 1):
+        if lines[i].startswith("1 ") and lines[i + 1].startswith("2 "):
+            return lines[i], lines[i + 1]
+    raise ValueError("no TLE line pair found")
+
+
+@dataclass(frozen=True, slots=True)
+class Pass:
+    """One visible pass above ``min_elevation`` (epoch seconds, degrees)."""
+
+    rise: float
+    culminate: float
+    set: float
+    max_elevation: float
+
+    @property
+    def duration(self) -> float:
+        return self.set - self.rise
+
+
+def observer_vectors(lat, lon, alt_m=None) -> Tuple[np.ndarray, np.ndarray]:
+    """Earth-fixed positions (km) and local up vectors for arrays of sites."""
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lam = np.radians(np.asarray(lon, dtype=np.float64))
+    h = np.zeros_like(phi) if alt_m is None else np.asarray(alt_m, np.float64) / 1000
+    sp, cp, sl, cl = np.sin(phi), np.cos(phi), np.sin(lam), np.cos(lam)
+    n = _A_KM / np.sqrt(1 - _E2 * sp * sp)
+    ecef = np.stack(
+        ((n + h) * cp * cl, (n + h) * cp * sl, (n * (1 - _E2) + h) * sp), axis=-1
+    )
+    up = np.stack((cp * cl, cp * sl, sp), axis=-1)
+    return ecef, up
+
+
+def _sin_el_grid(pos: np.ndarray, ecef: np.ndarray, up: np.ndarray) -> np.ndarray:
+    """sin(elevation) for every (time, site) pair, shaped (times, sites).
+
+    Expanded as dot products so no (times, sites, 3) array is materialized.
+    """
+    num = pos @ up.T - np.einsum("ij,ij->i", ecef, up)
+    d2 = (
+        np.einsum("ij,ij->i", pos, pos)[:, None]
+        + np.einsum("ij,ij->i", ecef, ecef)
+        - 2.0 * (pos @ ecef.T)
+    )
+    return num / np.sqrt(d2)
+
+
+class Observer:
+    """Ground station in Earth-fixed coordinates (km) with its local up vector."""
+
+    __slots__ = ("lat", "lon", "alt_m", "ecef", "up")
+
+    def __init__(self, lat: float, lon: float, alt_m: Optional[float] = None):
+        self.lat = lat
+        self.lon = lon
+        self.alt_m = alt_m or 0.0
+        ecef, up = observer_vectors(lat, lon, self.alt_m)
+        self.ecef: Vec = tuple(ecef.tolist())
+        self.up: Vec = tuple(up.tolist())
+
+    def elevation(self, sat: Vec) -> float:
+        """Elevation (degrees) of an Earth-fixed satellite position."""
+        ox, oy, oz = self.ecef
+        rx, ry, rz = sat[0] - ox, sat[1] - oy, sat[2] - oz
+        rng = math.sqrt(rx * rx + ry * ry + rz * rz)
+        ux, uy, uz = self.up
+        return math.degrees(math.asin((rx * ux + ry * uy + rz * uz) / rng))
+
+
+class Ephemeris:
+    """
+    ISS positions on a shared time grid, computed once for every observer:
+      - One vectorized SGP4 run over [start, end) at ``step_s``; positions are
+        rotated from TEME to Earth-fixed so observers only need dot products
+      - ``passes`` serves one observer; ``next_passes`` takes every observer
+        as arrays, scans the grid for all of them at once and refines the
+        crossings with batched root finding, so a tick costs about the same
+        for thousands of observers as for one
+    """
+
+    # Rows of the grid scanned per block in ``next_passes``; observers that
+    # found their pass drop out before the next block
+    BLOCK_ROWS = 512
+    # Longest possible ISS pass; blocks overlap by this so none is cut
+    MAX_PASS_S = 1200.0
+    # Sub-samples per grid step when refining crossings and culminations
+    SUBSTEPS = 20
+
+    def __init__(self, sat: Satrec, start: float, end: float, step_s: float) -> None:
+        self.sat = sat
+        self.start = start
+        self.step_s = step_s
+        times = np.arange(start, end, step_s)
+        positions, ok = self._positions(times)
+        self.times: np.ndarray = times[ok]
+        self.positions: np.ndarray = positions[ok]
+        self.end = float(self.times[-1]) if len(self.times) else start
+
+    def _positions(self, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Earth-fixed positions at epoch seconds ``t`` and a validity mask."""
+        days = t / 86400.0
+        whole = np.floor(days)
+        jd, fr = _UNIX_EPOCH_JD + whole, days - whole
+        err, r, _ = self.sat.sgp4_array(jd, fr)
+        g = _gmst(jd + fr)
+        cg, sg = np.cos(g), np.sin(g)
+        x, y = r[:, 0], r[:, 1]
+        pos = np.stack((cg * x + sg * y, -sg * x + cg * y, r[:, 2]), axis=-1)
+        return pos, err == 0
+
+    def position(self, t: float) -> Optional[Vec]:
+        jd, fr = _jd(t)
+        err, (x, y, z), _ = self.sat.sgp4(jd, fr)
+        if err:
+            return None
+        g = gstime(jd + fr)
+        cg, sg = math.cos(g), math.sin(g)
+        return (cg * x + sg * y, -sg * x + cg * y, z)
+
+    def elevation_at(self, obs: Observer, t: float) -> float:
+        pos = self.position(t)
+        return obs.elevation(pos) if pos is not None else -90.0
+
+    def _crossing(self, obs: Observer, lo: float, hi: float, min_el: float) -> float:
+        """Bisect the time in (lo, hi] where elevation crosses ``min_el``."""
+        rising = self.elevation_at(obs, lo) < min_el
+        for _ in range(20):  # step / 2**20 is well under a second
+            mid = 0.5 * (lo + hi)
+            if (self.elevation_at(obs, mid) < min_el) == rising:
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    def _peak(self, obs: Observer, lo: float, hi: float) -> Tuple[float, float]:
+        """Golden-section search for the highest point between rise and set."""
+        inv = (math.sqrt(5) - 1) / 2
+        a, b = lo, hi
+        c, d = b - inv * (b - a), a + inv * (b - a)
+        fc, fd = self.elevation_at(obs, c), self.elevation_at(obs, d)
+        while b - a > 1.0:
+            if fc > fd:
+                b, d, fd = d, c, fc
+                c = b - inv * (b - a)
+                fc = self.elevation_at(obs, c)
+            else:
+                a, c, fc = c, d, fd
+                d = a + inv * (b - a)
+                fd = self.elevation_at(obs, d)
+        t = 0.5 * (a + b)
+        return t, self.elevation_at(obs, t)
+
+    def passes(
+        self, obs: Observer, after: float, min_el: float = 10.0, limit: int = 1
+    ) -> List[Pass]:
+        """Passes that haven't ended by ``after``, soonest first."""
+        out: List[Pass] = []
+        times = self.times
+        sin_el = _sin_el_grid(self.positions, np.array([obs.ecef]), np.array([obs.up]))[
+            :, 0
+        ]
+        up = sin_el >= math.sin(math.radians(min_el))
+        rise: Optional[float] = float(times[0]) if len(up) and up[0] else None
+        for i in (np.flatnonzero(up[1:] != up[:-1]) + 1).tolist():
+            lo, hi = float(times[i - 1]), float(times[i])
+            if up[i]:
+                rise = self._crossing(obs, lo, hi, min_el)
+            elif rise is not None:
+                set_ = self._crossing(obs, lo, hi, min_el)
+                if set_ > after:
+                    peak_t, peak_el = self._peak(obs, rise, set_)
+                    out.append(Pass(rise, peak_t, set_, peak_el))
+                    if len(out) >= limit:
+                        break
+                rise = None
+        return out
+
+    # ---------- Batched (all observers at once) ----------
+    def _fine(self, k0: np.ndarray, rows: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Sub-sampled times and positions over grid rows [k0, k0 + rows].
+
+        Observers watching the same pass share brackets, so each distinct
+        bracket is propagated once and the result gathered per observer.
+        """
+        ks, inv = np.unique(k0, return_inverse=True)
+        offs = np.arange(rows * self.SUBSTEPS + 1) * (self.step_s / self.SUBSTEPS)
+        t = self.times[ks][:, None] + offs
+        pos, ok = self._positions(t.ravel())
+        pos[~ok] = np.nan
+        return t[inv], pos.reshape(len(ks), len(offs), 3)[inv]
+
+    @staticmethod
+    def _sin_el_fine(pos: np.ndarray, ecef: np.ndarray, up: np.ndarray) -> np.ndarray:
+        rel = pos - ecef[:, None, :]
+        num = np.einsum("ijk,ik->ij", rel, up)
+        return num / np.sqrt(np.einsum("ijk,ijk->ij", rel, rel))
+
+    def _crossings(
+        self, k: np.ndarray, ecef: np.ndarray, up: np.ndarray, thresh: float
+    ) -> np.ndarray:
+        """Time each observer's elevation crosses ``thresh`` in grid bracket
+        (k - 1, k]: the first sign change on the sub-grid, then linear
+        interpolation within that sub-step (elevation is smooth there)."""
+        t, pos = self._fine(k - 1, 1)
+        f = self._sin_el_fine(pos, ecef, up) - thresh
+        change = np.signbit(f[:, :-1]) != np.signbit(f[:, 1:])
+        j = np.argmax(change, axis=1)
+        n = np.arange(len(k))
+        f0, f1 = f[n, j], f[n, j + 1]
+        t0, t1 = t[n, j], t[n, j + 1]
+        denom = np.where(f1 == f0, 1.0, f1 - f0)
+        root = t0 - f0 * (t1 - t0) / denom
+        return np.where(change.any(axis=1) & np.isfinite(root), root, t[:, -1])
+
+    def _peaks(
+        self, rise: np.ndarray, set_: np.ndarray, ecef: np.ndarray, up: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Culmination time and sin(elevation): the sub-grid maximum around
+        mid-pass, refined with a parabola through its neighbours."""
+        mid = 0.5 * (rise + set_)
+        last = len(self.times) - 1
+        # Three grid steps with mid-pass in the middle one; ISS passes are
+        # near-symmetric, so the peak is within seconds of it
+        k0 = np.searchsorted(self.times, mid, side="right") - 2
+        k0 = np.clip(k0, 0, max(0, last - 3))
+        t, pos = self._fine(k0, min(3, last))
+        f = self._sin_el_fine(pos, ecef, up)
+        inside = (t >= rise[:, None]) & (t <= set_[:, None])
+        j = np.argmax(np.where(inside & np.isfinite(f), f, -2.0), axis=1)
+        j = np.clip(j, 1, f.shape[1] - 2)
+        n = np.arange(len(rise))
+        fa, fb, fc = f[n, j - 1], f[n, j], f[n, j + 1]
+        curv = fa - 2.0 * fb + fc
+        ok = curv < 0.0
+        x = np.where(ok, 0.5 * (fa - fc) / np.where(ok, curv, -1.0), 0.0)
+        x = np.clip(x, -1.0, 1.0)
+        peak_t = t[n, j] + x * (self.step_s / self.SUBSTEPS)
+        peak_f = fb - 0.25 * (fa - fc) * x
+        return np.clip(peak_t, rise, set_), peak_f
+
+    def _scan(
+        self, ecef: np.ndarray, up: np.ndarray, min_k: np.ndarray, thresh: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Grid rows of each observer's first set at or after ``min_k`` and
+        of the rise before it (-1 where no set is in range)."""
+        times, positions = self.times, self.positions
+        n = len(ecef)
+        rise_k = np.full(n, -1, dtype=np.int64)
+        set_k = np.full(n, -1, dtype=np.int64)
+        min_k = min_k.copy()
+        pending = np.arange(n)
+        back = int(math.ceil(self.MAX_PASS_S / self.step_s)) + 1
+        while len(pending):
+            w0 = max(0, int(min_k[pending].min()) - back)
+            if w0 >= len(times) - 1:
+                break
+            w1 = min(len(times), w0 + back + self.BLOCK_ROWS)
+            vis = _sin_el_grid(positions[w0:w1], ecef[pending], up[pending]) >= thresh
+            rows = np.arange(w0 + 1, w1)[:, None]
+            sets = vis[:-1] & ~vis[1:] & (rows >= min_k[pending])
+            found = sets.any(axis=0)
+            k = w0 + 1 + np.argmax(sets, axis=0)
+            # Last rise before that set; none means the pass was up at w0
+            rises = ~vis[:-1] & vis[1:] & (rows < k)
+            last = w1 - 1 - np.argmax(rises[::-1], axis=0)
+            hit = pending[found]
+            set_k[hit] = k[found]
+            rise_k[hit] = np.where(rises.any(axis=0), last, w0)[found]
+            if w1 == len(times):
+                break
+            pending = pending[~found]
+            min_k[pending] = w1
+        return rise_k, set_k
+
+    def next_passes(
+        self, lat, lon, alt_m=None, after: float = 0.0, min_el: float = 10.0
+    ) -> List[Optional[Pass]]:
+        """Next pass (not ended by ``after``) for each observer row.
+
+        ``lat``, ``lon`` and ``alt_m`` are equal-length sequences or arrays;
+        the result is aligned with them (None where no pass is in range).
+        """
+        ecef, up = observer_vectors(lat, lon, alt_m)
+        ecef, up = np.atleast_2d(ecef), np.atleast_2d(up)
+        times = self.times
+        thresh = math.sin(math.radians(min_el))
+        out: List[Optional[Pass]] = [None] * len(ecef)
+
+        todo = np.arange(len(ecef))
+        min_k = np.full(len(ecef), int(np.searchsorted(times, after, side="right")))
+        # Two rounds: a set whose grid bracket straddles ``after`` can refine
+        # to just before it, and then the following pass is wanted instead
+        for _ in range(2):
+            rise_k, set_k = self._scan(ecef[todo], up[todo], min_k[todo], thresh)
+            found = set_k >= 0
+            todo, rk, sk = todo[found], rise_k[found], set_k[found]
+            if not len(todo):
+                break
+            e, u = ecef[todo], up[todo]
+            set_ = self._crossings(sk, e, u, thresh)
+            live = set_ > after
+            if not live.all():
+                min_k[todo[~live]] = sk[~live] + 1
+            # A pass already up at the start of the grid rises at the grid start
+            at_start = rk[live] == 0
+            rk1 = np.maximum(rk[live], 1)
+            rise = self._crossings(rk1, e[live], u[live], thresh)
+            rise = np.where(at_start, times[0], rise)
+            peak_t, peak_s = self._peaks(rise, set_[live], e[live], u[live])
+            peak_el = np.degrees(np.arcsin(np.clip(peak_s, -1.0, 1.0)))
+            for i, r, c, s, m in zip(
+                todo[live].tolist(),
+                rise.tolist(),
+                peak_t.tolist(),
+                set_[live].tolist(),
+                peak_el.tolist(),
+            ):
+                out[i] = Pass(r, c, s, m)
+            todo = todo[~live]
+            if not len(todo):
+                break
+        return out
+
+
+class OrbitService:
+    """
+    On-box ISS pass predictor (SGP4):
+      - The TLE is fetched from Celestrak at most every ``tle_refresh_s``
+        (or read from ``tle_file``, e.g. for testing)
+      - One shared ephemeris covers the next ``horizon_s`` for all guilds;
+        it is rebuilt hourly or when the TLE changes
+      - ``next_passes`` answers every observer in one vectorized call, off
+        the event loop
+    """
+
+    _instance: Optional["OrbitService"] = None
+
+    def __init__(
+        self,
+        *,
+        tle_url: str = CELESTRAK_ISS_TLE,
+        tle_file: Optional[str] = None,
+        tle_refresh_s: float = 6 * 3600,
+        horizon_s: float = 26 * 3600,
+        rebuild_s: float = 3600,
+        step_s: float = 20.0,
+        min_elevation: float = 10.0,
+    ) -> None:
+        self.tle_url = tle_url
+        self.tle_file = tle_file if tle_file is not None else os.getenv("ISS_TLE_FILE")
+        self.tle_refresh_s = float(tle_refresh_s)
+        self.horizon_s = float(horizon_s)
+        self.rebuild_s = float(rebuild_s)
+        self.step_s = float(step_s)
+        self.min_elevation = float(min_elevation)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tle: Optional[Tuple[str, str]] = None
+        self._tle_at = 0.0
+        self._eph: Optional[Ephemeris] = None
+        self._lock = asyncio.Lock()
+
+        self.tle_fetches = 0
+        self.builds = 0
+        self.batches = 0
+
+    @classmethod
+    def get(cls) -> "OrbitService":
+        if cls._instance is None:
+            cls._instance = OrbitService()
+        return cls._instance
+
+    def attach(self, session: aiohttp.ClientSession) -> None:
+        self._session = session
+
+    @property
+    def tle(self) -> Optional[Tuple[str, str, float]]:
+        """Current elements and when they were last checked (for persisting)."""
+        return (*self._tle, self._tle_at) if self._tle else None
+
+    def seed_tle(self, line1: str, line2: str, checked_at: float) -> None:
+        """Start from saved elements instead of fetching at startup; they are
+        refreshed once ``tle_refresh_s`` has passed since ``checked_at``."""
+        if self._tle is None:
+            self._tle = (line1, line2)
+            self._tle_at = float(checked_at)
+
+    # ---------- TLE ----------
+    async def _load_tle(self) -> Optional[Tuple[str, str]]:
+        if self.tle_file:
+            with open(self.tle_file, "r", encoding="utf-8") as f:
+                return parse_tle(f.read())
+        if self._session is None:
+            return None
+        timeout = aiohttp.ClientTimeout(total=15)
+        async with self._session.get(self.tle_url, timeout=timeout) as resp:
+            resp.raise_for_status()
+            return parse_tle(await resp.text())
+
+    async def _refresh_tle(self, now: float) -> None:
+        if self._tle is not None and now - self._tle_at < self.tle_refresh_s:
+            return
+        try:
+            tle = await self._load_tle()
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError) as e:
+            # Keep flying the old elements; SGP4 stays usable for days
+            log.warning("ISS TLE refresh failed: %s", e)
+            self._tle_at = now - self.tle_refresh_s + 600  # retry in 10 min
+            return
+        self._tle_at = now
+        if tle is None:
+            return
+        self.tle_fetches += 1
+        if tle != self._tle:
+            self._tle = tle
+            self._eph = None  # new elements: rebuild the grid
+
+    # ---------- Ephemeris ----------
+    async def ephemeris(self, now: Optional[float] = None) -> Optional[Ephemeris]:
+        now = time.time() if now is None else now
+        async with self._lock:
+            await self._refresh_tle(now)
+            if self._tle is None:
+                return None
+            eph = self._eph
+            if eph is None or now - eph.start > self.rebuild_s + 600:
+                sat = Satrec.twoline2rv(*self._tle)
+                # Start a little in the past so a pass in progress is caught
+                start = now - 600
+                eph = await asyncio.to_thread(
+                    Ephemeris, sat, start, start + self.horizon_s, self.step_s
+                )
+                self._eph = eph
+                self.builds += 1
+            return eph
+
+    async def next_pass(
+        self,
+        lat: float,
+        lon: float,
+        alt_m: Optional[float] = None,
+        after: Optional[float] = None,
+    ) -> Optional[Pass]:
+        """Next pass above ``min_elevation`` that hasn't ended by ``after``."""
+        after = time.time() if after is None else after
+        eph = await self.ephemeris(after)
+        if eph is None:
+            return None
+        found = eph.passes(Observer(lat, lon, alt_m), after, self.min_elevation)
+        return found[0] if found else None
+
+    async def next_passes(
+        self,
+        observers: Sequence[Tuple[float, float, Optional[float]]],
+        after: Optional[float] = None,
+    ) -> List[Optional[Pass]]:
+        """``next_pass`` for many (lat, lon, alt_m) rows in one batched scan."""
+        after = time.time() if after is None else after
+        eph = await self.ephemeris(after)
+        if eph is None or not observers:
+            return [None] * len(observers)
+        rows = np.array(
+            [(lat, lon, alt or 0.0) for lat, lon, alt in observers], dtype=np.float64
+        )
+        self.batches += 1
+        return await asyncio.to_thread(
+            eph.next_passes,
+            rows[:, 0],
+            rows[:, 1],
+            rows[:, 2],
+            after,
+            self.min_elevation,
+        )
+
+    def stats(self) -> Dict[str, object]:
+        eph = self._eph
+        return {
+            "tle_fetches": self.tle_fetches,
+            "tle_checked_s_ago": (
+                round(time.time() - self._tle_at) if self._tle else None
+            ),
+            "ephemeris_builds": self.builds,
+            "ephemeris_points": len(eph.times) if eph else 0,
+            "pass_batches": self.batches,
+        }
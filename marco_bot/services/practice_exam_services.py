@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import random
+import time
+from array import array
+from typing import Dict, Optional
+
+from ..models.question_models import Question
+from .question_pool_services import QuestionPool
+
+__all__ = ["ExamSession", "PracticeExams", "build_exam"]
+
+UNANSWERED = 0xFF
+
+
+def build_exam(pool: QuestionPool, rng: Optional[random.Random] = None) -> array:
+    """One random question from every group, in pool order.
+
+    Uses the pool's precomputed group index, so this is O(groups) rather
+    than a scan over every question.
+    """
+    rng = rng or random
+    return array("H", (rng.choice(r) for r in pool.groups.values()))
+
+
+class ExamSession:
+    """
+    One member's practice exam, kept small:
+      - The pool reference pins the version the exam was drawn from, even if
+        a newer one is swapped in meanwhile
+      - Question indices in an ``array('H')``, chosen letters in a bytearray
+    """
+
+    __slots__ = ("user_id", "level", "pool", "questions", "answers", "pos", "started")
+
+    def __init__(self, user_id: int, level: str, pool: QuestionPool, questions: array):
+        self.user_id = user_id
+        self.level = level
+        self.pool = pool
+        self.questions = questions
+        self.answers = bytearray([UNANSWERED]) * len(questions)
+        self.pos = 0
+        self.started = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    @property
+    def done(self) -> bool:
+        return self.pos >= len(self.questions)
+
+    def current(self) -> Question:
+        return self.pool[self.questions[self.pos]]
+
+    def answer(self, choice: int) -> Question:
+        """Record ``choice`` for the current question and advance."""
+        q = self.current()
+        self.answers[self.pos] = choice
+        self.pos += 1
+        return q
+
+    def score(self) -> int:
+        return sum(
+            1
+            for i, choice in zip(self.questions, self.answers)
+            if choice != UNANSWERED and self.pool[i].correct == choice
+        )
+
+    def missed(self) -> list[Question]:
+        out = []
+        for i, choice in zip(self.questions, self.answers):
+            q = self.pool[i]
+            if choice != UNANSWERED and q.correct != choice:
+                out.append(q)
+        return out
+
+
+class PracticeExams:
+    """
+    Active practice exams, one per user:
+      - Starting a new exam replaces the old one
+      - Sessions older than ``ttl_s`` are dropped on the next start or get()
+    """
+
+    def __init__(self, ttl_s: float = 2 * 3600) -> None:
+        self.ttl_s = float(ttl_s)
+        self._sessions: Dict[int, ExamSession] = {}
+
+    def start(self, user_id: int, level: str, pool: QuestionPool) -> ExamSession:
+        self._expire()
+        session = ExamSession(user_id, level, pool, build_exam(pool))
+        self._sessions[user_id] = session
+        return session
+
+    def get(self, user_id: int) -> Optional[ExamSession]:
+        """The user's exam, or None if there is none or it outlived ``ttl_s``."""
+        session = self._sessions.get(user_id)
+        if session is not None and session.started < time.monotonic() - self.ttl_s:
+            del self._sessions[user_id]
+            return None
+        return session
+
+    def end(self, user_id: int) -> Optional[ExamSession]:
+        return self._sessions.pop(user_id, None)
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_s
+        for uid in [u for u, s in self._sessions.items() if s.started < cutoff]:
+            del self._sessions[uid]
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,525 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import datetime as dt
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from ..models.question_models import Question
+
+__all__ = [
+    "LEVELS",
+    "POOL_DIR",
+    "PoolFile",
+    "QuestionPool",
+    "QuestionPoolRegistry",
+    "compile_pool",
+    "compiled_path",
+    "open_pool",
+]
+
+log = logging.getLogger(__name__)
+
+POOL_DIR = Path(__file__).resolve().parent.parent / "cogs" / "question_pools"
+
+# ---------- Compiled pool layout (all integers little-endian) ----------
+# header     see _HEADER below
+# strings    u32[n_strings + 1] offsets, then one UTF-8 blob; every distinct
+#            string (ids, questions, answers, refs, figures) is stored once
+# questions  u32[n] record offsets, then records sorted by id:
+#            id, question, refs, figure (string ids), correct u8, n_answers u8,
+#            then n_answers string ids
+# groups     (name, first question, count) per group, e.g. "T1A"
+# subelems   (name, first group, count) per subelement, e.g. "T1"
+MAGIC = b"MQPOOL\x00\x00"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIIIIIQQIIIIII")
+_U32 = struct.Struct("<I")
+_SPAN = struct.Struct("<II")
+_RECORD = struct.Struct("<IIIIBB")
+_RANGE = struct.Struct("<III")
+
+PoolPath = Union[str, "os.PathLike[str]"]
+
+
+def compiled_path(src: PoolPath) -> Path:
+    """Where the compiled form of a pool JSON lives (next to it)."""
+    return Path(src).with_suffix(".qpool")
+
+
+# ---------- Build ----------
+def _load_json(src: Path) -> List[Question]:
+    with src.open("r", encoding="utf-8") as f:
+        rows = json.load(f)
+    questions = [
+        Question(
+            id=str(row["id"]).strip().upper(),
+            question=row["question"],
+            answers=tuple(row["answers"]),
+            correct=int(row["correct"]),
+            refs=row.get("refs") or "",
+            figure=row.get("figure") or "",
+        )
+        for row in rows
+    ]
+    questions.sort(key=lambda q: q.id)
+    return questions
+
+
+def _ranges(keys: List[str]) -> List[Tuple[str, int, int]]:
+    """Collapse a sorted key list into (key, start, count) runs."""
+    out: List[Tuple[str, int, int]] = []
+    for i, key in enumerate(keys):
+        if out and out[-1][0] == key:
+            name, start, count = out[-1]
+            out[-1] = (name, start, count + 1)
+        else:
+            out.append((key, i, 1))
+    return out
+
+
+def _encode(questions: List[Question], src_size: int, src_mtime_ns: int) -> bytes:
+    strings: Dict[str, int] = {}
+
+    def intern(s: str) -> int:
+        sid = strings.get(s)
+        if sid is None:
+            sid = strings[s] = len(strings)
+        return sid
+
+    records: List[bytes] = []
+    for q in questions:
+        if not 0 <= q.correct < len(q.answers) <= 255:
+            raise ValueError(f"{q.id}: correct answer out of range")
+        rec = _RECORD.pack(
+            intern(q.id),
+            intern(q.question),
+            intern(q.refs),
+            intern(q.figure),
+            q.correct,
+            len(q.answers),
+        )
+        records.append(rec + b"".join(_U32.pack(intern(a)) for a in q.answers))
+
+    groups = _ranges([q.group for q in questions])
+    subelements = _ranges([name[:2] for name, _, _ in groups])
+    group_blob = b"".join(_RANGE.pack(intern(n), s, c) for n, s, c in groups)
+    sub_blob = b"".join(_RANGE.pack(intern(n), s, c) for n, s, c in subelements)
+
+    blobs = [s.encode("utf-8") for s in strings]
+    str_offsets, pos = [], 0
+    for b in blobs:
+        str_offsets.append(pos)
+        pos += len(b)
+    str_offsets.append(pos)
+    str_index = b"".join(_U32.pack(o) for o in str_offsets)
+    str_data = b"".join(blobs)
+
+    rec_offsets, pos = [], 0
+    for r in records:
+        rec_offsets.append(pos)
+        pos += len(r)
+    q_index = b"".join(_U32.pack(o) for o in rec_offsets)
+    q_data = b"".join(records)
+
+    sections = [str_index, str_data, q_index, q_data, group_blob, sub_blob]
+    offsets, pos = [], _HEADER.size
+    for sec in sections:
+        offsets.append(pos)
+        pos += len(sec)
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        len(questions),
+        len(groups),
+        len(subelements),
+        len(strings),
+        src_size,
+        src_mtime_ns,
+        *offsets,
+    )
+    return header + b"".join(sections)
+
+
+def compile_pool(src: PoolPath, dst: Optional[PoolPath] = None) -> Path:
+    """Compile a pool JSON into the binary format; written atomically."""
+    src = Path(src)
+    dst = Path(dst) if dst is not None else compiled_path(src)
+    st = src.stat()
+    data = _encode(_load_json(src), st.st_size, st.st_mtime_ns)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+    os.replace(tmp, dst)
+    return dst
+
+
+def _is_current(dst: Path, src: Path) -> bool:
+    """Was ``dst`` compiled, by this format version, from ``src`` as it is now?"""
+    try:
+        st = src.stat()
+        with dst.open("rb") as f:
+            head = f.read(_HEADER.size)
+    except OSError:
+        return False
+    if len(head) < _HEADER.size:
+        return False
+    magic, version, *_, size, mtime_ns = _HEADER.unpack(head)[:8]
+    return (
+        magic == MAGIC
+        and version == VERSION
+        and size == st.st_size
+        and mtime_ns == st.st_mtime_ns
+    )
+
+
+# ---------- Load ----------
+class QuestionPool:
+    """
+    Read-only view over a compiled question pool:
+      - Backed by an mmap (or bytes), so opening costs a header read and
+        pages are only touched for questions actually asked
+      - Questions are decoded on demand; nothing else is kept in memory
+        besides the small group/subelement tables
+      - Lookup by index, by id (binary search), by group or subelement
+    """
+
+    def __init__(self, buf: Union[mmap.mmap, bytes], name: str = "") -> None:
+        self.name = name
+        self._buf = buf
+        (
+            magic,
+            version,
+            self._n,
+            n_groups,
+            n_subs,
+            self._n_strings,
+            _size,
+            _mtime_ns,
+            self._str_index,
+            self._str_data,
+            self._q_index,
+            self._q_data,
+            group_off,
+            sub_off,
+        ) = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name or 'pool'}: not a compiled question pool")
+
+        self._groups: Dict[str, range] = {}
+        for i in range(n_groups):
+            sid, start, count = _RANGE.unpack_from(buf, group_off + i * _RANGE.size)
+            self._groups[self._str(sid)] = range(start, start + count)
+        group_names = list(self._groups)
+        self._subelements: Dict[str, List[str]] = {}
+        for i in range(n_subs):
+            sid, start, count = _RANGE.unpack_from(buf, sub_off + i * _RANGE.size)
+            self._subelements[self._str(sid)] = group_names[start : start + count]
+        # Sorted ids are only needed for by_id(); decode them lazily
+        self._ids: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, path: PoolPath) -> "QuestionPool":
+        path = Path(path)
+        with path.open("rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buf, name=path.stem)
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def _str(self, sid: int) -> str:
+        start, end = _SPAN.unpack_from(self._buf, self._str_index + sid * 4)
+        return self._buf[self._str_data + start : self._str_data + end].decode("utf-8")
+
+    # ---------- Questions ----------
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Question:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("question index out of range")
+        (off,) = _U32.unpack_from(self._buf, self._q_index + i * 4)
+        off += self._q_data
+        qid, text, refs, figure, correct, n = _RECORD.unpack_from(self._buf, off)
+        answers = struct.unpack_from(f"<{n}I", self._buf, off + _RECORD.size)
+        return Question(
+            id=self._str(qid),
+            question=self._str(text),
+            answers=tuple(self._str(a) for a in answers),
+            correct=correct,
+            refs=self._str(refs),
+            figure=self._str(figure),
+        )
+
+    def __iter__(self) -> Iterator[Question]:
+        for i in range(self._n):
+            yield self[i]
+
+    def index(self, qid: str) -> Optional[int]:
+        """Position of question ``qid`` (e.g. "T1A01"), or None."""
+        if self._ids is None:
+            self._ids = [self._question_id(i) for i in range(self._n)]
+        qid = qid.strip().upper()
+        i = bisect.bisect_left(self._ids, qid)
+        return i if i < self._n and self._ids[i] == qid else None
+
+    def by_id(self, qid: str) -> Optional[Question]:
+        i = self.index(qid)
+        return self[i] if i is not None else None
+
+    def _question_id(self, i: int) -> str:
+        (off,) = _U32.unpack_from(self._buf, self._q_index + i * 4)
+        (sid,) = _U32.unpack_from(self._buf, self._q_data + off)
+        return self._str(sid)
+
+    # ---------- Index ----------
+    @property
+    def groups(self) -> Dict[str, range]:
+        """Group name ("T1A") -> range of question indices, in id order."""
+        return self._groups
+
+    @property
+    def subelements(self) -> Dict[str, List[str]]:
+        """Subelement name ("T1") -> its group names, in id order."""
+        return self._subelements
+
+
+def open_pool(src: PoolPath) -> QuestionPool:
+    """Open the compiled form of a pool JSON, (re)building it if stale.
+
+    If the compiled file can't be written (read-only install), the pool is
+    compiled in memory instead.
+    """
+    src = Path(src)
+    dst = compiled_path(src)
+    if not _is_current(dst, src):
+        try:
+            compile_pool(src, dst)
+            log.info("Compiled question pool %s", dst.name)
+        except OSError as e:
+            log.warning("Can't write %s (%s); compiling in memory", dst, e)
+            st = src.stat()
+            data = _encode(_load_json(src), st.st_size, st.st_mtime_ns)
+            return QuestionPool(data, name=src.stem)
+    return QuestionPool.open(dst)
+
+
+# ---------- Registry ----------
+# Level key -> pool file prefix ("technician-2026-2030.json")
+LEVELS = {"tech": "technician", "general": "general", "extra": "extra"}
+
+_POOL_FILE_RE = re.compile(r"^(?P<prefix>[a-z]+)-(?P<start>\d{4})-(?P<end>\d{4})$")
+
+
+@dataclass(frozen=True)
+class PoolFile:
+    """A pool JSON on disk and the period it is in use.
+
+    NCVEC pools take effect July 1 of the first year in the file name and
+    retire June 30 of the last.
+    """
+
+    level: str
+    path: Path
+    effective: dt.date
+    expires: dt.date
+
+    @classmethod
+    def parse(cls, path: Path) -> Optional["PoolFile"]:
+        m = _POOL_FILE_RE.match(path.stem)
+        if not m:
+            return None
+        level = next((k for k, v in LEVELS.items() if v == m["prefix"]), None)
+        if level is None:
+            return None
+        return cls(
+            level=level,
+            path=path,
+            effective=dt.date(int(m["start"]), 7, 1),
+            expires=dt.date(int(m["end"]), 6, 30),
+        )
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+
+class _Loaded:
+    __slots__ = ("file", "pool", "size", "mtime_ns")
+
+    def __init__(self, file: PoolFile, pool: QuestionPool, st: os.stat_result) -> None:
+        self.file = file
+        self.pool = pool
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+
+
+class QuestionPoolRegistry:
+    """
+    Lazily loaded, hot-reloadable question pools:
+      - Each pool is opened on first use, then cached
+      - Pool files are re-checked at most every ``check_interval_s``; a new
+        file or a changed JSON (size/mtime) is compiled and swapped in, while
+        callers holding the old pool keep a valid mapping until they drop it
+      - Several files per level are allowed ("general-2027-2031.json" next
+        to "general-2023-2027.json"); the one in effect today is served
+    """
+
+    _instance: Optional["QuestionPoolRegistry"] = None
+
+    def __init__(self, pool_dir: PoolPath = POOL_DIR, check_interval_s: float = 30.0):
+        self.pool_dir = Path(pool_dir)
+        self.check_interval_s = float(check_interval_s)
+        self._files: Dict[str, List[PoolFile]] = {}
+        self._loaded: Dict[Path, _Loaded] = {}
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self._version = 0
+        self.loads = 0
+        self.reloads = 0
+
+    @classmethod
+    def get(cls) -> "QuestionPoolRegistry":
+        if cls._instance is None:
+            cls._instance = QuestionPoolRegistry()
+        return cls._instance
+
+    # ---------- Files ----------
+    def _scan(self) -> None:
+        files: Dict[str, List[PoolFile]] = {}
+        for path in sorted(self.pool_dir.glob("*.json")):
+            pf = PoolFile.parse(path)
+            if pf is not None:
+                files.setdefault(pf.level, []).append(pf)
+        for level_files in files.values():
+            level_files.sort(key=lambda f: f.effective)
+        self._files = files
+
+    def _maybe_refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_s:
+            return
+        self._checked_at = now
+        before = self._files
+        self._scan()
+        changed = self._files != before
+        # Drop pools whose JSON changed or vanished; they reload on next use
+        for path, ent in list(self._loaded.items()):
+            try:
+                st = path.stat()
+            except OSError:
+                del self._loaded[path]
+                changed = True
+                continue
+            if (st.st_size, st.st_mtime_ns) != (ent.size, ent.mtime_ns):
+                del self._loaded[path]
+                changed = True
+                self.reloads += 1
+                log.info("Question pool %s changed on disk; reloading", path.name)
+        if changed:
+            self._version += 1
+
+    def version(self) -> int:
+        """Bumped whenever a pool file appears, changes or vanishes.
+
+        Together with the date (see ``active_file``) this says whether the
+        pools ``pool()`` would return have changed, without opening them.
+        """
+        with self._lock:
+            self._maybe_refresh()
+            return self._version
+
+    def levels(self) -> List[str]:
+        with self._lock:
+            self._maybe_refresh()
+            return [k for k in LEVELS if k in self._files]
+
+    def active_file(
+        self, level: str, on: Optional[dt.date] = None
+    ) -> Optional[PoolFile]:
+        """Pool file in effect on ``on`` (default today).
+
+        Before the first pool takes effect, the earliest one is used; after
+        the last retires, the latest one stays in use until it's replaced.
+        """
+        with self._lock:
+            self._maybe_refresh()
+            return self._active(level, on or dt.date.today())
+
+    def _active(self, level: str, on: dt.date) -> Optional[PoolFile]:
+        files = self._files.get(level.lower())
+        if not files:
+            return None
+        current = [f for f in files if f.effective <= on]
+        return current[-1] if current else files[0]
+
+    # ---------- Pools ----------
+    def pool(self, level: str, on: Optional[dt.date] = None) -> Optional[QuestionPool]:
+        """The pool in effect for ``level`` ("tech", "general", "extra")."""
+        with self._lock:
+            self._maybe_refresh()
+            pf = self._active(level, on or dt.date.today())
+            if pf is None:
+                return None
+            ent = self._loaded.get(pf.path)
+            if ent is None:
+                st = pf.path.stat()
+                ent = _Loaded(pf, open_pool(pf.path), st)
+                self._loaded[pf.path] = ent
+                self.loads += 1
+            return ent.pool
+
+    def reload(self) -> None:
+        """Re-scan the pool folder and re-check every loaded pool now."""
+        with self._lock:
+            self._checked_at = float("-inf")
+            self._maybe_refresh()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "pools_loaded": sorted(e.file.name for e in self._loaded.values()),
+            "pool_loads": self.loads,
+            "pool_reloads": self.reloads,
+        }
+
+
+# ---------- CLI ----------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m marco_bot.services.question_pool_services",
+        description="Compile question pool JSON files into the binary pool format.",
+    )
+    parser.add_argument(
+        "pools",
+        nargs="*",
+        help=f"pool JSON files (default: every *.json in {POOL_DIR})",
+    )
+    args = parser.parse_args(argv)
+    for src in args.pools or sorted(POOL_DIR.glob("*.json")):
+        dst = compile_pool(src)
+        pool = QuestionPool.open(dst)
+        print(
+            f"{dst.name}: {len(pool)} questions, {len(pool.groups)} groups, "
+            f"{dst.stat().st_size} bytes (json {Path(src).stat().st_size})"
+        )
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
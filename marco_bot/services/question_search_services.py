@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import datetime as dt
+import logging
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..models.question_models import Question
+from .question_pool_services import QuestionPool, QuestionPoolRegistry
+
+__all__ = ["QuestionIndex", "SearchHit", "tokenize"]
+
+log = logging.getLogger(__name__)
+
+# "97.119" stays one token; "(b)(2)" becomes "b", "2"
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+_ID_RE = re.compile(r"^[TGE]\d[A-Z](?:\d{1,2})?$")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or s that the this to "
+    "what which when with these".split()
+)
+
+MAX_PREFIX_TERMS = 32  # expansions of a partial last word (autocomplete)
+MIN_PREFIX_LEN = 2
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _stem(tok: str) -> str:
+    # Plural folding is enough for pool text: "antennas" -> "antenna"
+    if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+        return tok[:-1]
+    return tok
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN_RE.findall(_fold(text)) if t not in _STOPWORDS]
+
+
+class SearchHit:
+    __slots__ = ("level", "question", "score")
+
+    def __init__(self, level: str, question: Question, score: float) -> None:
+        self.level = level
+        self.question = question
+        self.score = score
+
+
+class _Built:
+    """One complete index; replaced as a whole, never modified."""
+
+    __slots__ = ("key", "pools", "docs", "lengths", "avg_len", "postings", "vocab")
+
+    def __init__(
+        self,
+        key: Tuple[int, dt.date],
+        pools: Dict[str, QuestionPool],
+        docs: List[Tuple[str, int]],
+        lengths: array,
+        postings: Dict[str, Tuple[array, array]],
+    ) -> None:
+        self.key = key
+        self.pools = pools
+        self.docs = docs  # doc id -> (level, pool index)
+        self.lengths = lengths
+        self.avg_len = (sum(lengths) / len(lengths)) if lengths else 1.0
+        self.postings = postings
+        self.vocab = sorted(postings)
+
+
+_EMPTY = _Built((-1, dt.date.min), {}, [], array("H"), {})
+
+
+class QuestionIndex:
+    """
+    BM25 inverted index over question, answers and refs of the active pools:
+      - Built once on first use, and again only when a pool is swapped
+      - After a swap, queries keep using the previous index while the new
+        one is built on a worker thread (``refresh()``), then it's swapped
+        in with a single assignment
+      - Postings are parallel ``array`` columns (doc id, term frequency)
+      - The last query word is prefix-matched against the sorted vocabulary,
+        so partial input works for slash-command autocomplete
+      - Question ids ("T1A01") and group ids ("T1A") short-circuit to a
+        direct lookup
+    """
+
+    _instance: Optional["QuestionIndex"] = None
+
+    def __init__(
+        self,
+        registry: Optional[QuestionPoolRegistry] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self.registry = registry or QuestionPoolRegistry.get()
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._built = _EMPTY
+        self._rebuild: Optional[asyncio.Task] = None
+        self.builds = 0
+
+    @classmethod
+    def get(cls) -> "QuestionIndex":
+        if cls._instance is None:
+            cls._instance = QuestionIndex()
+        return cls._instance
+
+    # ---------- Build ----------
+    def _key(self) -> Tuple[int, dt.date]:
+        # The active pools only change with the registry or the date
+        return (self.registry.version(), dt.date.today())
+
+    def _current_pools(self) -> Dict[str, QuestionPool]:
+        pools = {}
+        for level in self.registry.levels():
+            pool = self.registry.pool(level)
+            if pool is not None:
+                pools[level] = pool
+        return pools
+
+    def warm(self) -> None:
+        """Build now (blocking) rather than on the first query."""
+        self._ensure()
+
+    async def refresh(self) -> None:
+        """Rebuild on a worker thread if the pools changed."""
+        await asyncio.to_thread(self._ensure)
+
+    def _ensure(self) -> _Built:
+        key = self._key()
+        if self._built.key == key:
+            return self._built
+        with self._lock:
+            if self._built.key != key:
+                self._built = self._build(key, self._current_pools())
+                self.builds += 1
+            return self._built
+
+    def _current(self) -> _Built:
+        """The index to query: the built one, even if a newer one is due."""
+        built = self._built
+        if built.key == self._key():
+            return built
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._ensure()  # no event loop to block; just build
+        if built is _EMPTY:
+            # Nothing to serve yet (warm() wasn't called)
+            return self._ensure()
+        if self._rebuild is None or self._rebuild.done():
+            self._rebuild = loop.create_task(self.refresh())
+            self._rebuild.add_done_callback(_log_failure)
+        return built
+
+    @staticmethod
+    def _build(key: Tuple[int, dt.date], pools: Dict[str, QuestionPool]) -> _Built:
+        docs: List[Tuple[str, int]] = []
+        lengths = array("H")
+        postings: Dict[str, Tuple[array, array]] = {}
+        for level, pool in pools.items():
+            for i, q in enumerate(pool):
+                doc = len(docs)
+                docs.append((level, i))
+                toks = tokenize(" ".join((q.question, *q.answers, q.refs)))
+                lengths.append(min(len(toks), 0xFFFF))
+                tf: Dict[str, int] = {}
+                for t in toks:
+                    tf[t] = tf.get(t, 0) + 1
+                for t, n in tf.items():
+                    col = postings.get(t)
+                    if col is None:
+                        col = postings[t] = (array("I"), array("H"))
+                    col[0].append(doc)
+                    col[1].append(n)
+        return _Built(key, pools, docs, lengths, postings)
+
+    # ---------- Query ----------
+    def _expand(self, ix: _Built, prefix: str) -> List[str]:
+        lo = bisect.bisect_left(ix.vocab, prefix)
+        hi = bisect.bisect_left(ix.vocab, prefix + "\uffff", lo)
+        terms = ix.vocab[lo:hi]
+        if len(terms) > MAX_PREFIX_TERMS:
+            # Keep the most common completions
+            terms = sorted(terms, key=lambda t: -len(ix.postings[t][0]))
+            terms = terms[:MAX_PREFIX_TERMS]
+        return terms
+
+    def _ids(
+        self, ix: _Built, query: str, levels: Sequence[str], limit: int
+    ) -> List[SearchHit]:
+        qid = query.strip().upper()
+        hits: List[SearchHit] = []
+        for level in levels:
+            pool = ix.pools[level]
+            if len(qid) == 3:
+                rng = pool.groups.get(qid, range(0))
+                hits.extend(SearchHit(level, pool[i], 1.0) for i in rng)
+            else:
+                # "T1A1" matches T1A10..T1A14 as the user types
+                group = pool.groups.get(qid[:3], range(0))
+                hits.extend(
+                    SearchHit(level, q, 1.0)
+                    for q in (pool[i] for i in group)
+                    if q.id.startswith(qid)
+                )
+            if len(hits) >= limit:
+                break
+        return hits[:limit]
+
+    def search(
+        self,
+        query: str,
+        level: Optional[str] = None,
+        limit: int = 10,
+        prefix: bool = True,
+    ) -> List[SearchHit]:
+        """Top ``limit`` questions for ``query``, best first.
+
+        ``level`` restricts to one pool; ``prefix`` treats the last word as
+        incomplete (autocomplete).
+        """
+        ix = self._current()
+        levels = [level] if level in ix.pools else list(ix.pools)
+        if _ID_RE.match(query.strip().upper()):
+            hits = self._ids(ix, query, levels, limit)
+            if hits:
+                return hits
+
+        toks = tokenize(query)
+        if not toks:
+            return []
+        # One slot per query word; a partial last word's completions share
+        # a slot, and each document keeps only its best completion
+        slots: List[List[Tuple[str, float]]] = [[(t, 1.0)] for t in toks[:-1]]
+        last = toks[-1]
+        if prefix and len(last) >= MIN_PREFIX_LEN and query == query.rstrip():
+            slots.append(
+                [(t, 1.0 if t == last else 0.8) for t in self._expand(ix, last)]
+            )
+        else:
+            slots.append([(last, 1.0)])
+
+        n_docs = len(ix.docs)
+        allowed = set(levels)
+        k1, b, avg = self.k1, self.b, ix.avg_len
+        lengths = ix.lengths
+        scores: Dict[int, float] = {}
+        for slot in slots:
+            best_in_slot: Dict[int, float] = {}
+            for term, weight in slot:
+                col = ix.postings.get(term)
+                if col is None:
+                    continue
+                docs, tfs = col
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                w = weight * idf
+                for doc, tf in zip(docs, tfs):
+                    norm = tf + k1 * (1 - b + b * lengths[doc] / avg)
+                    s = w * tf * (k1 + 1) / norm
+                    if s > best_in_slot.get(doc, 0.0):
+                        best_in_slot[doc] = s
+            for doc, s in best_in_slot.items():
+                scores[doc] = scores.get(doc, 0.0) + s
+
+        if len(allowed) < len(ix.pools):
+            scores = {d: s for d, s in scores.items() if ix.docs[d][0] in allowed}
+        best = sorted(scores.items(), key=lambda kv: -kv[1])[:limit]
+        out = []
+        for doc, score in best:
+            lv, i = ix.docs[doc]
+            out.append(SearchHit(lv, ix.pools[lv][i], score))
+        return out
+
+    def by_id(self, qid: str) -> Optional[SearchHit]:
+        ix = self._current()
+        qid = qid.strip().upper()
+        for level, pool in ix.pools.items():
+            q = pool.by_id(qid)
+            if q is not None:
+                return SearchHit(level, q, 1.0)
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        ix = self._built
+        return {
+            "docs": len(ix.docs),
+            "terms": len(ix.vocab),
+            "builds": self.builds,
+        }
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        log.error("Question index rebuild failed", exc_info=task.exception())
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import math
+import random
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ..models.question_models import Question
+from ..utils.sqlite import SQLiteWorker
+from .question_pool_services import QuestionPool
+
+__all__ = ["BOX_INTERVALS_S", "Deck", "StudyService"]
+
+log = logging.getLogger(__name__)
+
+# Leitner boxes: a right answer moves a card up one box, a wrong one back to 0
+BOX_INTERVALS_S = (
+    60,  # 0: missed / just seen
+    10 * 60,
+    24 * 3600,
+    3 * 24 * 3600,
+    7 * 24 * 3600,
+    16 * 24 * 3600,
+    35 * 24 * 3600,  # 6: known
+)
+MAX_BOX = len(BOX_INTERVALS_S) - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS study_cards (
+    user_id INTEGER NOT NULL,
+    pool    TEXT NOT NULL,
+    qid     TEXT NOT NULL,
+    box     INTEGER NOT NULL,
+    due     REAL NOT NULL,
+    seen    INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (user_id, pool, qid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS study_decks (
+    user_id  INTEGER NOT NULL,
+    pool     TEXT NOT NULL,
+    seed     INTEGER NOT NULL,
+    next_new INTEGER NOT NULL,
+    PRIMARY KEY (user_id, pool)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_CARD = """
+INSERT INTO study_cards (user_id, pool, qid, box, due, seen, correct)
+VALUES (?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT(user_id, pool, qid) DO UPDATE SET
+    box = excluded.box,
+    due = excluded.due,
+    seen = seen + 1,
+    correct = correct + excluded.correct
+"""
+
+_UPSERT_DECK = """
+INSERT INTO study_decks (user_id, pool, seed, next_new) VALUES (?, ?, ?, ?)
+ON CONFLICT(user_id, pool) DO UPDATE SET next_new = excluded.next_new
+"""
+
+
+class Deck:
+    """
+    One user's cards for one pool:
+      - Seen cards sit in a min-heap by due time; stale heap entries are
+        skipped lazily, so picking and rescheduling are O(log n)
+      - Unseen questions come from a per-user affine permutation of the pool
+        (i -> a*i + b mod n), so the order is shuffled without storing it
+    """
+
+    __slots__ = (
+        "user_id",
+        "pool",
+        "n",
+        "seed",
+        "next_new",
+        "cards",
+        "_heap",
+        "_a",
+        "_b",
+    )
+
+    def __init__(self, user_id: int, pool: str, n: int, seed: int, next_new: int = 0):
+        self.user_id = user_id
+        self.pool = pool
+        self.n = n
+        self.seed = seed
+        self.next_new = next_new
+        self.cards: Dict[str, Tuple[int, float]] = {}  # qid -> (box, due)
+        self._heap: List[Tuple[float, str]] = []
+        # Multiplier coprime with n makes i -> a*i + b a bijection mod n
+        rng = random.Random(seed)
+        a = rng.randrange(1, max(2, n))
+        while math.gcd(a, n) != 1:
+            a += 1
+        self._a = a
+        self._b = rng.randrange(max(1, n))
+
+    def add(self, qid: str, box: int, due: float) -> None:
+        self.cards[qid] = (box, due)
+        heapq.heappush(self._heap, (due, qid))
+
+    def _top(self) -> Optional[Tuple[float, str]]:
+        while self._heap:
+            due, qid = self._heap[0]
+            card = self.cards.get(qid)
+            if card is not None and card[1] == due:
+                return due, qid
+            heapq.heappop(self._heap)  # superseded or dropped
+        return None
+
+    def due(self, now: float) -> Optional[str]:
+        top = self._top()
+        return top[1] if top is not None and top[0] <= now else None
+
+    def soonest(self) -> Optional[str]:
+        top = self._top()
+        return top[1] if top is not None else None
+
+    def drop(self, qid: str) -> None:
+        self.cards.pop(qid, None)
+
+    def new_index(self, pool: QuestionPool) -> Optional[int]:
+        """Next unseen question index, or None once every question was seen.
+
+        ``next_new`` only moves past questions that have been answered, so a
+        question shown but never answered comes back next time.
+        """
+        while self.next_new < self.n:
+            i = (self._a * self.next_new + self._b) % self.n
+            if pool[i].id not in self.cards:
+                return i
+            self.next_new += 1
+        return None
+
+    def boxes(self) -> List[int]:
+        counts = [0] * (MAX_BOX + 1)
+        for box, _ in self.cards.values():
+            counts[box] += 1
+        return counts
+
+
+class StudyService:
+    """
+    Spaced-repetition (Leitner) study sessions backed by SQLite:
+      - Due reviews first, then unseen questions, then study-ahead
+      - Only recently active decks are kept in memory (LRU); the rest are
+        loaded from disk, with one indexed query, when the user comes back
+      - Each answer is written through on the store's worker thread
+    """
+
+    _instance: Optional["StudyService"] = None
+
+    def __init__(self, max_decks: int = 512) -> None:
+        self.max_decks = max(1, int(max_decks))
+        self._db: Optional[SQLiteWorker] = None
+        self._decks: "OrderedDict[Tuple[int, str], Deck]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+        self.answers = 0
+        self.deck_loads = 0
+
+    @classmethod
+    def get(cls) -> "StudyService":
+        if cls._instance is None:
+            cls._instance = StudyService()
+        return cls._instance
+
+    # ---------- Lifecycle ----------
+    async def start(self, path: str) -> None:
+        if self._db is None:
+            self._db = SQLiteWorker(path, name="study-store")
+        await self._db.open(_SCHEMA)
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+        self._decks.clear()
+
+    # ---------- Decks ----------
+    async def deck(self, user_id: int, pool: QuestionPool) -> Deck:
+        key = (user_id, pool.name)
+        deck = self._decks.get(key)
+        if deck is not None and deck.n == len(pool):
+            self._decks.move_to_end(key)
+            return deck
+        async with self._lock:
+            deck = self._decks.get(key)
+            if deck is None or deck.n != len(pool):
+                deck = await self._load(user_id, pool)
+            self._decks[key] = deck
+            while len(self._decks) > self.max_decks:
+                self._decks.popitem(last=False)
+        return deck
+
+    async def _load(self, user_id: int, pool: QuestionPool) -> Deck:
+        name = pool.name
+
+        def _read(conn: sqlite3.Connection):
+            row = conn.execute(
+                "SELECT seed, next_new FROM study_decks WHERE user_id = ? AND pool = ?",
+                (user_id, name),
+            ).fetchone()
+            cards = conn.execute(
+                "SELECT qid, box, due FROM study_cards WHERE user_id = ? AND pool = ?",
+                (user_id, name),
+            ).fetchall()
+            return row, cards
+
+        row, cards = await self._require_db().call(_read)
+        self.deck_loads += 1
+        if row is None:
+            deck = Deck(user_id, name, len(pool), random.getrandbits(31))
+        else:
+            deck = Deck(user_id, name, len(pool), row[0], row[1])
+        for qid, box, due in cards:
+            deck.add(qid, min(box, MAX_BOX), due)
+        return deck
+
+    def _require_db(self) -> SQLiteWorker:
+        if self._db is None:
+            raise RuntimeError("StudyService.start() has not been called")
+        return self._db
+
+    # ---------- Study ----------
+    async def next_question(
+        self, user_id: int, pool: QuestionPool, now: Optional[float] = None
+    ) -> Optional[Question]:
+        """Due review, else a new question, else the next review coming up."""
+        now = time.time() if now is None else now
+        deck = await self.deck(user_id, pool)
+        while True:
+            qid = deck.due(now)
+            if qid is None:
+                i = deck.new_index(pool)
+                if i is not None:
+                    return pool[i]
+                qid = deck.soonest()
+                if qid is None:
+                    return None
+            q = pool.by_id(qid)
+            if q is not None:
+                return q
+            deck.drop(qid)  # question left the pool (errata reload)
+
+    async def record(
+        self,
+        user_id: int,
+        pool: QuestionPool,
+        qid: str,
+        correct: bool,
+        now: Optional[float] = None,
+    ) -> int:
+        """Grade an answer, reschedule the card and persist it. Returns the new box."""
+        now = time.time() if now is None else now
+        deck = await self.deck(user_id, pool)
+        box, _ = deck.cards.get(qid, (0, now))
+        box = min(box + 1, MAX_BOX) if correct else 0
+        due = now + BOX_INTERVALS_S[box]
+        deck.add(qid, box, due)
+        self.answers += 1
+
+        card = (user_id, deck.pool, qid, box, due, int(correct))
+        meta = (user_id, deck.pool, deck.seed, deck.next_new)
+
+        def _write(conn: sqlite3.Connection) -> None:
+            with conn:
+                conn.execute(_UPSERT_CARD, card)
+                conn.execute(_UPSERT_DECK, meta)
+
+        await self._require_db().call(_write)
+        return box
+
+    async def progress(self, user_id: int, pool: QuestionPool) -> Dict[str, object]:
+        deck = await self.deck(user_id, pool)
+        now = time.time()
+        return {
+            "seen": len(deck.cards),
+            "total": len(pool),
+            "due": sum(1 for _, due in deck.cards.values() if due <= now),
+            "boxes": deck.boxes(),
+        }
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "decks_cached": len(self._decks),
+            "deck_loads": self.deck_loads,
+            "answers": self.answers,
+        }
@@ -0,0 +1,453 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import io
+import logging
+import os
+import sqlite3
+import time
+import zipfile
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
+
+import aiohttp
+
+from ..models.callsign_models import CallsignRecord
+from ..utils.sqlite import SQLiteWorker, connect
+
+__all__ = [
+    "ULS_COMPLETE_URL",
+    "ULS_DAILY_URL",
+    "ULSDatabase",
+    "import_archive",
+]
+
+log = logging.getLogger(__name__)
+
+# ---------- FCC bulk data (amateur service) ----------
+ULS_COMPLETE_URL = "https://data.fcc.gov/download/pub/uls/complete/l_amat.zip"
+ULS_DAILY_URL = "https://data.fcc.gov/download/pub/uls/daily/l_am_{day}.zip"
+ULS_LICENSE_URL = "https://wireless2.fcc.gov/UlsApp/UlsSearch/license.jsp?licKey={usi}"
+
+_BATCH = 5000  # rows per executemany; bounds memory during import
+
+Archive = Union[str, "os.PathLike[str]", IO[bytes]]
+
+
+# ---------- Schema ----------
+def _table_sql(table: str) -> str:
+    return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    usi              INTEGER PRIMARY KEY,
+    callsign         TEXT,
+    status           TEXT,
+    radio_service    TEXT,
+    grant_date       TEXT,
+    expired_date     TEXT,
+    applicant_type   TEXT,
+    entity_name      TEXT,
+    first_name       TEXT,
+    mi               TEXT,
+    last_name        TEXT,
+    city             TEXT,
+    state            TEXT,
+    zip              TEXT,
+    frn              TEXT,
+    oper_class       TEXT,
+    trustee_callsign TEXT,
+    trustee_name     TEXT,
+    name_key         TEXT
+);
+"""
+
+
+_INDEXED = ("callsign", "frn", "name_key")
+
+
+def _index_sql(table: str) -> List[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS {table}_{col} ON {table} ({col})"
+        for col in _INDEXED
+    ]
+
+
+_SCHEMA = (
+    _table_sql("licenses")
+    + ";\n".join(_index_sql("licenses"))
+    + ";\nCREATE TABLE IF NOT EXISTS uls_meta (key TEXT PRIMARY KEY, value TEXT);"
+)
+
+# Each .dat file owns a slice of the columns; rows are merged on usi.
+_HD_UPSERT = """
+INSERT INTO {t} (usi, callsign, status, radio_service, grant_date, expired_date)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(usi) DO UPDATE SET
+    callsign = excluded.callsign,
+    status = excluded.status,
+    radio_service = excluded.radio_service,
+    grant_date = excluded.grant_date,
+    expired_date = excluded.expired_date
+"""
+
+_EN_UPSERT = """
+INSERT INTO {t} (usi, callsign, applicant_type, entity_name, first_name, mi,
+                 last_name, city, state, zip, frn, name_key)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(usi) DO UPDATE SET
+    applicant_type = excluded.applicant_type,
+    entity_name = excluded.entity_name,
+    first_name = excluded.first_name,
+    mi = excluded.mi,
+    last_name = excluded.last_name,
+    city = excluded.city,
+    state = excluded.state,
+    zip = excluded.zip,
+    frn = excluded.frn,
+    name_key = excluded.name_key
+"""
+
+_AM_UPSERT = """
+INSERT INTO {t} (usi, callsign, oper_class, trustee_callsign, trustee_name)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(usi) DO UPDATE SET
+    oper_class = excluded.oper_class,
+    trustee_callsign = excluded.trustee_callsign,
+    trustee_name = excluded.trustee_name
+"""
+
+# ---------- Code tables ----------
+_STATUS = {
+    "A": "Active",
+    "C": "Cancelled",
+    "E": "Expired",
+    "L": "Pending Legal Status",
+    "P": "Parent Station Cancelled",
+    "T": "Terminated",
+    "X": "Term Pending",
+}
+_SERVICE = {"HA": "Amateur", "HV": "Vanity"}
+_CLASS = {
+    "A": "ADVANCED",
+    "E": "EXTRA",
+    "G": "GENERAL",
+    "N": "NOVICE",
+    "P": "TECHNICIAN PLUS",
+    "T": "TECHNICIAN",
+}
+_APPLICANT = {"I": "PERSON", "B": "CLUB", "M": "MILITARY", "R": "RACES"}
+
+
+# ---------- Parsing ----------
+def _iso_date(mmddyyyy: str) -> Optional[str]:
+    # ULS dates are MM/DD/YYYY; store ISO so they sort and match the model
+    parts = mmddyyyy.strip().split("/")
+    if len(parts) != 3 or not all(p.isdigit() for p in parts):
+        return None
+    m, d, y = parts
+    return f"{y}-{int(m):02d}-{int(d):02d}"
+
+
+def _name_key(last: str, first: str, entity: str) -> str:
+    key = f"{last} {first}" if last else entity
+    return " ".join(key.upper().replace(",", " ").split())
+
+
+def _col(row: List[str], i: int) -> str:
+    return row[i].strip() if i < len(row) else ""
+
+
+def _hd_row(row: List[str]) -> tuple:
+    return (
+        int(row[1]),
+        _col(row, 4).upper(),
+        _col(row, 5) or None,
+        _col(row, 6) or None,
+        _iso_date(_col(row, 7)),
+        _iso_date(_col(row, 8)),
+    )
+
+
+def _en_row(row: List[str]) -> Optional[tuple]:
+    # Only the licensee entity; contacts ("CL") and others are skipped
+    if _col(row, 5) != "L":
+        return None
+    entity, first, last = _col(row, 7), _col(row, 8), _col(row, 10)
+    return (
+        int(row[1]),
+        _col(row, 4).upper(),
+        _col(row, 23) or None,
+        entity or None,
+        first or None,
+        _col(row, 9) or None,
+        last or None,
+        _col(row, 16) or None,
+        _col(row, 17) or None,
+        _col(row, 18) or None,
+        _col(row, 22) or None,
+        _name_key(last, first, entity) or None,
+    )
+
+
+def _am_row(row: List[str]) -> tuple:
+    return (
+        int(row[1]),
+        _col(row, 4).upper(),
+        _col(row, 5) or None,
+        _col(row, 8).upper() or None,
+        _col(row, 17) or None,
+    )
+
+
+_FILES = (
+    ("HD", _HD_UPSERT, _hd_row),
+    ("EN", _EN_UPSERT, _en_row),
+    ("AM", _AM_UPSERT, _am_row),
+)
+
+
+def _iter_dat(zf: zipfile.ZipFile, kind: str) -> Iterator[List[str]]:
+    """Stream pipe-delimited rows of ``<kind>.dat`` without loading the file."""
+    names = [n for n in zf.namelist() if os.path.basename(n).upper() == f"{kind}.DAT"]
+    if not names:
+        return
+    with zf.open(names[0]) as raw:
+        text = io.TextIOWrapper(raw, encoding="latin-1", newline="")
+        for row in csv.reader(text, delimiter="|", quoting=csv.QUOTE_NONE):
+            # Skip blank/continuation lines and rows with a bad identifier
+            if len(row) > 4 and row[0] == kind and row[1].strip().isdigit():
+                yield row
+
+
+def _load_rows(
+    conn: sqlite3.Connection, zf: zipfile.ZipFile, table: str
+) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for kind, upsert, parse in _FILES:
+        sql = upsert.format(t=table)
+        batch: List[tuple] = []
+        n = 0
+        for row in _iter_dat(zf, kind):
+            parsed = parse(row)
+            if parsed is None:
+                continue
+            batch.append(parsed)
+            if len(batch) >= _BATCH:
+                with conn:
+                    conn.executemany(sql, batch)
+                n += len(batch)
+                batch = []
+        if batch:
+            with conn:
+                conn.executemany(sql, batch)
+            n += len(batch)
+        counts[kind] = n
+    return counts
+
+
+def _set_meta(conn: sqlite3.Connection, **values: Any) -> None:
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO uls_meta (key, value) VALUES (?, ?)",
+            [(k, str(v)) for k, v in values.items()],
+        )
+
+
+def import_archive(
+    db_path: str, archive: Archive, *, full: bool = True
+) -> Dict[str, int]:
+    """Stream an FCC ULS amateur zip (HD/EN/AM .dat) into the local store.
+
+    ``full=True`` (weekly ``l_amat.zip``) builds a fresh table and swaps it in
+    atomically, so lookups keep working during the import. ``full=False``
+    (daily ``l_am_<day>.zip``) upserts the changed licenses in place.
+    Memory stays bounded: rows go to SQLite in fixed-size batches.
+    Blocking; run it in a thread from async code.
+    """
+    conn = connect(db_path)
+    try:
+        conn.executescript(_SCHEMA)
+        # Bulk load: durability of a half-finished import doesn't matter
+        conn.execute("PRAGMA synchronous=OFF")
+        started = time.time()
+        with zipfile.ZipFile(archive) as zf:
+            if full:
+                conn.executescript(
+                    "DROP TABLE IF EXISTS licenses_new;" + _table_sql("licenses_new")
+                )
+                counts = _load_rows(conn, zf, "licenses_new")
+                # Swap and index in one transaction: readers keep the old
+                # table until commit, and one index build beats per-row upkeep
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute("DROP TABLE licenses")
+                    conn.execute("ALTER TABLE licenses_new RENAME TO licenses")
+                    for stmt in _index_sql("licenses"):
+                        conn.execute(stmt)
+                    conn.commit()
+                except sqlite3.Error:
+                    conn.rollback()
+                    raise
+            else:
+                counts = _load_rows(conn, zf, "licenses")
+
+        kind = "full" if full else "daily"
+        name = os.path.basename(str(getattr(archive, "name", archive)))
+        _set_meta(conn, **{f"last_{kind}": name, f"last_{kind}_at": int(time.time())})
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        log.info("ULS %s import: %s in %.1fs", kind, counts, time.time() - started)
+        return counts
+    finally:
+        conn.close()
+
+
+# ---------- Row -> record ----------
+def _display_name(row: sqlite3.Row) -> Optional[str]:
+    if row["last_name"]:
+        parts = [row["first_name"], row["mi"], row["last_name"]]
+        return " ".join(p for p in parts if p).upper()
+    return row["entity_name"]
+
+
+def _to_record(row: sqlite3.Row) -> CallsignRecord:
+    return CallsignRecord(
+        callsign=row["callsign"],
+        name=_display_name(row),
+        type=_APPLICANT.get(row["applicant_type"] or ""),
+        oper_class=_CLASS.get(row["oper_class"] or ""),
+        status=_STATUS.get(row["status"] or "", row["status"]),
+        expires=row["expired_date"],
+        city=(row["city"] or "").title() or None,
+        state=row["state"],
+        trustee_callsign=row["trustee_callsign"],
+        trustee_name=row["trustee_name"],
+        frn=row["frn"],
+        uls_url=ULS_LICENSE_URL.format(usi=row["usi"]),
+        radio_service=_SERVICE.get(row["radio_service"] or "", row["radio_service"]),
+        sources={"uls": True},
+    )
+
+
+# Active licenses first, then the most recent grant
+_BEST = "ORDER BY (status = 'A') DESC, grant_date DESC"
+
+
+class ULSDatabase:
+    """
+    Local FCC ULS amateur license store:
+      - Indexed by callsign, FRN and name prefix
+      - Queries run on one worker thread (never on the event loop)
+      - Imports use their own connection, so lookups continue meanwhile
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = SQLiteWorker(path, name="uls")
+        self._import_lock = asyncio.Lock()
+        self.lookups = 0
+        self.lookup_hits = 0
+
+    async def open(self) -> None:
+        def _schema(conn: sqlite3.Connection) -> None:
+            conn.row_factory = sqlite3.Row
+
+        await self._db.open(_SCHEMA)
+        await self._db.call(_schema)
+
+    async def close(self) -> None:
+        await self._db.close()
+
+    # ---------- Queries ----------
+    async def lookup(self, call: str) -> Optional[CallsignRecord]:
+        key = call.upper().strip()
+        self.lookups += 1
+
+        def _q(conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+            return conn.execute(
+                f"SELECT * FROM licenses WHERE callsign = ? {_BEST} LIMIT 1", (key,)
+            ).fetchone()
+
+        row = await self._db.call(_q)
+        if row is None:
+            return None
+        self.lookup_hits += 1
+        return _to_record(row)
+
+    async def by_frn(self, frn: str) -> List[CallsignRecord]:
+        def _q(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+            return conn.execute(
+                f"SELECT * FROM licenses WHERE frn = ? {_BEST}", (frn.strip(),)
+            ).fetchall()
+
+        return [_to_record(r) for r in await self._db.call(_q)]
+
+    async def search_name(self, prefix: str, limit: int = 25) -> List[CallsignRecord]:
+        """Licensees whose "LAST FIRST" (or club name) starts with ``prefix``."""
+        key = " ".join(prefix.upper().replace(",", " ").split())
+        if not key:
+            return []
+
+        def _q(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+            # Range scan keeps the name_key index usable (LIKE would not)
+            return conn.execute(
+                "SELECT * FROM licenses WHERE name_key >= ? AND name_key < ? "
+                "ORDER BY name_key LIMIT ?",
+                (key, key + "\uffff", int(limit)),
+            ).fetchall()
+
+        return [_to_record(r) for r in await self._db.call(_q)]
+
+    async def meta(self) -> Dict[str, str]:
+        def _q(conn: sqlite3.Connection) -> Dict[str, str]:
+            return dict(conn.execute("SELECT key, value FROM uls_meta").fetchall())
+
+        return await self._db.call(_q)
+
+    # ---------- Imports ----------
+    async def import_archive(
+        self, archive: Archive, *, full: bool = True
+    ) -> Dict[str, int]:
+        async with self._import_lock:
+            return await asyncio.to_thread(
+                import_archive, self.path, archive, full=full
+            )
+
+    async def sync_daily(
+        self, session: aiohttp.ClientSession, day: str
+    ) -> Dict[str, int]:
+        """Download and apply one daily file (``day`` = mon, tue, ... sun)."""
+        url = ULS_DAILY_URL.format(day=day.lower()[:3])
+        tmp = f"{self.path}.{day}.zip"
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=300)) as r:
+                r.raise_for_status()
+                with open(tmp, "wb") as fh:
+                    async for chunk in r.content.iter_chunked(1 << 16):
+                        fh.write(chunk)
+            return await self.import_archive(tmp, full=False)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"uls_lookups": self.lookups, "uls_hits": self.lookup_hits}
+
+
+# ---------- CLI ----------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m marco_bot.services.uls_services",
+        description="Import FCC ULS amateur bulk data into a local SQLite store.",
+    )
+    parser.add_argument("db", help="SQLite file to create/update (e.g. uls.sqlite3)")
+    parser.add_argument("archive", help="l_amat.zip (full) or l_am_<day>.zip (daily)")
+    parser.add_argument(
+        "--daily", action="store_true", help="apply as an incremental daily file"
+    )
+    args = parser.parse_args(argv)
+    counts = import_archive(args.db, args.archive, full=not args.daily)
+    print(", ".join(f"{k}: {v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
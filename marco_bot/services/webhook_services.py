@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional
+
+import aiohttp
+
+from ..utils.histogram import Histogram
+from ..utils.http import PoolLimits, PoolStats, pooled_session
+from ..utils.ratelimit import TokenBucket
+
+__all__ = ["WebhookDispatcher"]
+
+log = logging.getLogger(__name__)
+
+# Discord limits for one webhook message
+MAX_CONTENT_CHARS = 2000
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+USER_AGENT = "mARCoBot/1.0"
+
+
+def _embed_chars(embed: Mapping[str, Any]) -> int:
+    """Characters Discord counts against the 6000 total for one embed."""
+    n = len(embed.get("title") or "") + len(embed.get("description") or "")
+    for f in embed.get("fields") or ():
+        n += len(f.get("name") or "") + len(f.get("value") or "")
+    n += len((embed.get("footer") or {}).get("text") or "")
+    n += len((embed.get("author") or {}).get("name") or "")
+    return n
+
+
+class _Item:
+    __slots__ = ("content", "embeds", "chars", "enqueued_at", "future", "attempts")
+
+    def __init__(
+        self, content: str, embeds: List[Dict[str, Any]], future: asyncio.Future
+    ) -> None:
+        self.content = content[:MAX_CONTENT_CHARS]
+        self.embeds = embeds[:MAX_EMBEDS]
+        self.chars = sum(_embed_chars(e) for e in self.embeds)
+        self.enqueued_at = time.monotonic()
+        self.future = future
+        self.attempts = 0
+
+
+class _Hook:
+    __slots__ = (
+        "name",
+        "url",
+        "items",
+        "inflight",
+        "remaining",
+        "reset_at",
+        "not_before",
+        "dead",
+        "latency",
+    )
+
+    def __init__(self, name: str, url: str) -> None:
+        self.name = name
+        self.url = url
+        self.items: Deque[_Item] = deque()
+        self.inflight = 0
+        self.remaining: Optional[int] = None  # from X-RateLimit-Remaining
+        self.reset_at = 0.0  # monotonic; when ``remaining`` refills
+        self.not_before = 0.0  # monotonic; 429 / error back-off
+        self.dead = False
+        self.latency = Histogram()
+
+
+def _coalesce(items: Deque[_Item]) -> List[_Item]:
+    """Take the head item plus as many queued behind it as fit one message."""
+    batch = [items.popleft()]
+    content = len(batch[0].content)
+    embeds = len(batch[0].embeds)
+    chars = batch[0].chars
+    while items:
+        nxt = items[0]
+        if (
+            embeds + len(nxt.embeds) > MAX_EMBEDS
+            or chars + nxt.chars > MAX_EMBED_CHARS
+            or content + len(nxt.content) + 1 > MAX_CONTENT_CHARS
+        ):
+            break
+        batch.append(items.popleft())
+        embeds += len(nxt.embeds)
+        chars += nxt.chars
+        content += len(nxt.content) + 1
+    return batch
+
+
+class WebhookDispatcher:
+    """
+    Fan-out of messages to the configured Discord webhooks:
+      - One pooled keep-alive session for every webhook
+      - Each webhook has its own queue and at most ``per_webhook``
+        requests in flight; X-RateLimit-Remaining / Reset-After from every
+        response pace the next send before Discord has to 429 us
+      - A 429 waits out retry_after (globally if Discord says so); 5xx and
+        network errors back off and retry up to ``max_attempts``
+      - The queue is bounded: ``submit()`` waits for room (backpressure)
+      - When a webhook is backlogged, everything queued behind the head that
+        fits Discord's limits (10 embeds / 6000 chars) goes in one message
+      - Queue-to-delivery latency is kept in a histogram per webhook
+    """
+
+    def __init__(
+        self,
+        webhooks: Mapping[str, str],
+        *,
+        max_queue: int = 500,
+        per_webhook: int = 2,
+        max_attempts: int = 5,
+        max_age_s: float = 900.0,
+        global_rate: float = 30.0,
+        limits: Optional[PoolLimits] = None,
+    ) -> None:
+        self.hooks: Dict[str, _Hook] = {
+            name: _Hook(name, url) for name, url in webhooks.items() if url
+        }
+        self.per_webhook = max(1, int(per_webhook))
+        self.max_attempts = max(1, int(max_attempts))
+        self.max_age_s = float(max_age_s)
+        self.limits = limits or PoolLimits(total=32, per_host=16)
+        self.pool_stats = PoolStats()
+        self.session: Optional[aiohttp.ClientSession] = None
+
+        self._space = asyncio.Semaphore(max(1, int(max_queue)))
+        self._bucket = TokenBucket(global_rate, burst=self.per_webhook * 4)
+        self._global_until = 0.0
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+        self._sends: set[asyncio.Task] = set()
+
+        self.latency = Histogram()
+        self.queued = 0
+        self.sent_messages = 0
+        self.sent_items = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failed = 0
+
+    # ---------- Lifecycle ----------
+    async def start(self) -> None:
+        if self.session is None or self.session.closed:
+            self.session = pooled_session(
+                self.limits, self.pool_stats, {"User-Agent": USER_AGENT}
+            )
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="webhook-dispatch")
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued is delivered or given up."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self) -> None:
+        tasks = [t for t in (self._task, *self._sends) if t is not None]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._sends.clear()
+        for hook in self.hooks.values():
+            self._fail(hook, list(hook.items), "closed")
+            hook.items.clear()
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    # ---------- Queue ----------
+    def __contains__(self, name: str) -> bool:
+        return name in self.hooks
+
+    async def submit(
+        self,
+        name: str,
+        *,
+        content: str = "",
+        embeds: Optional[List[Dict[str, Any]]] = None,
+    ) -> asyncio.Future:
+        """Queue a message for webhook ``name``, waiting while the queue is
+        full. The returned future resolves True once delivered, False if it
+        was given up."""
+        hook = self.hooks.get(name)
+        if hook is None:
+            raise KeyError(f"Unknown webhook {name!r}")
+        await self._space.acquire()
+        fut = asyncio.get_running_loop().create_future()
+        if hook.dead:
+            self._space.release()
+            self.failed += 1
+            fut.set_result(False)
+            return fut
+        hook.items.append(_Item(content, list(embeds or ()), fut))
+        self.queued += 1
+        self._idle.clear()
+        self._wake.set()
+        return fut
+
+    def pending(self) -> int:
+        return sum(len(h.items) + h.inflight for h in self.hooks.values())
+
+    # ---------- Dispatcher ----------
+    def _ready_at(self, hook: _Hook, now: float) -> float:
+        if hook.remaining is not None and now >= hook.reset_at:
+            hook.remaining = None  # window rolled over
+        at = max(hook.not_before, self._global_until)
+        if hook.remaining is not None and hook.remaining <= 0:
+            at = max(at, hook.reset_at)
+        return at
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            wake_at: Optional[float] = None
+            for hook in self.hooks.values():
+                self._expire(hook, now)
+                while hook.items and hook.inflight < self.per_webhook:
+                    at = self._ready_at(hook, now)
+                    if at > now:
+                        wake_at = at if wake_at is None else min(wake_at, at)
+                        break
+                    if hook.remaining is not None:
+                        hook.remaining -= 1  # spend it now; the reply corrects
+                    batch = _coalesce(hook.items)
+                    hook.inflight += 1
+                    t = asyncio.create_task(self._send(hook, batch))
+                    self._sends.add(t)
+                    t.add_done_callback(self._sends.discard)
+            if not self.pending():
+                self._idle.set()
+            timeout = None if wake_at is None else max(0.0, wake_at - now)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _expire(self, hook: _Hook, now: float) -> None:
+        if not hook.items or now - hook.items[0].enqueued_at < self.max_age_s:
+            return
+        stale = [i for i in hook.items if now - i.enqueued_at >= self.max_age_s]
+        for item in stale:
+            hook.items.remove(item)
+        self._fail(hook, stale, "expired")
+
+    def _done(self, items: List[_Item], ok: bool) -> None:
+        for item in items:
+            self._space.release()
+            if not item.future.done():
+                item.future.set_result(ok)
+
+    def _fail(self, hook: _Hook, items: List[_Item], reason: str) -> None:
+        if not items:
+            return
+        self.failed += len(items)
+        log.warning(
+            "Dropped %d message(s) for webhook %s: %s", len(items), hook.name, reason
+        )
+        self._done(items, False)
+
+    def _requeue(self, hook: _Hook, batch: List[_Item]) -> None:
+        hook.items.extendleft(reversed(batch))
+
+    def _pace(self, hook: _Hook, headers: Mapping[str, str], now: float) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            return
+        try:
+            # Sends still in flight haven't been counted in this reply yet
+            hook.remaining = int(remaining) - (hook.inflight - 1)
+            hook.reset_at = now + float(reset_after)
+        except ValueError:
+            pass
+
+    def _payload(self, batch: List[_Item]) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {}
+        content = "\n".join(i.content for i in batch if i.content)
+        if content:
+            payload["content"] = content
+        embeds = [e for i in batch for e in i.embeds]
+        if embeds:
+            payload["embeds"] = embeds
+        return payload
+
+    async def _send(self, hook: _Hook, batch: List[_Item]) -> None:
+        try:
+            await self._post(hook, batch)
+        except asyncio.CancelledError:
+            self._requeue(hook, batch)
+            raise
+        except Exception:
+            log.exception("Webhook %s send failed", hook.name)
+            self._fail(hook, batch, "error")
+        finally:
+            hook.inflight -= 1
+            self._wake.set()
+
+    async def _post(self, hook: _Hook, batch: List[_Item]) -> None:
+        if self.session is None or self.session.closed:
+            await self.start()
+        await self._bucket.acquire()
+        try:
+            async with self.session.post(hook.url, json=self._payload(batch)) as resp:
+                now = time.monotonic()
+                self._pace(hook, resp.headers, now)
+                if resp.status == 429:
+                    try:
+                        body = await resp.json(content_type=None)
+                    except ValueError:
+                        # e.g. an HTML page from a proxy; Retry-After still works
+                        body = None
+                    self._rate_limited(hook, resp.headers, body, now)
+                    self._requeue(hook, batch)
+                    return
+                if resp.status in (401, 403, 404):
+                    hook.dead = True
+                    self._fail(hook, batch + list(hook.items), f"HTTP {resp.status}")
+                    hook.items.clear()
+                    return
+                if resp.status >= 500:
+                    self._retry(hook, batch, f"HTTP {resp.status}")
+                    return
+                if resp.status >= 400:
+                    text = await resp.text()
+                    self._fail(hook, batch, f"HTTP {resp.status}: {text[:200]}")
+                    return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._retry(hook, batch, type(e).__name__)
+            return
+
+        self.sent_messages += 1
+        self.sent_items += len(batch)
+        self.coalesced += len(batch) - 1
+        for item in batch:
+            waited = now - item.enqueued_at
+            hook.latency.observe(waited)
+            self.latency.observe(waited)
+        self._done(batch, True)
+
+    def _rate_limited(
+        self, hook: _Hook, headers: Mapping[str, str], body: Any, now: float
+    ) -> None:
+        self.rate_limited += 1
+        retry = None
+        if isinstance(body, dict):
+            retry = body.get("retry_after")
+        try:
+            retry = float(retry if retry is not None else headers.get("Retry-After", 1))
+        except (TypeError, ValueError):
+            retry = 1.0
+        hook.not_before = max(hook.not_before, now + retry)
+        is_global = headers.get("X-RateLimit-Global") or (
+            isinstance(body, dict) and body.get("global")
+        )
+        if is_global:
+            self._global_until = max(self._global_until, now + retry)
+        log.info("Webhook %s rate limited for %.2fs", hook.name, retry)
+
+    def _retry(self, hook: _Hook, batch: List[_Item], reason: str) -> None:
+        for item in batch:
+            item.attempts += 1
+        give_up = [i for i in batch if i.attempts >= self.max_attempts]
+        keep = [i for i in batch if i.attempts < self.max_attempts]
+        self._fail(hook, give_up, f"{reason} after {self.max_attempts} attempts")
+        if keep:
+            self.retries += 1
+            attempts = max(i.attempts for i in keep)
+            delay = min(60.0, 2.0**attempts) * random.uniform(0.8, 1.2)
+            hook.not_before = max(hook.not_before, time.monotonic() + delay)
+            self._requeue(hook, keep)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "webhooks": len(self.hooks),
+            "pending": self.pending(),
+            "queued": self.queued,
+            "sent_messages": self.sent_messages,
+            "sent_items": self.sent_items,
+            "coalesced": self.coalesced,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failed": self.failed,
+            "latency_s": self.latency.as_dict(),
+            "per_webhook": {
+                name: hook.latency.as_dict() for name, hook in self.hooks.items()
+            },
+            **self.pool_stats.as_dict(),
+        }
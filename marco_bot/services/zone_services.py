@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from ..utils.geofence import Zone, ZoneIndex, geojson_rings
+from .nws_services import NWSAlertService
+
+__all__ = ["ALERT_ZONES", "ZoneSpec", "load_zone_index"]
+
+log = logging.getLogger(__name__)
+
+# (display name, NWS zones whose outline makes up the area, codes that
+# name it in zone-based alerts: UGC + SAME)
+ZoneSpec = Tuple[str, Tuple[str, ...], Tuple[str, ...]]
+
+_MARINE = ("AMZ550", "AMZ552", "AMZ555", "AMZ570", "AMZ572", "AMZ575")
+
+# Keyed by the Config.webhooks entry each area posts to
+ALERT_ZONES: Dict[str, ZoneSpec] = {
+    "ORANGE_URL": ("Orange", ("FLC095",), ("FLC095", "012095")),
+    "SEMINOLE_URL": ("Seminole", ("FLC117",), ("FLC117", "012117")),
+    "BREVARD_URL": ("Brevard", ("FLC009",), ("FLC009", "012009")),
+    "VOLUSIA_URL": ("Volusia", ("FLC127",), ("FLC127", "012127")),
+    "LAKE_URL": ("Lake", ("FLC069",), ("FLC069", "012069")),
+    "OSCEOLA_URL": ("Osceola", ("FLC097",), ("FLC097", "012097")),
+    "ST_JOHNS_URL": ("St Johns", ("FLC109",), ("FLC109", "012109")),
+    "POLK_URL": ("Polk", ("FLC105",), ("FLC105", "012105")),
+    "FLAGLER_URL": ("Flagler", ("FLC035",), ("FLC035", "012035")),
+    "MARINE_URL": (
+        "Marine",
+        _MARINE,
+        _MARINE + tuple("075" + z[3:] for z in _MARINE),
+    ),
+}
+
+# UCF main campus, (lon, lat); zone-based alerts reach it through Orange
+CAMPUS_KEY = "ARC_URL"
+CAMPUS_RING = (
+    (-81.2100, 28.5900),
+    (-81.1880, 28.5900),
+    (-81.1880, 28.6130),
+    (-81.2100, 28.6130),
+)
+
+
+def _read_cache(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        log.warning("Ignoring unreadable zone cache %s", path)
+        return {}
+
+
+def _write_cache(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+async def load_zone_index(
+    svc: NWSAlertService,
+    cache_path: Optional[str] = None,
+    zones: Dict[str, ZoneSpec] = ALERT_ZONES,
+) -> ZoneIndex:
+    """Build the alert zone index, outlines from the NWS zones API.
+
+    Outlines barely change, so they're kept in ``cache_path`` and only
+    missing ones are fetched. A zone whose outline can't be had still
+    matches zone-based alerts by code.
+    """
+    cache = _read_cache(cache_path) if cache_path else {}
+    wanted = {zid for _, ids, _ in zones.values() for zid in ids}
+    missing = sorted(wanted - cache.keys())
+
+    async def _fetch(zid: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await svc.zone_geometry(zid)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            log.warning("NWS zone %s outline unavailable: %s", zid, e)
+            return None
+
+    fetched = await asyncio.gather(*(_fetch(z) for z in missing))
+    added = {z: g for z, g in zip(missing, fetched) if g}
+    if added:
+        cache.update(added)
+        if cache_path:
+            try:
+                _write_cache(cache_path, cache)
+            except OSError:
+                log.warning("Could not write zone cache %s", cache_path)
+
+    index = ZoneIndex()
+    for key, (name, ids, codes) in zones.items():
+        rings = [r for zid in ids for r in geojson_rings(cache.get(zid))]
+        index.add(Zone(key, name, codes, rings))
+    _, _, orange_codes = zones.get("ORANGE_URL", ("", (), ()))
+    index.add(Zone(CAMPUS_KEY, "UCF", orange_codes, [CAMPUS_RING]))
+    log.info(
+        "Alert zones indexed: %d (%d with outlines)",
+        len(index),
+        sum(z.has_geometry for z in index.zones.values()),
+    )
+    return index
@@ -6,8 +6,25 @@ from .distance import (
     Distance,
     haversine,
     haversine_km,
+    haversine_many,
+    haversine_matrix,
     haversine_miles,
 )
+from .breaker import CircuitBreaker
+from .geofence import (
+    BBox,
+    Zone,
+    ZoneIndex,
+    geojson_rings,
+)
+from .histogram import Histogram
+from .http import (
+    PoolLimits,
+    PoolStats,
+    pooled_session,
+)
+from .ratelimit import TokenBucket
+from .singleflight import SingleFlight
 
 __all__ = [
     "setup_logging",
@@ -15,4 +32,17 @@ __all__ = [
     "haversine",
     "haversine_km",
     "haversine_miles",
+    "haversine_many",
+    "haversine_matrix",
+    "CircuitBreaker",
+    "BBox",
+    "Zone",
+    "ZoneIndex",
+    "geojson_rings",
+    "Histogram",
+    "PoolLimits",
+    "PoolStats",
+    "pooled_session",
+    "SingleFlight",
+    "TokenBucket",
 ]
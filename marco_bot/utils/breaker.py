@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+__all__ = ["CircuitBreaker"]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-dependency circuit breaker driven by EWMAs:
+      - ``error_rate`` and ``latency_s`` are exponentially weighted averages
+      - Opens when the error rate or latency crosses its threshold (after
+        ``min_samples`` calls), so a dead upstream is skipped entirely
+      - After ``cooldown_s`` one probe is let through (half-open); success
+        closes the breaker, failure re-opens it with a doubled cool-down
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        error_threshold: float = 0.5,
+        slow_threshold_s: float = 3.0,
+        min_samples: int = 5,
+        alpha: float = 0.2,
+        cooldown_s: float = 30.0,
+        max_cooldown_s: float = 600.0,
+    ) -> None:
+        self.name = name
+        self.error_threshold = error_threshold
+        self.slow_threshold_s = slow_threshold_s
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.base_cooldown_s = cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+
+        self.state = CLOSED
+        self.error_rate = 0.0
+        self.latency_s = 0.0
+        self.samples = 0
+        self.cooldown_s = cooldown_s
+        self._opened_at = 0.0
+        self._probing = False
+
+        self.opens = 0
+        self.skipped = 0
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """May a request go out now? Counts refusals in ``skipped``."""
+        now = time.monotonic() if now is None else now
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self._opened_at >= self.cooldown_s:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.skipped += 1
+        return False
+
+    def release(self) -> None:
+        """Give back a probe slot for a call that never reached the
+        dependency (e.g. cancelled while still queued on our side)."""
+        self._probing = False
+
+    def record(self, ok: bool, latency_s: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        a = self.alpha
+        self.samples += 1
+        self.error_rate = a * (0.0 if ok else 1.0) + (1 - a) * self.error_rate
+        self.latency_s = a * latency_s + (1 - a) * self.latency_s
+
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if ok and latency_s < self.slow_threshold_s:
+                self._close()
+            else:
+                self._open(now, backoff=True)
+            return
+
+        if self.state == CLOSED and self.samples >= self.min_samples:
+            if (
+                self.error_rate >= self.error_threshold
+                or self.latency_s >= self.slow_threshold_s
+            ):
+                self._open(now)
+
+    def _open(self, now: float, backoff: bool = False) -> None:
+        if backoff:
+            self.cooldown_s = min(self.max_cooldown_s, self.cooldown_s * 2)
+        self.state = OPEN
+        self._opened_at = now
+        self.opens += 1
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.cooldown_s = self.base_cooldown_s
+        # Start fresh so one good probe isn't outvoted by the old history
+        self.error_rate = 0.0
+        self.latency_s = 0.0
+        self.samples = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ms": round(self.latency_s * 1000),
+            "opens": self.opens,
+            "skipped": self.skipped,
+        }
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from math import radians, sin, cos, sqrt, atan2
-from typing import Final
+from typing import Any, Final, Optional
+
+import numpy as np
 
 __all__ = [
     "Distance",
     "haversine",
     "haversine_km",
     "haversine_miles",
+    "haversine_many",
+    "haversine_matrix",
 ]
 
 # Mean Earth radius per IUGG in kilometers.
@@ -74,3 +78,159 @@ def haversine_km(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
 
 def haversine_miles(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
     return haversine(lon1, lat1, lon2, lat2).miles
+
+
+# ---------- Vectorized (NumPy) ----------
+def _unit_scale(unit: str) -> float:
+    if unit == "km":
+        return 1.0
+    if unit == "mi":
+        return _KM_TO_MI
+    raise ValueError(f"Unit {unit!r} must be 'km' or 'mi'.")
+
+
+def _as_float64(values: Any) -> np.ndarray:
+    # Lists, scalars, NumPy arrays and buffer objects (array.array, memoryview)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _validate_arrays(lons: np.ndarray, lats: np.ndarray) -> None:
+    # One pass per array; NaN fails the comparisons just like the scalar path.
+    bad = ~((lons >= -180.0) & (lons <= 180.0))
+    if bad.any():
+        i = np.flatnonzero(bad)[0]
+        raise ValueError(
+            f"Longitude {float(lons.flat[i])!r} at index {i} out of range [-180, 180]."
+        )
+    bad = ~((lats >= -90.0) & (lats <= 90.0))
+    if bad.any():
+        i = np.flatnonzero(bad)[0]
+        raise ValueError(
+            f"Latitude {float(lats.flat[i])!r} at index {i} out of range [-90, 90]."
+        )
+
+
+def _out_array(out: Optional[np.ndarray], shape: tuple) -> np.ndarray:
+    if out is None:
+        return np.empty(shape, dtype=np.float64)
+    if not isinstance(out, np.ndarray) or out.dtype != np.float64:
+        raise TypeError("out must be a float64 numpy array.")
+    if out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}.")
+    if not out.flags.c_contiguous or not out.flags.writeable:
+        raise ValueError("out must be C-contiguous and writeable.")
+    return out
+
+
+def _haversine_into(
+    lon1_r: np.ndarray,
+    lat1_r: np.ndarray,
+    cos1: np.ndarray,
+    lon2_r: np.ndarray,
+    lat2_r: np.ndarray,
+    cos2: np.ndarray,
+    scale: float,
+    out: np.ndarray,
+) -> np.ndarray:
+    # Same formula and operation order as haversine(), written into ``out``
+    # with as few temporaries as the ufuncs allow.
+    t = np.empty_like(out)
+    np.subtract(lon2_r, lon1_r, out=t)
+    t *= 0.5
+    np.sin(t, out=t)
+    np.square(t, out=t)
+    t *= cos1 * cos2
+
+    np.subtract(lat2_r, lat1_r, out=out)
+    out *= 0.5
+    np.sin(out, out=out)
+    np.square(out, out=out)
+    out += t  # a
+
+    np.subtract(1.0, out, out=t)
+    np.sqrt(t, out=t)
+    np.sqrt(out, out=out)
+    np.arctan2(out, t, out=out)
+    out *= 2.0
+    out *= _EARTH_RADIUS_KM
+    if scale != 1.0:
+        out *= scale
+    return out
+
+
+def haversine_many(
+    lons1: Any,
+    lats1: Any,
+    lons2: Any,
+    lats2: Any,
+    *,
+    unit: str = "km",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Element-wise great-circle distances between two sets of points.
+
+    Inputs are anything array-like (lists, NumPy arrays, buffers) and are
+    broadcast together; every coordinate is range-checked up front. Returns
+    a contiguous float64 array in ``unit`` ("km" or "mi"), written into
+    ``out`` when given.
+    """
+    scale = _unit_scale(unit)
+    lon1, lat1 = _as_float64(lons1), _as_float64(lats1)
+    lon2, lat2 = _as_float64(lons2), _as_float64(lats2)
+    _validate_arrays(lon1, lat1)
+    _validate_arrays(lon2, lat2)
+    shape = np.broadcast_shapes(lon1.shape, lat1.shape, lon2.shape, lat2.shape)
+    out = _out_array(out, shape)
+
+    lat1_r, lat2_r = np.radians(lat1), np.radians(lat2)
+    return _haversine_into(
+        np.radians(lon1),
+        lat1_r,
+        np.cos(lat1_r),
+        np.radians(lon2),
+        lat2_r,
+        np.cos(lat2_r),
+        scale,
+        out,
+    )
+
+
+def _points(points: Any, name: str) -> np.ndarray:
+    arr = _as_float64(points)
+    if arr.ndim == 1 and arr.shape[0] == 2:
+        arr = arr.reshape(1, 2)
+    if arr.ndim != 2 or arr.shape[1] != 2:
+        raise ValueError(f"{name} must have shape (n, 2) as (lon, lat) rows.")
+    return arr
+
+
+def haversine_matrix(
+    points_a: Any,
+    points_b: Any,
+    *,
+    unit: str = "km",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Distances from every point in ``points_a`` to every point in
+    ``points_b``, as an (n, m) float64 array.
+
+    Points are (lon, lat) rows, matching haversine(). Each input is
+    validated and converted to radians once, not once per pair.
+    """
+    scale = _unit_scale(unit)
+    a, b = _points(points_a, "points_a"), _points(points_b, "points_b")
+    _validate_arrays(a[:, 0], a[:, 1])
+    _validate_arrays(b[:, 0], b[:, 1])
+    out = _out_array(out, (a.shape[0], b.shape[0]))
+
+    ra, rb = np.radians(a), np.radians(b)
+    return _haversine_into(
+        ra[:, 0:1],
+        ra[:, 1:2],
+        np.cos(ra[:, 1:2]),
+        rb[:, 0],
+        rb[:, 1],
+        np.cos(rb[:, 1]),
+        scale,
+        out,
+    )
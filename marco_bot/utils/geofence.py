@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .distance import _EARTH_RADIUS_KM, _KM_TO_MI
+
+__all__ = [
+    "BBox",
+    "Zone",
+    "ZoneIndex",
+    "geojson_rings",
+]
+
+# Statute miles per degree of latitude (and of longitude at the equator)
+MI_PER_DEG = math.radians(1.0) * _EARTH_RADIUS_KM * _KM_TO_MI
+
+# (lon, lat) pairs, GeoJSON order
+Point = Tuple[float, float]
+Ring = Sequence[Point]
+
+
+def geojson_rings(geometry: Optional[Dict[str, Any]]) -> Tuple[Tuple[Point, ...], ...]:
+    """Outer rings of a GeoJSON Polygon / MultiPolygon (holes are ignored)."""
+    if not geometry:
+        return ()
+    kind = geometry.get("type")
+    coords = geometry.get("coordinates") or ()
+    if kind == "Polygon":
+        polys = [coords]
+    elif kind == "MultiPolygon":
+        polys = list(coords)
+    else:
+        return ()
+    out = []
+    for poly in polys:
+        if poly and len(poly[0]) >= 3:
+            out.append(tuple((float(x), float(y)) for x, y, *_ in poly[0]))
+    return tuple(out)
+
+
+def _deg_lon(miles: float, lat: float) -> float:
+    return miles / (MI_PER_DEG * max(math.cos(math.radians(lat)), 0.01))
+
+
+@dataclass(frozen=True, slots=True)
+class BBox:
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+
+    @classmethod
+    def of(cls, rings: Iterable[Ring]) -> "BBox":
+        pts = np.concatenate([np.asarray(r, dtype=np.float64) for r in rings])
+        lo, hi = pts.min(axis=0), pts.max(axis=0)
+        return cls(float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1]))
+
+    def buffered(self, miles: float) -> "BBox":
+        if miles <= 0:
+            return self
+        dlat = miles / MI_PER_DEG
+        # Widest longitude span is at the latitude furthest from the equator
+        dlon = _deg_lon(miles, max(abs(self.min_lat), abs(self.max_lat)))
+        return BBox(
+            self.min_lon - dlon,
+            self.min_lat - dlat,
+            self.max_lon + dlon,
+            self.max_lat + dlat,
+        )
+
+    def intersects(self, other: "BBox") -> bool:
+        return not (
+            other.min_lon > self.max_lon
+            or other.max_lon < self.min_lon
+            or other.min_lat > self.max_lat
+            or other.max_lat < self.min_lat
+        )
+
+    def contains(self, lon: float, lat: float) -> bool:
+        return (
+            self.min_lon <= lon <= self.max_lon and self.min_lat <= lat <= self.max_lat
+        )
+
+
+# ---------- Planar helpers (local equirectangular, miles) ----------
+def _point_seg_dist(
+    px: np.ndarray, py: np.ndarray, e: np.ndarray, kx: float
+) -> np.ndarray:
+    """Distance (miles) from points to segments ``e`` = [x1, y1, x2, y2]
+    in degrees; ``kx`` scales longitude to miles at the local latitude."""
+    x1, y1 = e[..., 0] * kx, e[..., 1] * MI_PER_DEG
+    x2, y2 = e[..., 2] * kx, e[..., 3] * MI_PER_DEG
+    px, py = px * kx, py * MI_PER_DEG
+    dx, dy = x2 - x1, y2 - y1
+    len2 = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(len2 > 0, ((px - x1) * dx + (py - y1) * dy) / len2, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+def _cross(ax, ay, bx, by, cx, cy):
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _seg_seg_dist(a: np.ndarray, e: np.ndarray, kx: float) -> np.ndarray:
+    """Distance (miles) from one segment ``a`` to each segment in ``e``."""
+    d1 = _cross(a[0], a[1], a[2], a[3], e[:, 0], e[:, 1])
+    d2 = _cross(a[0], a[1], a[2], a[3], e[:, 2], e[:, 3])
+    d3 = _cross(e[:, 0], e[:, 1], e[:, 2], e[:, 3], a[0], a[1])
+    d4 = _cross(e[:, 0], e[:, 1], e[:, 2], e[:, 3], a[2], a[3])
+    crosses = (d1 * d2 <= 0) & (d3 * d4 <= 0)
+    dist = np.minimum.reduce(
+        [
+            _point_seg_dist(e[:, 0], e[:, 1], a, kx),
+            _point_seg_dist(e[:, 2], e[:, 3], a, kx),
+            _point_seg_dist(np.array([a[0]]), np.array([a[1]]), e, kx),
+            _point_seg_dist(np.array([a[2]]), np.array([a[3]]), e, kx),
+        ]
+    )
+    return np.where(crosses, 0.0, dist)
+
+
+def _edges(rings: Iterable[Ring]) -> np.ndarray:
+    """Closed rings -> (n, 4) array of [x1, y1, x2, y2] edges."""
+    out = []
+    for ring in rings:
+        pts = np.asarray(ring, dtype=np.float64)[:, :2]
+        if len(pts) < 3:
+            continue
+        if not np.array_equal(pts[0], pts[-1]):
+            pts = np.vstack([pts, pts[:1]])
+        out.append(np.hstack([pts[:-1], pts[1:]]))
+    return np.concatenate(out) if out else np.empty((0, 4))
+
+
+def _ring_contains(edges: np.ndarray, lon: float, lat: float) -> bool:
+    """Even-odd ray cast (towards +lon) over the given edges."""
+    if not len(edges):
+        return False
+    x1, y1, x2, y2 = edges.T
+    straddle = (y1 > lat) != (y2 > lat)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xcross = x1 + (lat - y1) * (x2 - x1) / (y2 - y1)
+    return bool(np.count_nonzero(straddle & (lon < xcross)) & 1)
+
+
+class _EdgeGrid:
+    """Polygon edges bucketed into a uniform lon/lat grid, so a query only
+    touches the edges near it instead of the whole boundary."""
+
+    def __init__(self, edges: np.ndarray, cell_deg: float) -> None:
+        self.edges = edges
+        self.cell = float(cell_deg)
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        lo_x = np.floor(np.minimum(edges[:, 0], edges[:, 2]) / self.cell).astype(int)
+        hi_x = np.floor(np.maximum(edges[:, 0], edges[:, 2]) / self.cell).astype(int)
+        lo_y = np.floor(np.minimum(edges[:, 1], edges[:, 3]) / self.cell).astype(int)
+        hi_y = np.floor(np.maximum(edges[:, 1], edges[:, 3]) / self.cell).astype(int)
+        for i, (c0, c1, r0, r1) in enumerate(zip(lo_x, hi_x, lo_y, hi_y)):
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    buckets.setdefault((r, c), []).append(i)
+        self._buckets = {k: np.array(v, dtype=np.intp) for k, v in buckets.items()}
+        # Per row: the columns in use, for the ray-cast slab
+        rows: Dict[int, List[int]] = {}
+        for r, c in self._buckets:
+            rows.setdefault(r, []).append(c)
+        self._rows = {r: sorted(cs) for r, cs in rows.items()}
+
+    def _idx(self, v: float) -> int:
+        return int(math.floor(v / self.cell))
+
+    def near(self, box: BBox) -> np.ndarray:
+        """Edges whose cells overlap ``box``."""
+        r0, r1 = self._idx(box.min_lat), self._idx(box.max_lat)
+        c0, c1 = self._idx(box.min_lon), self._idx(box.max_lon)
+        hits = [
+            self._buckets[(r, c)]
+            for r in range(r0, r1 + 1)
+            for c in self._cols(r, c0, c1)
+        ]
+        if not hits:
+            return self.edges[:0]
+        return self.edges[np.unique(np.concatenate(hits))]
+
+    def ray(self, lon: float, lat: float) -> np.ndarray:
+        """Edges that could cross the ray from (lon, lat) towards +lon."""
+        r = self._idx(lat)
+        hits = [self._buckets[(r, c)] for c in self._cols(r, self._idx(lon), None)]
+        if not hits:
+            return self.edges[:0]
+        return self.edges[np.unique(np.concatenate(hits))]
+
+    def _cols(self, r: int, c0: int, c1: Optional[int]) -> List[int]:
+        cols = self._rows.get(r, ())
+        return [c for c in cols if c >= c0 and (c1 is None or c <= c1)]
+
+
+class Zone:
+    """
+    One alerting area (a county, a marine zone group, the campus):
+      - ``codes`` are the NWS UGC/SAME codes that name it, for alerts
+        issued by zone rather than by polygon
+      - ``rings`` (optional) are its outline; edges are indexed in a fine
+        grid so point-in-polygon and buffered distance tests only look at
+        the boundary near the query
+    """
+
+    def __init__(
+        self,
+        key: str,
+        name: str,
+        codes: Iterable[str] = (),
+        rings: Iterable[Ring] = (),
+        *,
+        cell_deg: float = 0.05,
+    ) -> None:
+        self.key = key
+        self.name = name
+        self.codes: FrozenSet[str] = frozenset(codes)
+        self.rings: Tuple[Ring, ...] = tuple(r for r in rings if len(r) >= 3)
+        self.bbox: Optional[BBox] = None
+        self._grid: Optional[_EdgeGrid] = None
+        if self.rings:
+            self.bbox = BBox.of(self.rings)
+            self._grid = _EdgeGrid(_edges(self.rings), cell_deg)
+
+    @property
+    def has_geometry(self) -> bool:
+        return self._grid is not None
+
+    def contains(self, lon: float, lat: float) -> bool:
+        if self._grid is None or not self.bbox.contains(lon, lat):
+            return False
+        return _ring_contains(self._grid.ray(lon, lat), lon, lat)
+
+    def distance_miles(self, lon: float, lat: float, within: float) -> float:
+        """Distance to the boundary if it's within ``within`` miles, else inf."""
+        if self._grid is None:
+            return math.inf
+        box = BBox(lon, lat, lon, lat).buffered(within)
+        if not self.bbox.intersects(box):
+            return math.inf
+        edges = self._grid.near(box)
+        if not len(edges):
+            return math.inf
+        kx = MI_PER_DEG * math.cos(math.radians(lat))
+        d = float(_point_seg_dist(np.array(lon), np.array(lat), edges, kx).min())
+        return d if d <= within else math.inf
+
+    def near(self, lon: float, lat: float, buffer_miles: float = 0.0) -> bool:
+        """Inside the zone, or within ``buffer_miles`` of its boundary."""
+        if self.contains(lon, lat):
+            return True
+        return (
+            buffer_miles > 0
+            and self.distance_miles(lon, lat, buffer_miles) <= buffer_miles
+        )
+
+    def touches(self, rings: Sequence[Ring], buffer_miles: float = 0.0) -> bool:
+        """Whether polygon ``rings`` overlap the zone or come within
+        ``buffer_miles`` of it."""
+        if self._grid is None or not rings:
+            return False
+        other = BBox.of(rings)
+        if not self.bbox.intersects(other.buffered(buffer_miles)):
+            return False
+        other_edges = _edges(rings)
+        # The zone sits wholly inside the polygon
+        x0, y0 = self._grid.edges[0, :2]
+        if other.contains(x0, y0) and _ring_contains(other_edges, x0, y0):
+            return True
+        # A polygon vertex is inside the zone
+        for x, y in other_edges[:, :2]:
+            if self.contains(float(x), float(y)):
+                return True
+        # Boundaries cross, or pass within the buffer
+        for seg in other_edges:
+            box = BBox(
+                min(seg[0], seg[2]),
+                min(seg[1], seg[3]),
+                max(seg[0], seg[2]),
+                max(seg[1], seg[3]),
+            ).buffered(buffer_miles)
+            if not self.bbox.intersects(box):
+                continue
+            edges = self._grid.near(box)
+            if not len(edges):
+                continue
+            kx = MI_PER_DEG * math.cos(math.radians(0.5 * (seg[1] + seg[3])))
+            if float(_seg_seg_dist(seg, edges, kx).min()) <= buffer_miles:
+                return True
+        return False
+
+
+class ZoneIndex:
+    """
+    Match alerts to zones without scanning every zone:
+      - UGC/SAME codes resolve through a dict
+      - Zone bounding boxes are registered in a coarse grid; a polygon only
+        gets exact tests against zones sharing a cell with its (buffered)
+        bounding box, and those tests only walk nearby edges (see Zone)
+      - Polygon alerts match geometrically, WEA style; zone-based alerts
+        (and zones whose outline isn't loaded) match by code
+    """
+
+    def __init__(self, zones: Iterable[Zone] = (), *, cell_deg: float = 0.25) -> None:
+        self.cell = float(cell_deg)
+        self.zones: Dict[str, Zone] = {}
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        self._by_code: Dict[str, Set[str]] = {}
+        for z in zones:
+            self.add(z)
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def _span(self, box: BBox) -> Iterable[Tuple[int, int]]:
+        r0, r1 = math.floor(box.min_lat / self.cell), math.floor(
+            box.max_lat / self.cell
+        )
+        c0, c1 = math.floor(box.min_lon / self.cell), math.floor(
+            box.max_lon / self.cell
+        )
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                yield r, c
+
+    def add(self, zone: Zone) -> None:
+        if zone.key in self.zones:
+            raise ValueError(f"Zone {zone.key!r} already indexed")
+        self.zones[zone.key] = zone
+        for code in zone.codes:
+            self._by_code.setdefault(code, set()).add(zone.key)
+        if zone.bbox is not None:
+            for cell in self._span(zone.bbox):
+                self._cells.setdefault(cell, []).append(zone.key)
+
+    def _candidates(self, box: BBox) -> Set[str]:
+        found: Set[str] = set()
+        for cell in self._span(box):
+            found.update(self._cells.get(cell, ()))
+        return found
+
+    def zones_near(
+        self, lon: float, lat: float, buffer_miles: float = 0.0
+    ) -> List[str]:
+        """Keys of zones containing the point or within the buffer of it."""
+        box = BBox(lon, lat, lon, lat).buffered(buffer_miles)
+        return sorted(
+            k
+            for k in self._candidates(box)
+            if self.zones[k].near(lon, lat, buffer_miles)
+        )
+
+    def by_codes(self, codes: Iterable[str]) -> Set[str]:
+        found: Set[str] = set()
+        for code in codes:
+            found.update(self._by_code.get(code, ()))
+        return found
+
+    def match(
+        self,
+        rings: Sequence[Ring] = (),
+        codes: Iterable[str] = (),
+        buffer_miles: float = 0.0,
+    ) -> Set[str]:
+        """Keys of the zones an alert (outline and/or codes) applies to."""
+        by_code = self.by_codes(codes)
+        if not rings:
+            return by_code
+        found = {k for k in by_code if not self.zones[k].has_geometry}
+        for k in self._candidates(BBox.of(rings).buffered(buffer_miles)):
+            if self.zones[k].touches(rings, buffer_miles):
+                found.add(k)
+        return found
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, Sequence
+
+__all__ = ["Histogram"]
+
+# Seconds; wide enough to cover a send that sat out a long rate limit
+LATENCY_BOUNDS_S = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style upper bounds).
+
+    ``observe()`` is O(log buckets) with no per-sample storage; quantiles
+    are reported as the upper bound of the bucket they fall in (the exact
+    max for the overflow bucket).
+    """
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BOUNDS_S) -> None:
+        self.bounds = tuple(sorted(float(b) for b in bounds))
+        self.counts = [0] * (len(self.bounds) + 1)  # last = overflow
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return (
+                    min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                )
+        return self.max
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 4),
+        }
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+__all__ = [
+    "PoolLimits",
+    "PoolStats",
+    "pooled_session",
+]
+
+
+@dataclass(frozen=True)
+class PoolLimits:
+    """Connection pool limits for a long-lived aiohttp session."""
+
+    total: int = 32  # max open connections across all hosts
+    per_host: int = 8  # max open connections to a single host
+    keepalive_s: float = 30.0  # idle keep-alive before a socket is closed
+    dns_ttl_s: int = 300  # cached DNS answers live this long
+    timeout_s: float = 10.0  # default total timeout per request
+
+
+@dataclass
+class PoolStats:
+    """Connection reuse counters, fed by aiohttp trace hooks."""
+
+    hits: int = 0  # request went out on a pooled keep-alive connection
+    misses: int = 0  # a new connection (TCP + TLS handshake) was opened
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "pool_hits": self.hits,
+            "pool_misses": self.misses,
+            "pool_hit_rate": round(self.hit_rate, 3),
+        }
+
+
+def pooled_session(
+    limits: Optional[PoolLimits] = None,
+    stats: Optional[PoolStats] = None,
+    headers: Optional[Mapping[str, str]] = None,
+) -> aiohttp.ClientSession:
+    """Build a keep-alive session with per-host limits and DNS caching.
+
+    Must be called from a running event loop. When ``stats`` is given, every
+    request bumps either ``hits`` (reused connection) or ``misses`` (new one).
+    """
+    limits = limits or PoolLimits()
+    connector = aiohttp.TCPConnector(
+        limit=limits.total,
+        limit_per_host=limits.per_host,
+        keepalive_timeout=limits.keepalive_s,
+        use_dns_cache=True,
+        ttl_dns_cache=limits.dns_ttl_s,
+    )
+
+    trace_configs: list[aiohttp.TraceConfig] = []
+    if stats is not None:
+        trace = aiohttp.TraceConfig()
+
+        async def _on_reuse(_session, _ctx, _params) -> None:
+            stats.hits += 1
+
+        async def _on_create(_session, _ctx, _params) -> None:
+            stats.misses += 1
+
+        trace.on_connection_reuseconn.append(_on_reuse)
+        trace.on_connection_create_end.append(_on_create)
+        trace_configs.append(trace)
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=dict(headers or {}),
+        timeout=aiohttp.ClientTimeout(total=limits.timeout_s),
+        trace_configs=trace_configs,
+    )
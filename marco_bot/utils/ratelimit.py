@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+__all__ = ["TokenBucket"]
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursts up to ``burst``.
+
+    ``acquire()`` waits (without holding up other tasks) until a token is
+    available; waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited_s = 0.0  # total time callers spent throttled
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1.0:
+                delay = (1.0 - self._tokens) / self.rate
+                self.waited_s += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self._tokens -= 1.0
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+__all__ = ["SingleFlight"]
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[K, T]):
+    """Coalesce concurrent calls for the same key into one in-flight task.
+
+    The first caller for a key launches ``fn()``; everyone arriving while it
+    runs awaits the same task. The task is shielded, so a caller giving up
+    (e.g. an interaction timing out) never cancels the work for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[K, asyncio.Task[T]] = {}
+        self.launched = 0  # calls that actually ran fn()
+        self.coalesced = 0  # calls that piggy-backed on an in-flight task
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def start(self, key: K, fn: Callable[[], Awaitable[T]]) -> asyncio.Task[T]:
+        """Return the in-flight task for ``key``, launching ``fn()`` if idle."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        self.launched += 1
+
+        def _done(t: asyncio.Task[T]) -> None:
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            # Mark the exception retrieved for fire-and-forget callers
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(_done)
+        return task
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.start(key, fn))
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+__all__ = [
+    "connect",
+    "SQLiteWorker",
+]
+
+T = TypeVar("T")
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open a SQLite file tuned for one writer + readers (WAL, relaxed fsync)."""
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+class SQLiteWorker:
+    """
+    Runs every statement for one connection on a dedicated thread so the
+    event loop never blocks on disk I/O and the connection is never shared
+    across threads.
+    """
+
+    def __init__(self, path: str, name: str = "sqlite") -> None:
+        self.path = path
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    async def open(self, schema: str = "") -> None:
+        def _open() -> None:
+            self._conn = connect(self.path)
+            if schema:
+                self._conn.executescript(schema)
+                self._conn.commit()
+
+        if self._conn is None:
+            await self.run(_open)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on the worker thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=self.name
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def call(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run ``fn(conn)`` on the worker thread."""
+
+        def _call() -> T:
+            if self._conn is None:
+                raise RuntimeError(f"SQLite database {self.path!r} is not open")
+            return fn(self._conn)
+
+        return await self.run(_call)
+
+    async def close(self) -> None:
+        def _close() -> None:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+        if self._executor is None:
+            return
+        await self.run(_close)
+        self._executor.shutdown(wait=False)
+        self._executor = None
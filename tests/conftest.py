@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, List, Mapping, Optional, Tuple
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class FakeDiscord:
+    """
+    Local stand-in for Discord's webhook endpoint (POST /hooks/{name}):
+      - Replies are scripted per webhook with ``reply()``; once a webhook's
+        script runs out every request gets a 204
+      - Every request is recorded as (monotonic time, JSON payload)
+    """
+
+    def __init__(self) -> None:
+        self.scripts: Dict[str, Deque[Tuple[int, Any, Dict[str, str]]]] = defaultdict(
+            deque
+        )
+        self.requests: Dict[str, List[Tuple[float, Dict[str, Any]]]] = defaultdict(list)
+        self.base_url = ""
+
+    def reply(
+        self,
+        name: str,
+        status: int,
+        body: Any = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Queue one response for webhook ``name``. A dict/list body is
+        sent as JSON, a str as text/html."""
+        self.scripts[name].append((status, body, dict(headers or {})))
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/hooks/{name}"
+
+    def times(self, name: str) -> List[float]:
+        return [t for t, _ in self.requests[name]]
+
+    async def wait_for_requests(self, name: str, n: int, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while len(self.requests[name]) < n:
+            if time.monotonic() > deadline:
+                raise AssertionError(
+                    f"{name}: expected {n} request(s), got {len(self.requests[name])}"
+                )
+            await asyncio.sleep(0.01)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        self.requests[name].append((time.monotonic(), await request.json()))
+        script = self.scripts[name]
+        if not script:
+            return web.Response(status=204)
+        status, body, headers = script.popleft()
+        if isinstance(body, (dict, list)):
+            return web.json_response(body, status=status, headers=headers)
+        return web.Response(
+            status=status, text=body, content_type="text/html", headers=headers
+        )
+
+    @asynccontextmanager
+    async def serve(self) -> AsyncIterator["FakeDiscord"]:
+        app = web.Application()
+        app.router.add_post("/hooks/{name}", self._handle)
+        server = TestServer(app)
+        await server.start_server()
+        self.base_url = str(server.make_url("")).rstrip("/")
+        try:
+            yield self
+        finally:
+            await server.close()
+
+
+@pytest.fixture
+def fake_discord() -> FakeDiscord:
+    return FakeDiscord()
+
+
+class StubNWS:
+    """
+    Local stand-in for api.weather.gov, replaying recorded feeds from
+    tests/fixtures/nws:
+      - ``feed()`` sets what GET /alerts/active serves, with an ETag; a
+        request whose If-None-Match matches it gets a bodyless 304
+      - ``fail()`` queues error responses served before the feed
+      - Every request is recorded as (monotonic time, headers)
+    """
+
+    def __init__(self) -> None:
+        self.body = b'{"type": "FeatureCollection", "features": []}'
+        self.etag: Optional[str] = None
+        self.failures: Deque[Tuple[int, Dict[str, str]]] = deque()
+        self.requests: List[Tuple[float, Mapping[str, str]]] = []
+        self.base_url = ""
+
+    def feed(self, name: str, etag: Optional[str] = None) -> None:
+        self.body = (FIXTURES / "nws" / f"{name}.json").read_bytes()
+        self.etag = etag
+
+    def fail(self, status: int, headers: Optional[Mapping[str, str]] = None) -> None:
+        self.failures.append((status, dict(headers or {})))
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests.append((time.monotonic(), dict(request.headers)))
+        if self.failures:
+            status, headers = self.failures.popleft()
+            return web.json_response(
+                {"title": "Service Unavailable", "status": status},
+                status=status,
+                headers=headers,
+            )
+        headers = {"ETag": self.etag} if self.etag else {}
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(
+            body=self.body, content_type="application/geo+json", headers=headers
+        )
+
+    @asynccontextmanager
+    async def serve(self) -> AsyncIterator["StubNWS"]:
+        app = web.Application()
+        app.router.add_get("/alerts/active", self._handle)
+        server = TestServer(app)
+        await server.start_server()
+        self.base_url = str(server.make_url("")).rstrip("/")
+        try:
+            yield self
+        finally:
+            await server.close()
+
+
+@pytest.fixture
+def stub_nws() -> StubNWS:
+    return StubNWS()
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import pytest
+
+from marco_bot.cogs.callsign import CALLSIGN_RE, _parse_roster
+
+
+@pytest.mark.parametrize(
+    "call", ["W1AW", "K4UCF", "KD2ABC", "N0CALL", "2E0ABC", "9A1AA", "AA1AA/P"]
+)
+def test_callsign_shapes_match(call):
+    assert CALLSIGN_RE.match(call)
+
+
+@pytest.mark.parametrize("token", ["32816", "2024", "1234567", "HELLO", "A1", "W1"])
+def test_non_callsigns_are_rejected(token):
+    assert not CALLSIGN_RE.match(token)
+
+
+def test_roster_skips_zip_codes_years_and_ids():
+    text = "name,call,zip,year,id\nAlice,w1aw,32816,2024,1234567\nBob,K4UCF,,,\n"
+    assert _parse_roster(text) == ["W1AW", "K4UCF"]
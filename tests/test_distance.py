@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from array import array
+
+import numpy as np
+import pytest
+
+from marco_bot.utils.distance import (
+    haversine_km,
+    haversine_many,
+    haversine_matrix,
+    haversine_miles,
+)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(42)
+    n = 500
+    lons = rng.uniform(-180, 180, (2, n))
+    lats = rng.uniform(-90, 90, (2, n))
+    # Edge cases: identical, antipodal, poles and the antimeridian
+    lons[:, :4] = [[0, 0, 179.9, -81.2], [0, 180, -179.9, -81.2]]
+    lats[:, :4] = [[0, 0, 90, 28.6], [0, 0, -90, 28.6]]
+    return lons[0], lats[0], lons[1], lats[1]
+
+
+def scalar(fn, lon1, lat1, lon2, lat2):
+    return np.array([fn(*p) for p in zip(lon1, lat1, lon2, lat2)])
+
+
+# ---------- Agreement with the scalar function ----------
+def test_many_matches_scalar(points):
+    expected = scalar(haversine_km, *points)
+    assert np.allclose(haversine_many(*points), expected, rtol=0, atol=1e-9)
+    miles = scalar(haversine_miles, *points)
+    assert np.allclose(haversine_many(*points, unit="mi"), miles, rtol=0, atol=1e-9)
+
+
+def test_matrix_matches_scalar(points):
+    lon1, lat1, lon2, lat2 = (p[:40] for p in points)
+    a = np.column_stack([lon1, lat1])
+    b = np.column_stack([lon2[:30], lat2[:30]])
+    got = haversine_matrix(a, b)
+    assert got.shape == (40, 30)
+    expected = np.array(
+        [[haversine_km(*p, *q) for q in b.tolist()] for p in a.tolist()]
+    )
+    assert np.allclose(got, expected, rtol=0, atol=1e-9)
+
+
+def test_inputs_broadcast_and_accept_buffers():
+    lons = array("d", [-81.2, -80.6, -82.5])
+    lats = array("d", [28.6, 28.4, 27.9])
+    got = haversine_many(lons, lats, -81.2, 28.6)
+    assert got.shape == (3,)
+    assert got[0] == 0.0
+    assert got[1] == pytest.approx(haversine_km(-80.6, 28.4, -81.2, 28.6), abs=1e-9)
+    # A single (lon, lat) pair is one row
+    assert haversine_matrix([-81.2, 28.6], [[-81.2, 28.6]]).shape == (1, 1)
+
+
+# ---------- out= ----------
+def test_out_is_filled_and_returned():
+    out = np.empty(3)
+    got = haversine_many([0, 1, 2], [0, 0, 0], 0, 0, out=out)
+    assert got is out
+    assert out.flags.c_contiguous
+    m = np.empty((2, 3))
+    assert haversine_matrix([[0, 0], [1, 1]], [[0, 0]] * 3, out=m) is m
+
+
+def test_out_wrong_shape():
+    with pytest.raises(ValueError, match="shape"):
+        haversine_many([0, 1], [0, 0], 0, 0, out=np.empty(3))
+    with pytest.raises(ValueError, match="shape"):
+        haversine_matrix([[0, 0]], [[0, 0], [1, 1]], out=np.empty((2, 1)))
+
+
+def test_out_wrong_dtype():
+    with pytest.raises(TypeError):
+        haversine_many([0, 1], [0, 0], 0, 0, out=np.empty(2, dtype=np.float32))
+    with pytest.raises(TypeError):
+        haversine_many([0, 1], [0, 0], 0, 0, out=[0.0, 0.0])
+
+
+def test_out_not_contiguous_or_read_only():
+    strided = np.empty(4)[::2]
+    with pytest.raises(ValueError, match="contiguous"):
+        haversine_many([0, 1], [0, 0], 0, 0, out=strided)
+    frozen = np.empty(2)
+    frozen.flags.writeable = False
+    with pytest.raises(ValueError, match="writeable"):
+        haversine_many([0, 1], [0, 0], 0, 0, out=frozen)
+
+
+# ---------- Validation ----------
+@pytest.mark.parametrize(
+    "lons, lats, message",
+    [
+        ([0, 181], [0, 0], "Longitude 181.0 at index 1"),
+        ([0, -180.5], [0, 0], "Longitude"),
+        ([0, 0], [0, 90.5], "Latitude 90.5 at index 1"),
+        ([0, 0], [np.nan, 0], "Latitude nan at index 0"),
+    ],
+)
+def test_out_of_range_rejected(lons, lats, message):
+    with pytest.raises(ValueError, match=message):
+        haversine_many(lons, lats, 0, 0)
+    with pytest.raises(ValueError, match=message.split(" at")[0]):
+        haversine_matrix([[0, 0]], np.column_stack([lons, lats]))
+
+
+def test_bad_unit_and_point_shape():
+    with pytest.raises(ValueError, match="Unit"):
+        haversine_many(0, 0, 1, 1, unit="nm")
+    with pytest.raises(ValueError, match="points_a"):
+        haversine_matrix([[0, 0, 0]], [[0, 0]])
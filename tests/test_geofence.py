@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from marco_bot.utils.distance import haversine_miles
+from marco_bot.utils.geofence import MI_PER_DEG, BBox, Zone, ZoneIndex, geojson_rings
+
+# A 0.2 x 0.2 degree box around Orlando, and an L-shaped zone east of it
+#
+#   (-81.0, 28.7) +----+
+#                 |    |
+#                 |    +--------+ (-80.7, 28.6)
+#                 |             |
+#   (-81.0, 28.5) +-------------+ (-80.7, 28.5)
+SQUARE = ((-81.3, 28.5), (-81.1, 28.5), (-81.1, 28.7), (-81.3, 28.7), (-81.3, 28.5))
+ELL = (
+    (-81.0, 28.5),
+    (-80.7, 28.5),
+    (-80.7, 28.6),
+    (-80.9, 28.6),
+    (-80.9, 28.7),
+    (-81.0, 28.7),
+    (-81.0, 28.5),
+)
+
+
+def rect(lon0, lat0, lon1, lat1):
+    return ((lon0, lat0), (lon1, lat0), (lon1, lat1), (lon0, lat1), (lon0, lat0))
+
+
+@pytest.fixture
+def index() -> ZoneIndex:
+    return ZoneIndex(
+        [
+            Zone("ORANGE", "Orange", ["FLC095", "012095"], [SQUARE]),
+            Zone("BREVARD", "Brevard", ["FLC009"], [ELL]),
+            # Outline not loaded: only ever matched by code
+            Zone("MARINE", "Marine", ["AMZ550"]),
+        ]
+    )
+
+
+# ---------- Point in polygon ----------
+def test_contains_square():
+    z = Zone("Z", "Z", rings=[SQUARE])
+    assert z.contains(-81.2, 28.6)
+    assert not z.contains(-81.4, 28.6)
+    assert not z.contains(-81.2, 28.8)
+    # Points level with a vertex still count once
+    assert z.contains(-81.2, 28.5 + 1e-9)
+
+
+def test_contains_concave_zone():
+    z = Zone("Z", "Z", rings=[ELL])
+    assert z.contains(-80.95, 28.65)  # upright of the L
+    assert z.contains(-80.75, 28.55)  # foot of the L
+    # In the notch: inside the bounding box, outside the zone
+    assert z.bbox.contains(-80.8, 28.65)
+    assert not z.contains(-80.8, 28.65)
+
+
+# ---------- Buffers ----------
+def test_distance_to_boundary_matches_haversine():
+    z = Zone("Z", "Z", rings=[SQUARE])
+    # Due north and due east of the box
+    for lon, lat, edge in ((-81.2, 28.75, (-81.2, 28.7)), (-81.0, 28.6, (-81.1, 28.6))):
+        expected = haversine_miles(lon, lat, *edge)
+        assert z.distance_miles(lon, lat, 10) == pytest.approx(expected, rel=5e-3)
+    assert z.distance_miles(-81.2, 28.75, 1) == math.inf
+
+
+def test_buffer_hits_and_misses():
+    z = Zone("Z", "Z", rings=[SQUARE])
+    lon, lat = -81.2, 28.75  # ~3.5 mi north of the box
+    assert not z.near(lon, lat)
+    assert not z.near(lon, lat, buffer_miles=3)
+    assert z.near(lon, lat, buffer_miles=4)
+    # The notch of the L is within a mile of both arms
+    ell = Zone("L", "L", rings=[ELL])
+    assert ell.near(-80.8, 28.62, buffer_miles=2)
+    assert not ell.near(-80.8, 28.62)
+
+
+def test_buffered_bbox_covers_the_buffer():
+    box = BBox.of([SQUARE])
+    big = box.buffered(5)
+    assert big.min_lat == pytest.approx(28.5 - 5 / MI_PER_DEG)
+    # 5 miles east of the north-east corner is still inside
+    dlon = 5 / (MI_PER_DEG * math.cos(math.radians(28.7)))
+    assert big.contains(-81.1 + dlon * 0.999, 28.7)
+    assert not big.contains(-81.1 + dlon * 1.01, 28.7)
+    assert box.buffered(0) is box
+
+
+# ---------- Polygons ----------
+def test_polygon_enclosing_zone_touches():
+    z = Zone("Z", "Z", rings=[SQUARE])
+    assert z.touches([rect(-81.5, 28.3, -80.9, 28.9)])
+
+
+def test_polygon_crossing_zone_without_vertices_inside_touches():
+    z = Zone("Z", "Z", rings=[SQUARE])
+    # A thin bar straight through the box: no vertex of either is inside
+    assert z.touches([rect(-81.5, 28.59, -80.9, 28.61)])
+
+
+def test_polygon_outside_zone_respects_buffer():
+    z = Zone("Z", "Z", rings=[SQUARE])
+    far = [rect(-81.3, 28.8, -81.1, 28.9)]  # ~6.9 mi north
+    assert not z.touches(far)
+    assert not z.touches(far, buffer_miles=5)
+    assert z.touches(far, buffer_miles=8)
+    # A polygon in the L's notch touches only with a buffer
+    notch = [rect(-80.85, 28.62, -80.75, 28.68)]
+    ell = Zone("L", "L", rings=[ELL])
+    assert not ell.touches(notch)
+    assert ell.touches(notch, buffer_miles=2)
+
+
+# ---------- Index ----------
+def test_match_by_polygon(index):
+    assert index.match([rect(-81.25, 28.55, -81.15, 28.65)]) == {"ORANGE"}
+    assert index.match([rect(-81.2, 28.55, -80.8, 28.58)]) == {"ORANGE", "BREVARD"}
+    assert index.zones_near(-80.95, 28.65) == ["BREVARD"]
+    assert index.zones_near(-81.05, 28.6, buffer_miles=5) == ["BREVARD", "ORANGE"]
+
+
+def test_match_by_zone_codes_only(index):
+    assert index.match(codes=["012095"]) == {"ORANGE"}
+    assert index.match(codes=["AMZ550", "FLC009"]) == {"BREVARD", "MARINE"}
+    assert index.match(codes=["GAC001"]) == set()
+
+
+def test_polygon_alert_uses_geometry_where_known(index):
+    # Listed codes cover all three zones, but the polygon is far from the
+    # outlined ones; only the zone without an outline matches by code
+    far = [rect(-82.5, 27.0, -82.4, 27.1)]
+    assert index.match(far, ["FLC095", "FLC009", "AMZ550"]) == {"MARINE"}
+
+
+def test_duplicate_zone_key_rejected(index):
+    with pytest.raises(ValueError):
+        index.add(Zone("ORANGE", "Orange again"))
+
+
+def test_geojson_rings():
+    poly = {
+        "type": "Polygon",
+        "coordinates": [
+            [[-81.3, 28.5, 0], [-81.1, 28.5, 0], [-81.1, 28.7, 0], [-81.3, 28.5, 0]],
+            [[-81.2, 28.55], [-81.15, 28.55], [-81.15, 28.6], [-81.2, 28.55]],
+        ],
+    }
+    rings = geojson_rings(poly)
+    assert len(rings) == 1  # the hole is dropped
+    assert rings[0][0] == (-81.3, 28.5)
+    multi = {"type": "MultiPolygon", "coordinates": [[list(SQUARE)], [list(ELL)]]}
+    assert len(geojson_rings(multi)) == 2
+    assert geojson_rings(None) == ()
+    assert geojson_rings({"type": "Point", "coordinates": [0, 0]}) == ()
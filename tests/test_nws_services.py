@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from marco_bot.services import nws_services
+from marco_bot.services.nws_services import NWSAlertService
+
+OID = "urn:oid:2.49.0.1.840.0."
+FLOOD = OID + "4b1a2e7c0f3d9e11a5c6b7d8e9f00112233445566.001.1"
+FLOOD_UPDATE = OID + "4b1a2e7c0f3d9e11a5c6b7d8e9f00112233445566.002.1"
+TORNADO = OID + "9c8d7e6f5a4b3c2d1e0f99887766554433221100.001.1"
+TORNADO_CANCEL = OID + "9c8d7e6f5a4b3c2d1e0f99887766554433221100.002.1"
+
+
+def service(stub, **kwargs) -> NWSAlertService:
+    return NWSAlertService("ops@example.org", base_url=stub.base_url, **kwargs)
+
+
+def summary(events):
+    return [(ev.kind, ev.alert.id, ev.replaces) for ev in events]
+
+
+# ---------- Conditional GET ----------
+def test_etag_then_304(stub_nws):
+    stub_nws.feed("alerts_active_1", etag='"v1"')
+
+    async def main():
+        async with stub_nws.serve():
+            svc = service(stub_nws)
+            try:
+                first = await svc.poll()
+                second = await svc.poll()
+            finally:
+                await svc.close()
+        return svc, first, second
+
+    svc, first, second = asyncio.run(main())
+    assert summary(first) == [("new", FLOOD, ())]
+    assert second == []
+    assert svc.not_modified == 1
+    assert list(svc.active) == [FLOOD]
+    assert "If-None-Match" not in stub_nws.requests[0][1]
+    assert stub_nws.requests[1][1]["If-None-Match"] == '"v1"'
+    assert "mARCoBot" in stub_nws.requests[0][1]["User-Agent"]
+
+
+# ---------- Dedupe through references ----------
+def test_new_update_and_cancel_follow_references(stub_nws):
+    async def main():
+        async with stub_nws.serve():
+            svc = service(stub_nws)
+            try:
+                stub_nws.feed("alerts_active_1", etag='"v1"')
+                one = await svc.poll()
+                # The watch is updated and a warning issued; the feed still
+                # lists the original watch alongside its update
+                stub_nws.feed("alerts_active_2", etag='"v2"')
+                two = await svc.poll()
+                active_two = set(svc.active)
+                stub_nws.feed("alerts_active_3", etag='"v3"')
+                three = await svc.poll()
+                # Same messages again under a new ETag: nothing re-emitted
+                stub_nws.feed("alerts_active_3", etag='"v4"')
+                four = await svc.poll()
+            finally:
+                await svc.close()
+        return svc, one, two, active_two, three, four
+
+    svc, one, two, active_two, three, four = asyncio.run(main())
+    assert summary(one) == [("new", FLOOD, ())]
+    assert summary(two) == [
+        ("update", FLOOD_UPDATE, (FLOOD,)),
+        ("new", TORNADO, ()),
+    ]
+    assert active_two == {FLOOD_UPDATE, TORNADO}
+    assert summary(three) == [("cancel", TORNADO_CANCEL, (TORNADO,))]
+    assert set(svc.active) == {FLOOD_UPDATE}
+    assert four == []
+    assert svc.skipped > 0
+
+
+def test_message_replaced_within_one_batch_is_not_emitted(stub_nws):
+    stub_nws.feed("alerts_active_2")
+
+    async def main():
+        async with stub_nws.serve():
+            svc = service(stub_nws)
+            try:
+                return await svc.poll()
+            finally:
+                await svc.close()
+
+    events = asyncio.run(main())
+    assert FLOOD not in {ev.alert.id for ev in events}
+    assert summary(events)[0] == ("update", FLOOD_UPDATE, (FLOOD,))
+
+
+# ---------- Poll loop ----------
+def test_first_poll_only_primes(stub_nws, monkeypatch):
+    monkeypatch.setattr(nws_services.random, "uniform", lambda a, b: 1.0)
+    stub_nws.feed("alerts_active_1", etag='"v1"')
+    batches = []
+
+    async def handler(events):
+        batches.append(summary(events))
+
+    async def main():
+        async with stub_nws.serve():
+            svc = service(stub_nws)
+            # Poll again ~1s after the first (the loop's floor)
+            svc.interval_s = 0.1
+            await svc.start(handler)
+            try:
+                while svc.polls < 1:
+                    await asyncio.sleep(0.01)
+                stub_nws.feed("alerts_active_2", etag='"v2"')
+                while not batches:
+                    await asyncio.sleep(0.01)
+            finally:
+                await svc.close()
+
+    asyncio.run(asyncio.wait_for(main(), timeout=10))
+    # The already-active watch was learned silently, not posted
+    assert batches == [
+        [("update", FLOOD_UPDATE, (FLOOD,)), ("new", TORNADO, ())],
+    ]
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_after_sets_the_backoff(stub_nws, monkeypatch, status):
+    monkeypatch.setattr(nws_services.random, "uniform", lambda a, b: 1.0)
+    stub_nws.fail(status, {"Retry-After": "1.5"})
+    stub_nws.feed("alerts_active_1")
+
+    async def handler(events):
+        pass
+
+    async def main():
+        async with stub_nws.serve():
+            # Without Retry-After the first back-off would be 2 * 60s
+            svc = service(stub_nws, interval_s=60)
+            await svc.start(handler)
+            try:
+                deadline = time.monotonic() + 5
+                while len(stub_nws.requests) < 2 and time.monotonic() < deadline:
+                    await asyncio.sleep(0.02)
+            finally:
+                await svc.close()
+        return svc
+
+    svc = asyncio.run(main())
+    assert svc.errors == 1
+    assert len(stub_nws.requests) == 2
+    gap = stub_nws.requests[1][0] - stub_nws.requests[0][0]
+    assert 1.4 <= gap < 3.0
+
+
+def test_retry_after_is_ignored_for_other_errors():
+    svc = NWSAlertService("ops@example.org")
+    err = aiohttp.ClientResponseError(
+        None, (), status=500, headers={"Retry-After": "5"}
+    )
+    assert svc._retry_after(err) is None
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import zipfile
+from typing import Dict, List
+
+from marco_bot.services.uls_services import ULSDatabase, import_archive
+
+# Pipe-delimited ULS rows, only the columns the importer reads filled in
+WIDTH = {"HD": 50, "EN": 30, "AM": 20}
+
+
+def row(kind: str, usi: int, call: str, **cols: str) -> str:
+    cells = [""] * WIDTH[kind]
+    cells[0], cells[1], cells[4] = kind, str(usi), call
+    for i, value in cols.items():
+        cells[int(i[1:])] = value
+    return "|".join(cells)
+
+
+def hd(usi, call, status="A", service="HA", granted="03/01/2020", expires="03/01/2030"):
+    return row("HD", usi, call, c5=status, c6=service, c7=granted, c8=expires)
+
+
+def en(usi, call, last="", first="", mi="", entity="", city="", state="", frn=""):
+    kind = "B" if entity and not last else "I"
+    cols = dict(c5="L", c7=entity, c8=first, c9=mi, c10=last, c16=city, c17=state)
+    return row("EN", usi, call, c18="32816", c22=frn, c23=kind, **cols)
+
+
+def am(usi, call, oper_class="", trustee="", trustee_name=""):
+    return row("AM", usi, call, c5=oper_class, c8=trustee, c17=trustee_name)
+
+
+def archive(name: str, files: Dict[str, List[str]]) -> io.BytesIO:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for kind, lines in files.items():
+            zf.writestr(f"{kind}.dat", "\r\n".join(lines) + "\r\n")
+    buf.seek(0)
+    buf.name = name
+    return buf
+
+
+FULL = {
+    "HD": [
+        hd(1001, "W1AW"),
+        hd(1002, "KD2ABC"),
+        hd(1003, "KK4AAA"),
+        hd(1004, "N4OLD", expires="05/01/2027"),
+        "HD|not-a-usi|||BROKEN",
+    ],
+    "EN": [
+        en(1001, "W1AW", entity="ARRL INC", city="NEWINGTON", state="CT"),
+        en(
+            1002, "KD2ABC", "SMITH", "JANE", "Q", city="ORLANDO", state="FL", frn="0001"
+        ),
+        # A contact row for the same license is not the licensee
+        row("EN", 1002, "KD2ABC", c5="CL", c7="SOMEONE ELSE"),
+        en(1003, "KK4AAA", "SMITHSON", "JOHN", city="OVIEDO", state="FL"),
+        en(1004, "N4OLD", "JONES", "ALICE", city="WINTER PARK", state="FL"),
+    ],
+    "AM": [
+        am(1001, "W1AW", trustee="K1ZZ", trustee_name="DAVID A MINSTER"),
+        am(1002, "KD2ABC", "T"),
+        am(1003, "KK4AAA", "G"),
+        am(1004, "N4OLD", "E"),
+    ],
+}
+
+DAILY = {
+    # KD2ABC upgrades and renews; KK4AAA takes a vanity call; N4OLD cancels
+    "HD": [
+        hd(1002, "KD2ABC", expires="03/01/2036"),
+        hd(1003, "W4VAN", service="HV"),
+        hd(1004, "N4OLD", status="C", expires="05/01/2027"),
+    ],
+    "EN": [en(1003, "W4VAN", "SMITHSON", "JOHN", city="OVIEDO", state="FL")],
+    "AM": [am(1002, "KD2ABC", "G"), am(1003, "W4VAN", "G")],
+}
+
+
+def test_full_import_then_daily_apply(tmp_path):
+    db_path = str(tmp_path / "uls.sqlite3")
+    counts = import_archive(db_path, archive("l_amat.zip", FULL))
+    assert counts == {"HD": 4, "EN": 4, "AM": 4}
+
+    async def main():
+        db = ULSDatabase(db_path)
+        await db.open()
+        try:
+            rec = await db.lookup("kd2abc")
+            assert rec.name == "JANE Q SMITH"
+            assert rec.type == "PERSON"
+            assert rec.oper_class == "TECHNICIAN"
+            assert rec.status == "Active"
+            assert rec.expires == "2030-03-01"
+            assert (rec.city, rec.state, rec.frn) == ("Orlando", "FL", "0001")
+            assert rec.uls_url.endswith("licKey=1002")
+            assert rec.sources == {"uls": True}
+
+            club = await db.lookup("W1AW")
+            assert (club.name, club.type) == ("ARRL INC", "CLUB")
+            assert club.trustee_callsign == "K1ZZ"
+
+            names = [r.callsign for r in await db.search_name("smith")]
+            assert names == ["KD2ABC", "KK4AAA"]
+            names = [r.callsign for r in await db.search_name("Smith, Jane")]
+            assert names == ["KD2ABC"]
+            assert [r.callsign for r in await db.by_frn("0001")] == ["KD2ABC"]
+
+            counts = await db.import_archive(archive("l_am_mon.zip", DAILY), full=False)
+            assert counts == {"HD": 3, "EN": 1, "AM": 2}
+
+            rec = await db.lookup("KD2ABC")
+            assert (rec.oper_class, rec.expires) == ("GENERAL", "2036-03-01")
+            assert rec.name == "JANE Q SMITH"  # untouched by the daily file
+            assert await db.lookup("KK4AAA") is None
+            vanity = await db.lookup("W4VAN")
+            assert (vanity.name, vanity.radio_service) == ("JOHN SMITHSON", "Vanity")
+            assert (await db.lookup("N4OLD")).status == "Cancelled"
+            names = [r.callsign for r in await db.search_name("smith")]
+            assert names == ["KD2ABC", "W4VAN"]
+
+            meta = await db.meta()
+            assert meta["last_full"] == "l_amat.zip"
+            assert meta["last_daily"] == "l_am_mon.zip"
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+
+def test_full_import_replaces_the_table(tmp_path):
+    db_path = str(tmp_path / "uls.sqlite3")
+    import_archive(db_path, archive("l_amat.zip", FULL))
+    only_w1aw = {k: [line for line in v if "W1AW" in line] for k, v in FULL.items()}
+    assert import_archive(db_path, archive("l_amat.zip", only_w1aw)) == {
+        "HD": 1,
+        "EN": 1,
+        "AM": 1,
+    }
+
+    async def main():
+        db = ULSDatabase(db_path)
+        await db.open()
+        try:
+            assert await db.lookup("KD2ABC") is None
+            assert (await db.lookup("W1AW")).name == "ARRL INC"
+            assert await db.search_name("smith") == []
+        finally:
+            await db.close()
+
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+
+from marco_bot.services import webhook_services
+from marco_bot.services.webhook_services import WebhookDispatcher
+
+# Timing slack for the paced / backed-off sends
+SLACK_S = 0.05
+
+
+def embed(i: int):
+    return {"title": f"alert {i}", "description": "x" * 10}
+
+
+@asynccontextmanager
+async def dispatcher(
+    fake, *names: str, start: bool = True, **kwargs
+) -> AsyncIterator[WebhookDispatcher]:
+    async with fake.serve():
+        d = WebhookDispatcher({n: fake.url(n) for n in names}, **kwargs)
+        if start:
+            await d.start()
+        try:
+            yield d
+        finally:
+            await d.close()
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    # 5xx back-off is 2**attempts seconds with jitter; scale it to ~20ms
+    monkeypatch.setattr(webhook_services.random, "uniform", lambda a, b: 0.01)
+
+
+# ---------- 429 ----------
+def test_429_waits_out_retry_after(fake_discord):
+    fake_discord.reply("a", 429, {"retry_after": 0.3, "global": False})
+
+    async def main():
+        async with dispatcher(fake_discord, "a") as d:
+            assert await (await d.submit("a", embeds=[embed(1)]))
+            assert d.rate_limited == 1
+
+    asyncio.run(main())
+    first, second = fake_discord.times("a")
+    assert second - first >= 0.3 - SLACK_S
+
+
+def test_429_without_json_body_uses_retry_after_header(fake_discord):
+    fake_discord.reply("a", 429, "<html>slow down</html>", {"Retry-After": "0.3"})
+
+    async def main():
+        async with dispatcher(fake_discord, "a") as d:
+            assert await (await d.submit("a", content="hello"))
+            assert d.failed == 0
+
+    asyncio.run(main())
+    first, second = fake_discord.times("a")
+    assert second - first >= 0.3 - SLACK_S
+    assert fake_discord.requests["a"][1][1] == {"content": "hello"}
+
+
+def test_global_429_holds_every_webhook(fake_discord):
+    fake_discord.reply(
+        "a", 429, {"retry_after": 0.4, "global": True}, {"X-RateLimit-Global": "true"}
+    )
+
+    async def main():
+        async with dispatcher(fake_discord, "a", "b") as d:
+            fut_a = await d.submit("a", content="a")
+            await fake_discord.wait_for_requests("a", 1)
+            while d.rate_limited == 0:
+                await asyncio.sleep(0.01)
+            fut_b = await d.submit("b", content="b")
+            assert await fut_a and await fut_b
+
+    asyncio.run(main())
+    limited_at = fake_discord.times("a")[0]
+    assert fake_discord.times("b")[0] - limited_at >= 0.4 - SLACK_S
+
+
+# ---------- Pacing ----------
+def test_ratelimit_remaining_paces_next_send(fake_discord):
+    fake_discord.reply(
+        "a", 204, None, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.3"}
+    )
+
+    async def main():
+        async with dispatcher(fake_discord, "a") as d:
+            assert await (await d.submit("a", content="one"))
+            assert await (await d.submit("a", content="two"))
+            assert d.rate_limited == 0
+
+    asyncio.run(main())
+    first, second = fake_discord.times("a")
+    assert second - first >= 0.3 - SLACK_S
+
+
+# ---------- Errors ----------
+def test_5xx_is_retried(fake_discord, fast_backoff):
+    fake_discord.reply("a", 500, {"message": "oops"})
+    fake_discord.reply("a", 502, "<html>bad gateway</html>")
+
+    async def main():
+        async with dispatcher(fake_discord, "a", max_attempts=3) as d:
+            assert await (await d.submit("a", content="hi"))
+            assert d.retries == 2
+            assert d.sent_messages == 1
+
+    asyncio.run(main())
+    assert len(fake_discord.requests["a"]) == 3
+
+
+def test_5xx_gives_up_after_max_attempts(fake_discord, fast_backoff):
+    for _ in range(5):
+        fake_discord.reply("a", 503, {"message": "unavailable"})
+
+    async def main():
+        async with dispatcher(fake_discord, "a", max_attempts=2) as d:
+            assert not await (await d.submit("a", content="hi"))
+            assert d.failed == 1
+            assert await d.drain(timeout=1)
+
+    asyncio.run(main())
+    assert len(fake_discord.requests["a"]) == 2
+
+
+def test_404_retires_webhook(fake_discord):
+    fake_discord.reply("a", 404, {"message": "Unknown Webhook", "code": 10015})
+
+    async def main():
+        async with dispatcher(fake_discord, "a") as d:
+            assert not await (await d.submit("a", content="one"))
+            assert d.hooks["a"].dead
+            # Later submits resolve straight away without a request
+            assert not await (await d.submit("a", content="two"))
+            assert d.failed == 2
+
+    asyncio.run(main())
+    assert len(fake_discord.requests["a"]) == 1
+
+
+# ---------- Queue ----------
+def test_backlog_is_coalesced_within_discord_limits(fake_discord):
+    async def main():
+        async with dispatcher(fake_discord, "a", start=False, per_webhook=1) as d:
+            futs = [await d.submit("a", embeds=[embed(i)]) for i in range(12)]
+            await d.start()
+            assert all(await asyncio.gather(*futs))
+            assert d.sent_messages == 2
+            assert d.coalesced == 10
+
+    asyncio.run(main())
+    sizes = [len(p["embeds"]) for _, p in fake_discord.requests["a"]]
+    assert sizes == [10, 2]
+    titles = [e["title"] for _, p in fake_discord.requests["a"] for e in p["embeds"]]
+    assert titles == [f"alert {i}" for i in range(12)]
+
+
+def test_submit_waits_while_queue_is_full(fake_discord):
+    async def main():
+        async with dispatcher(fake_discord, "a", start=False, max_queue=2) as d:
+            await d.submit("a", content="one")
+            await d.submit("a", content="two")
+            third = asyncio.create_task(d.submit("a", content="three"))
+            await asyncio.sleep(0.1)
+            assert not third.done()
+
+            await d.start()
+            fut = await asyncio.wait_for(third, timeout=2)
+            assert await fut
+            assert await d.drain(timeout=2)
+
+    asyncio.run(main())
+    contents = [p["content"] for _, p in fake_discord.requests["a"]]
+    assert "\n".join(contents).split("\n") == ["one", "two", "three"]